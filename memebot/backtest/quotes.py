@@ -0,0 +1,183 @@
+"""Quote sources for offline backtests.
+
+Prices are expressed as ``out_per_sol``: raw token units one SOL buys at a
+point in time. A position bought with ``entry_out_raw`` tokens is worth
+``entry_out_raw / out_per_sol`` SOL at a later quote.
+"""
+
+import json
+import math
+import random
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# (out_per_sol, impact_bps)
+Quote = Tuple[float, int]
+
+
+class QuoteSource:
+    def prime(self, mint: str, ts: float) -> None:
+        """Called once per mint with its first signal time, before replay."""
+
+    def at(self, mint: str, ts: float) -> Optional[Quote]:
+        """Latest quote for ``mint`` at or before ``ts``."""
+        raise NotImplementedError
+
+    def times(self, mint: str, t0: float, t1: float) -> List[float]:
+        """Quote timestamps for ``mint`` in ``(t0, t1]``, ascending."""
+        raise NotImplementedError
+
+    def exit_factors(self, mint: str, ts: np.ndarray) -> np.ndarray:
+        """SOL received per raw token at each of ``ts`` (NaN if unquoted)."""
+        out = np.full(len(ts), np.nan)
+        for i, t in enumerate(ts):
+            q = self.at(mint, float(t))
+            if q is not None and q[0] > 0:
+                out[i] = (1 - q[1] / 10_000) / q[0]
+        return out
+
+    def can_enter(self, mint: str, size_base: float, ts: float):
+        """Offline stand-in for ``risk.can_enter_solana``."""
+        q = self.at(mint, ts)
+        if q is None or q[0] <= 0:
+            return False, "no_buy_route", 0, 0
+        out_per_sol, impact_bps = q
+        out = int(size_base * out_per_sol * (1 - impact_bps / 10_000))
+        return True, "ok", out, int(impact_bps)
+
+
+class RecordedQuotes(QuoteSource):
+    """Quotes replayed from JSONL rows ``{"ts", "mint", "out_per_sol"[, "impact_bps"]}``."""
+
+    def __init__(self) -> None:
+        self._ts: Dict[str, List[float]] = {}
+        self._px: Dict[str, List[float]] = {}
+        self._impact: Dict[str, List[int]] = {}
+        self._np: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "RecordedQuotes":
+        rows: Dict[str, List[Tuple[float, float, int]]] = {}
+        with open(path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                raw = json.loads(line)
+                rows.setdefault(raw["mint"], []).append(
+                    (
+                        float(raw["ts"]),
+                        float(raw["out_per_sol"]),
+                        int(raw.get("impact_bps", 0)),
+                    )
+                )
+        return cls.from_rows(rows)
+
+    @classmethod
+    def from_rows(cls, rows: Dict[str, List[Tuple[float, float, int]]]) -> "RecordedQuotes":
+        q = cls()
+        for mint, pts in rows.items():
+            pts = sorted(pts)
+            q._ts[mint] = [p[0] for p in pts]
+            q._px[mint] = [p[1] for p in pts]
+            q._impact[mint] = [p[2] for p in pts]
+            px = np.array(q._px[mint])
+            impact = np.array(q._impact[mint], dtype=np.float64)
+            with np.errstate(divide="ignore"):
+                factor = np.where(px > 0, (1 - impact / 10_000) / px, np.nan)
+            q._np[mint] = (np.array(q._ts[mint]), factor)
+        return q
+
+    def at(self, mint: str, ts: float) -> Optional[Quote]:
+        times = self._ts.get(mint)
+        if not times:
+            return None
+        i = bisect_right(times, ts) - 1
+        if i < 0:
+            return None
+        return self._px[mint][i], self._impact[mint][i]
+
+    def times(self, mint: str, t0: float, t1: float) -> List[float]:
+        times = self._ts.get(mint)
+        if not times:
+            return []
+        return times[bisect_right(times, t0) : bisect_right(times, t1)]
+
+    def exit_factors(self, mint: str, ts: np.ndarray) -> np.ndarray:
+        cols = self._np.get(mint)
+        if cols is None:
+            return np.full(len(ts), np.nan)
+        times, factor = cols
+        i = np.searchsorted(times, ts, side="right") - 1
+        return np.where(i >= 0, factor[np.maximum(i, 0)], np.nan)
+
+
+class SyntheticQuotes(QuoteSource):
+    """Deterministic per-mint geometric random walk.
+
+    Each mint's path starts at ``start_out_per_sol`` at its first signal
+    and steps every ``step_sec``. Token price moves with drift
+    ``drift_pct`` and volatility ``vol_pct`` per step; the same ``seed``
+    always replays the same paths.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        step_sec: float = 5.0,
+        vol_pct: float = 5.0,
+        drift_pct: float = 0.0,
+        start_out_per_sol: float = 1_000_000.0,
+        impact_bps: int = 30,
+    ):
+        self.seed = seed
+        self.step_sec = float(step_sec)
+        self.vol = float(vol_pct) / 100.0
+        self.drift = float(drift_pct) / 100.0
+        self.start = float(start_out_per_sol)
+        self.impact_bps = int(impact_bps)
+        self._anchor: Dict[str, float] = {}
+        self._path: Dict[str, List[float]] = {}
+        self._rng: Dict[str, random.Random] = {}
+
+    def _extend(self, mint: str, n: int) -> List[float]:
+        path = self._path[mint]
+        rng = self._rng[mint]
+        while len(path) <= n:
+            # Token price up => fewer tokens per SOL
+            step = self.drift + self.vol * rng.gauss(0.0, 1.0)
+            path.append(path[-1] / math.exp(step))
+        return path
+
+    def prime(self, mint: str, ts: float) -> None:
+        # Anchor on the first signal, not the first quote, so paths don't
+        # depend on which signals a given parameter set trades.
+        if mint not in self._anchor:
+            self._anchor[mint] = ts
+            self._path[mint] = [self.start]
+            self._rng[mint] = random.Random(f"{self.seed}:{mint}")
+
+    def _index(self, mint: str, ts: float) -> int:
+        self.prime(mint, ts)
+        return max(0, int((ts - self._anchor[mint]) // self.step_sec))
+
+    def at(self, mint: str, ts: float) -> Optional[Quote]:
+        i = self._index(mint, ts)
+        return self._extend(mint, i)[i], self.impact_bps
+
+    def exit_factors(self, mint: str, ts: np.ndarray) -> np.ndarray:
+        self.prime(mint, float(ts[0]) if len(ts) else 0.0)
+        idx = np.maximum(0, (np.asarray(ts) - self._anchor[mint]) // self.step_sec).astype(int)
+        path = self._extend(mint, int(idx.max()) if len(idx) else 0)
+        return (1 - self.impact_bps / 10_000) / np.asarray(path)[idx]
+
+    def times(self, mint: str, t0: float, t1: float) -> List[float]:
+        self._index(mint, t0)
+        anchor = self._anchor[mint]
+        k0 = max(0, math.floor((t0 - anchor) / self.step_sec) + 1)
+        k1 = math.floor((t1 - anchor) / self.step_sec)
+        return [anchor + k * self.step_sec for k in range(k0, k1 + 1)]
+
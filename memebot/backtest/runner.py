@@ -1,15 +1,35 @@
+"""Offline backtest runner.
+
+Replays a JSONL signal file through fusion, ``plan_entry``, ``decide`` and
+the exit rules against recorded or synthetic quotes. Time is simulated from
+signal and quote timestamps, so a run is CPU-bound: no sleeps, no network,
+no per-trade file writes. Results go to ``data/backtest/backtest_<ts>.jsonl``.
+
+A run depends only on its inputs and the environment. Adaptive caller
+sizing is neutral (1.0) unless a ``caller_mult`` is passed, so live
+attribution results never leak in. ``SIZING_POLICY_FILE`` is ignored
+during the replay, so it cannot override swept sizing parameters.
+"""
+
+import os
 import typer
+import warnings
 import sys
 import time
 import json
+from dataclasses import dataclass, field
+import numpy as np
 from pathlib import Path
-from typing import List, Dict
+from typing import Any, Callable, List, Dict, Optional
 
 from memebot.strategy.fusion import Signal, SignalMemory
 from memebot.strategy.entry import plan_entry
 from memebot.strategy.simple import decide
-from memebot.exec.paper import PaperTrade, append_trade, reset_trades, get_all_trades
-from memebot.strategy.exits import ExitManager
+from memebot.strategy.sizing import reload_policy, reset_policy
+from memebot.exec.positions import ENV_EXIT_RULES, ExitRules
+from memebot.exec.exit_engine import REASONS, ExitBook
+from memebot.exec.loss_ledger import DailyLossLedger
+from memebot.backtest.quotes import QuoteSource, RecordedQuotes, SyntheticQuotes
 from memebot.config import settings
 from memebot.types import SocialSignal
 
@@ -35,11 +55,245 @@ def load_signals(path: Path) -> List[Signal]:
                 ts=float(raw.get("ts", time.time())),
                 id=raw.get("id"),
                 contract=raw.get("contract"),
+                symbol=raw.get("symbol"),
+                caller=raw.get("caller"),
             )
             signals.append(sig)
     return signals
 
 
+@dataclass
+class BacktestResult:
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    summary: Dict[str, Any] = field(default_factory=dict)
+
+
+class Backtester:
+    """Event-driven simulation of one parameter set over a signal list."""
+
+    def __init__(
+        self,
+        quotes: QuoteSource,
+        rules: Optional[ExitRules] = None,
+        decay_seconds: float = 60.0,
+        min_score: float = 1.0,
+        ignore_allowlist: bool = False,
+        enable_exits: bool = True,
+        horizon_sec: float = 3600.0,
+        debug: bool = False,
+        caller_mult: Optional[Callable[[str], float]] = None,
+    ):
+        self.quotes = quotes
+        self.rules = rules or ENV_EXIT_RULES()
+        self.decay_seconds = decay_seconds
+        self.min_score = min_score
+        self.ignore_allowlist = ignore_allowlist
+        self.enable_exits = enable_exits
+        self.horizon_sec = horizon_sec
+        self.debug = debug
+        self.caller_mult = caller_mult or (lambda caller: 1.0)
+        self.now = 0.0
+        self._book = ExitBook()
+        self._tick_ts = 0.0
+        self._events: List[Dict[str, Any]] = []
+        self._ledger = DailyLossLedger.from_env(clock=lambda: self.now)
+
+    # -- offline stand-ins for the live checks used by plan_entry --
+
+    def _can_enter(self, mint: str, size_base: float):
+        return self.quotes.can_enter(mint, size_base, self.now)
+
+    def _loss_exceeded(self, cap: float) -> bool:
+        return self._ledger.exceeded(cap)
+
+    def _exit_values(self, ts: np.ndarray) -> np.ndarray:
+        """``ticks x positions`` exit values (SOL); NaN where unquoted."""
+        book = self._book
+        mints = sorted(set(book.mints))
+        col = {m: i for i, m in enumerate(mints)}
+        factors = np.column_stack([self.quotes.exit_factors(m, ts) for m in mints])
+        return factors[:, [col[m] for m in book.mints]] * book.entry_out_raw
+
+    def _close(self, i: int, ts: float, exit_base: float, reason: str) -> None:
+        book = self._book
+        entry_base = float(book.entry_base[i])
+        pnl_base = exit_base - entry_base
+        self._ledger.record(ts, pnl_base)
+        self._events.append(
+            {
+                "event": "exit",
+                "ts": ts,
+                "quote": book.mints[i],
+                "ts_open": float(book.ts_open[i]),
+                "entry_base": entry_base,
+                "exit_base": exit_base,
+                "pnl_base": pnl_base,
+                "reason": reason,
+            }
+        )
+
+    def _advance(self, until: float) -> int:
+        """Scan the open book over every quote tick up to ``until``."""
+        book = self._book
+        since, self._tick_ts = self._tick_ts, max(self._tick_ts, until)
+        if not self.enable_exits or not len(book):
+            return 0
+        ticks = np.array(
+            sorted({t for m in set(book.mints) for t in self.quotes.times(m, since, until)})
+        )
+        if not len(ticks):
+            return 0
+        values = self._exit_values(ticks)
+        res = book.scan(ticks, values, self.rules)
+        hits = np.flatnonzero(res.close)
+        # Realize in close order so the daily loss cap sees them in sequence
+        for i in sorted(hits, key=lambda i: res.row[i]):
+            self._close(
+                int(i), float(ticks[res.row[i]]), float(res.exit_base[i]), REASONS[res.reason[i]]
+            )
+        book.remove(res.close)
+        return len(hits)
+
+    def _echo(self, msg: str) -> None:
+        if self.debug:
+            typer.echo(msg)
+
+    def run(self, signals: List[Signal]) -> BacktestResult:
+        # Snapshot sizing config for this run only; sweeps change it between runs.
+        # The live policy file would silently override swept env values.
+        policy_file = os.environ.pop("SIZING_POLICY_FILE", None)
+        if policy_file:
+            warnings.warn(
+                f"SIZING_POLICY_FILE={policy_file} is ignored in backtests; "
+                "set sizing keys in the environment instead",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+        try:
+            reload_policy()
+            return self._replay(signals)
+        finally:
+            reset_policy()
+            if policy_file is not None:
+                os.environ["SIZING_POLICY_FILE"] = policy_file
+
+    def _replay(self, signals: List[Signal]) -> BacktestResult:
+        t0 = time.perf_counter()
+        signals = sorted(signals, key=lambda s: s.ts)
+        for s in signals:
+            if s.contract:
+                self.quotes.prime(s.contract, s.ts)
+        memory = SignalMemory(
+            decay_seconds=self.decay_seconds, clock=lambda: self.now
+        )
+        base_size = float(settings.base_size_sol or 0.05)
+        buys = 0
+
+        for sig in signals:
+            exits = self._advance(sig.ts)
+            if exits:
+                self._echo(f"[exits] Triggered {exits} exits")
+            self.now = sig.ts
+            fused = memory.fuse(sig)
+            self._echo(f"[fuse] {fused.platform} src={fused.source} score={fused.score:.2f}")
+            if fused.score < self.min_score:
+                continue
+
+            ok, reason, size_native, out_amt, impact_bps = plan_entry(
+                fused,
+                can_enter=self._can_enter,
+                loss_exceeded=self._loss_exceeded,
+                caller_mult=self.caller_mult,
+            )
+            if not self.ignore_allowlist and not ok:
+                continue
+
+            decision = decide(
+                SocialSignal(**fused.__dict__), liq_ok=ok, est_price_impact_bps=impact_bps
+            )
+            if decision.action != "buy" or not fused.contract:
+                continue
+            size = float(size_native or base_size)
+            self._book.add(len(self._events), fused.contract, size, float(out_amt), self.now)
+            self._events.append(
+                {
+                    "event": "buy",
+                    "ts": self.now,
+                    "quote": fused.contract,
+                    "caller": getattr(fused, "caller", None),
+                    "confidence": getattr(fused, "confidence", None),
+                    "score": fused.score,
+                    "size_base": size,
+                    "out_amount": float(out_amt),
+                    "price_impact_bps": int(impact_bps),
+                    "slippage_bps": int(decision.max_slippage_bps),
+                    "reason": decision.reason,
+                }
+            )
+            buys += 1
+            self._echo(f"[trade] buy {fused.contract} size={size:.4f} out={out_amt}")
+
+        if signals:
+            end = max(signals[-1].ts, self.now) + self.horizon_sec
+            exits = self._advance(end)
+            if exits:
+                self._echo(f"[exits] Triggered {exits} exits")
+            values = self._exit_values(np.array([end]))[0] if len(self._book) else []
+            for i in range(len(self._book)):
+                v = float(values[i])
+                self._close(i, end, 0.0 if np.isnan(v) else v, "end_of_data")
+            self._book = ExitBook()
+
+        elapsed = time.perf_counter() - t0
+        return BacktestResult(
+            events=self._events,
+            summary=summarize(self._events, len(signals), buys, elapsed),
+        )
+
+
+def summarize(
+    events: List[Dict[str, Any]], n_signals: int, buys: int, elapsed_sec: float
+) -> Dict[str, Any]:
+    exits = sorted((e for e in events if e["event"] == "exit"), key=lambda e: e["ts"])
+    pnl = 0.0
+    peak = 0.0
+    max_dd = 0.0
+    wins = 0
+    reasons: Dict[str, int] = {}
+    for e in exits:
+        pnl += e["pnl_base"]
+        peak = max(peak, pnl)
+        max_dd = max(max_dd, peak - pnl)
+        wins += e["pnl_base"] > 0
+        reasons[e["reason"]] = reasons.get(e["reason"], 0) + 1
+    return {
+        "signals": n_signals,
+        "buys": buys,
+        "closed": len(exits),
+        "wins": wins,
+        "win_rate": wins / len(exits) if exits else 0.0,
+        "pnl_base": pnl,
+        "max_drawdown_base": max_dd,
+        "exit_reasons": reasons,
+        "elapsed_ms": elapsed_sec * 1000.0,
+        "signals_per_sec": n_signals / elapsed_sec if elapsed_sec > 0 else 0.0,
+    }
+
+
+def _results_path() -> Path:
+    d = Path(os.getenv("MEMEBOT_DATA_DIR", "./data")) / "backtest"
+    d.mkdir(parents=True, exist_ok=True)
+    return d / f"backtest_{time.strftime('%Y%m%d_%H%M%S')}.jsonl"
+
+
+def write_results(result: BacktestResult, path: Optional[Path] = None) -> Path:
+    path = path or _results_path()
+    lines = [json.dumps(e) for e in result.events]
+    lines.append(json.dumps({"event": "summary", **result.summary}))
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
 @app.command()
 def run(
     file: str = typer.Argument(..., help="Path to signals JSONL file"),
@@ -47,6 +301,15 @@ def run(
     ignore_decay: bool = typer.Option(False, help="Ignore score decay"),
     ignore_allowlist: bool = typer.Option(False, help="Ignore caller allowlist"),
     enable_exits: bool = typer.Option(True, help="Run exits inline during backtest"),
+    quotes: Optional[str] = typer.Option(
+        None, help="Recorded quotes JSONL (ts, mint, out_per_sol); synthetic if omitted"
+    ),
+    seed: int = typer.Option(0, help="Synthetic quote seed"),
+    vol_pct: float = typer.Option(5.0, help="Synthetic per-step volatility %"),
+    drift_pct: float = typer.Option(0.0, help="Synthetic per-step drift %"),
+    step_sec: float = typer.Option(5.0, help="Synthetic quote interval"),
+    horizon_sec: float = typer.Option(3600.0, help="Replay exits this long past the last signal"),
+    out: Optional[str] = typer.Option(None, help="Results path (default data/backtest/)"),
 ):
     path = Path(file)
     if not path.exists():
@@ -55,59 +318,31 @@ def run(
     signals = load_signals(path)
     typer.echo(f"Loaded {len(signals)} signals from {file}")
 
-    memory = SignalMemory(decay_seconds=0 if ignore_decay else 60)
-    reset_trades()
-    exit_manager = ExitManager() if enable_exits else None
-
-    buys = 0
-    for sig in signals:
-        fused = memory.fuse(sig)
-
-        if debug:
-            typer.echo(
-                f"[fuse] {fused.platform} src={fused.source} score={fused.score:.2f}"
-            )
-
-        if fused.score < 1.0:
-            continue
-
-        base_size = float(settings.base_size_sol or 0.05)
-        ok, reason, _, out_amt, impact_bps = plan_entry(fused)
-        size_native = base_size
-
-        if not ignore_allowlist and not ok:
-            continue
-
-        decision = decide(
-            SocialSignal(**fused.__dict__), liq_ok=ok, est_price_impact_bps=impact_bps
+    if quotes:
+        source: QuoteSource = RecordedQuotes.load(Path(quotes))
+    else:
+        source = SyntheticQuotes(
+            seed=seed, step_sec=step_sec, vol_pct=vol_pct, drift_pct=drift_pct
         )
-        if decision.action == "buy":
-            trade = PaperTrade(
-                ts=fused.ts,
-                chain=settings.network,
-                side="buy",
-                base="SOL",
-                quote=fused.contract or "",
-                size_base=size_native,
-                out_amount=float(out_amt),
-                price_impact_bps=int(impact_bps),
-                slippage_bps=int(decision.max_slippage_bps),
-                reason=decision.reason,
-            )
-            append_trade(trade)
-            buys += 1
-            if debug:
-                typer.echo(f"[trade] {trade}")
-
-        if enable_exits:
-            if exit_manager is not None:
-                exits = exit_manager.tick_exits(mode="paper", debug=debug)
-            if exits and debug:
-                typer.echo(f"[exits] Triggered {len(exits)} exits")
-
-    typer.echo(f"Completed {buys} buys")
-    typer.echo(f"Total trades recorded: {len(get_all_trades())}")
-    typer.echo("Use `python -m memebot.tools.pnl_cli` to analyse PnL in detail.")
+    bt = Backtester(
+        source,
+        decay_seconds=0 if ignore_decay else 60,
+        ignore_allowlist=ignore_allowlist,
+        enable_exits=enable_exits,
+        horizon_sec=horizon_sec,
+        debug=debug,
+    )
+    result = bt.run(signals)
+    s = result.summary
+
+    typer.echo(f"Completed {s['buys']} buys")
+    typer.echo(
+        f"Closed {s['closed']} positions: pnl={s['pnl_base']:.4f} SOL "
+        f"win_rate={s['win_rate']:.0%} max_dd={s['max_drawdown_base']:.4f} SOL"
+    )
+    typer.echo(f"Replayed in {s['elapsed_ms']:.1f}ms ({s['signals_per_sec']:.0f} signals/s)")
+    written = write_results(result, Path(out) if out else None)
+    typer.echo(f"Results written to {written}")
 
 
 def main(argv=None):
@@ -0,0 +1,214 @@
+"""Parallel parameter sweep over the offline backtester.
+
+Signals and quotes are loaded once in the parent and shared read-only with
+worker processes through ``fork``; each worker only receives a small dict of
+parameters per combination. Results are ranked into a table and written to
+``data/backtest/sweep_<ts>.csv``.
+"""
+
+import os
+import csv
+import sys
+import time
+import itertools
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import typer
+
+import memebot.strategy.simple as simple
+from memebot.backtest.runner import Backtester, load_signals
+from memebot.backtest.quotes import QuoteSource, RecordedQuotes, SyntheticQuotes
+from memebot.exec.positions import ENV_EXIT_RULES
+from memebot.strategy.fusion import Signal
+
+app = typer.Typer(add_completion=False)
+
+PARAM_KEYS = (
+    "min_confidence",
+    "max_slippage_bps",
+    "size_by_conf",
+    "caller_allowlist",
+    "tp_pct",
+    "sl_pct",
+    "trail_pct",
+)
+RESULT_KEYS = ("buys", "closed", "wins", "win_rate", "pnl_base", "max_drawdown_base")
+
+# Set in the parent before the pool forks; workers read them copy-on-write.
+_SIGNALS: List[Signal] = []
+_QUOTES: Optional[QuoteSource] = None
+_OPTIONS: Dict[str, Any] = {}
+
+
+def param_grid(**values: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Cartesian product of the given parameter lists (empty lists are skipped)."""
+    keys = [k for k in PARAM_KEYS if values.get(k)]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(values[k] for k in keys))]
+
+
+def _apply(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Install strategy params in this process; returns what to restore."""
+    saved = {
+        "MIN_CONFIDENCE": simple.MIN_CONFIDENCE,
+        "MAX_SLIPPAGE_BPS": simple.MAX_SLIPPAGE_BPS,
+        "SIZE_BY_CONF": os.environ.get("SIZE_BY_CONF"),
+        "CALLER_ALLOWLIST": os.environ.get("CALLER_ALLOWLIST"),
+    }
+    if "min_confidence" in params:
+        simple.MIN_CONFIDENCE = float(params["min_confidence"])
+    if "max_slippage_bps" in params:
+        simple.MAX_SLIPPAGE_BPS = int(params["max_slippage_bps"])
+    for key, env in (("size_by_conf", "SIZE_BY_CONF"), ("caller_allowlist", "CALLER_ALLOWLIST")):
+        if key in params:
+            os.environ[env] = params[key]
+    return saved
+
+
+def _restore(saved: Dict[str, Any]) -> None:
+    simple.MIN_CONFIDENCE = saved["MIN_CONFIDENCE"]
+    simple.MAX_SLIPPAGE_BPS = saved["MAX_SLIPPAGE_BPS"]
+    for env in ("SIZE_BY_CONF", "CALLER_ALLOWLIST"):
+        if saved[env] is None:
+            os.environ.pop(env, None)
+        else:
+            os.environ[env] = saved[env]
+
+
+def run_combo(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Backtest one parameter set against the shared signals and quotes."""
+    assert _QUOTES is not None
+    rules = ENV_EXIT_RULES()
+    rules.tp_pct = float(params.get("tp_pct", rules.tp_pct))
+    rules.sl_pct = float(params.get("sl_pct", rules.sl_pct))
+    rules.trail_pct = float(params.get("trail_pct", rules.trail_pct))
+    saved = _apply(params)
+    try:
+        result = Backtester(_QUOTES, rules=rules, **_OPTIONS).run(_SIGNALS)
+    finally:
+        _restore(saved)
+    row = dict(params)
+    row.update({k: result.summary[k] for k in RESULT_KEYS})
+    return row
+
+
+def sweep(
+    signals: List[Signal],
+    quotes: QuoteSource,
+    grid: List[Dict[str, Any]],
+    workers: int = 0,
+    rank_by: str = "pnl_base",
+    **options: Any,
+) -> List[Dict[str, Any]]:
+    """Run every combination in ``grid`` and return rows ranked by ``rank_by``.
+
+    ``workers`` <= 1 runs inline; otherwise a fork-based process pool of that
+    size (0 = one per CPU) shares the loaded data without pickling it.
+    """
+    global _SIGNALS, _QUOTES, _OPTIONS
+    _SIGNALS, _QUOTES, _OPTIONS = signals, quotes, options
+    # Anchor synthetic paths in the parent so every worker inherits them
+    for s in signals:
+        if s.contract:
+            quotes.prime(s.contract, s.ts)
+
+    n = workers or os.cpu_count() or 1
+    if n <= 1 or len(grid) <= 1 or "fork" not in mp.get_all_start_methods():
+        rows = [run_combo(p) for p in grid]
+    else:
+        chunk = max(1, len(grid) // (n * 4))
+        with ProcessPoolExecutor(max_workers=n, mp_context=mp.get_context("fork")) as pool:
+            rows = list(pool.map(run_combo, grid, chunksize=chunk))
+    rows.sort(key=lambda r: r[rank_by], reverse=True)
+    for i, r in enumerate(rows, 1):
+        r["rank"] = i
+    return rows
+
+
+def _results_path() -> Path:
+    d = Path(os.getenv("MEMEBOT_DATA_DIR", "./data")) / "backtest"
+    d.mkdir(parents=True, exist_ok=True)
+    return d / f"sweep_{time.strftime('%Y%m%d_%H%M%S')}.csv"
+
+
+def write_table(rows: List[Dict[str, Any]], path: Optional[Path] = None) -> Path:
+    path = path or _results_path()
+    fields = ["rank"] + [k for k in PARAM_KEYS if rows and k in rows[0]] + list(RESULT_KEYS)
+    with path.open("w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        w.writeheader()
+        w.writerows(rows)
+    return path
+
+
+def format_table(rows: List[Dict[str, Any]], top: int = 20) -> str:
+    if not rows:
+        return "(no combinations)"
+    fields = ["rank"] + [k for k in PARAM_KEYS if k in rows[0]] + list(RESULT_KEYS)
+
+    def cell(v: Any) -> str:
+        return f"{v:.4f}" if isinstance(v, float) else str(v)
+
+    body = [[cell(r[k]) for k in fields] for r in rows[:top]]
+    widths = [max(len(k), *(len(b[i]) for b in body)) for i, k in enumerate(fields)]
+    lines = ["  ".join(k.ljust(w) for k, w in zip(fields, widths))]
+    lines += ["  ".join(v.ljust(w) for v, w in zip(b, widths)) for b in body]
+    return "\n".join(lines)
+
+
+@app.command()
+def run(
+    file: str = typer.Argument(..., help="Path to signals JSONL file"),
+    quotes: Optional[str] = typer.Option(None, help="Recorded quotes JSONL; synthetic if omitted"),
+    seed: int = typer.Option(0, help="Synthetic quote seed"),
+    min_confidence: List[float] = typer.Option([], help="MIN_CONFIDENCE values (repeat)"),
+    max_slippage_bps: List[int] = typer.Option([], help="MAX_SLIPPAGE_BPS values (repeat)"),
+    size_by_conf: List[str] = typer.Option([], help="SIZE_BY_CONF tables (repeat)"),
+    caller_allowlist: List[str] = typer.Option([], help="CALLER_ALLOWLIST tables (repeat)"),
+    tp_pct: List[float] = typer.Option([], help="Take-profit % values (repeat)"),
+    sl_pct: List[float] = typer.Option([], help="Stop-loss % values (repeat)"),
+    trail_pct: List[float] = typer.Option([], help="Trailing % values (repeat)"),
+    workers: int = typer.Option(0, help="Worker processes (0 = one per CPU)"),
+    rank_by: str = typer.Option("pnl_base", help="Result column to rank by"),
+    top: int = typer.Option(20, help="Rows to print"),
+    horizon_sec: float = typer.Option(3600.0, help="Replay exits this long past the last signal"),
+    out: Optional[str] = typer.Option(None, help="CSV path (default data/backtest/)"),
+):
+    path = Path(file)
+    if not path.exists():
+        raise typer.BadParameter(f"File {file} not found")
+    if rank_by not in RESULT_KEYS:
+        raise typer.BadParameter(f"rank_by must be one of {', '.join(RESULT_KEYS)}")
+
+    signals = load_signals(path)
+    source: QuoteSource = RecordedQuotes.load(Path(quotes)) if quotes else SyntheticQuotes(seed=seed)
+    grid = param_grid(
+        min_confidence=min_confidence,
+        max_slippage_bps=max_slippage_bps,
+        size_by_conf=size_by_conf,
+        caller_allowlist=caller_allowlist,
+        tp_pct=tp_pct,
+        sl_pct=sl_pct,
+        trail_pct=trail_pct,
+    )
+    typer.echo(f"Loaded {len(signals)} signals; sweeping {len(grid)} combinations")
+
+    t0 = time.perf_counter()
+    rows = sweep(signals, source, grid, workers=workers, rank_by=rank_by, horizon_sec=horizon_sec)
+    elapsed = time.perf_counter() - t0
+
+    typer.echo(format_table(rows, top=top))
+    typer.echo(f"Swept {len(rows)} combinations in {elapsed:.2f}s")
+    written = write_table(rows, Path(out) if out else None)
+    typer.echo(f"Results written to {written}")
+
+
+def main(argv=None):
+    argv = argv or sys.argv[1:]
+    app(argv)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    app()
@@ -0,0 +1,247 @@
+"""Signal-to-PnL attribution per caller, source and platform.
+
+When a position is opened from a signal, ``link`` records who called it
+(platform, source, caller). When the position closes, ``record_close``
+fills in the realized return and time-to-peak on that link and folds the
+outcome into running stats for each dimension. Stats are exponentially
+decayed sums (half-life ``ATTRIBUTION_HALF_LIFE_DAYS``), so one close is
+an O(1) update and old results fade out without keeping a window of rows.
+
+Everything lives in ``attribution.db`` (SQLite, indexed on caller and
+close time) next to the position store. The stats are also kept in a dict
+so ``stats(dim, key)`` never touches the database.
+"""
+
+import os
+import math
+import pathlib
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+DIMS = ("caller", "source", "platform")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signal_links (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pos_id INTEGER NOT NULL,
+    platform TEXT NOT NULL,
+    source TEXT NOT NULL,
+    caller TEXT NOT NULL,
+    ts_signal REAL,
+    quote TEXT NOT NULL,
+    ts_open REAL NOT NULL,
+    ts_close REAL,
+    pnl_base REAL,
+    ret REAL,
+    time_to_peak_sec REAL
+);
+CREATE INDEX IF NOT EXISTS ix_links_open ON signal_links(pos_id) WHERE ts_close IS NULL;
+CREATE INDEX IF NOT EXISTS ix_links_caller ON signal_links(caller, ts_close);
+
+CREATE TABLE IF NOT EXISTS attribution_stats (
+    dim TEXT NOT NULL,
+    key TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    weight REAL NOT NULL,
+    wins REAL NOT NULL,
+    ret_sum REAL NOT NULL,
+    ttp_sum REAL NOT NULL,
+    ttp_weight REAL NOT NULL,
+    last_ts REAL NOT NULL,
+    PRIMARY KEY (dim, key)
+);
+"""
+
+_STAT_COLS = ("n", "weight", "wins", "ret_sum", "ttp_sum", "ttp_weight", "last_ts")
+
+
+@dataclass(frozen=True)
+class PerfStats:
+    """Decayed performance of one caller/source/platform."""
+
+    n: int = 0
+    weight: float = 0.0
+    wins: float = 0.0
+    ret_sum: float = 0.0
+    ttp_sum: float = 0.0
+    ttp_weight: float = 0.0
+    last_ts: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.wins / self.weight if self.weight else 0.0
+
+    @property
+    def avg_return(self) -> float:
+        """Mean realized return as a fraction of the entry size."""
+        return self.ret_sum / self.weight if self.weight else 0.0
+
+    @property
+    def avg_time_to_peak_sec(self) -> Optional[float]:
+        return self.ttp_sum / self.ttp_weight if self.ttp_weight else None
+
+    def effective_n(self, now: float, half_life_sec: float) -> float:
+        """Decayed sample size as of ``now``."""
+        return self.weight * _decay(now - self.last_ts, half_life_sec)
+
+    def updated(
+        self, ts: float, ret: float, ttp: Optional[float], half_life_sec: float
+    ) -> "PerfStats":
+        d = _decay(ts - self.last_ts, half_life_sec) if self.n else 1.0
+        return PerfStats(
+            n=self.n + 1,
+            weight=self.weight * d + 1.0,
+            wins=self.wins * d + (1.0 if ret > 0 else 0.0),
+            ret_sum=self.ret_sum * d + ret,
+            ttp_sum=self.ttp_sum * d + (ttp or 0.0),
+            ttp_weight=self.ttp_weight * d + (1.0 if ttp is not None else 0.0),
+            last_ts=max(ts, self.last_ts),
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "n": self.n,
+            "weight": self.weight,
+            "hit_rate": self.hit_rate,
+            "avg_return": self.avg_return,
+            "avg_time_to_peak_sec": self.avg_time_to_peak_sec,
+            "last_ts": self.last_ts,
+        }
+
+
+def _decay(dt: float, half_life_sec: float) -> float:
+    if dt <= 0 or half_life_sec <= 0:
+        return 1.0
+    return math.pow(0.5, dt / half_life_sec)
+
+
+def signal_keys(signal: Any) -> Dict[str, str]:
+    """``{dim: key}`` for a signal; callers are case-folded like the allowlist."""
+    return {
+        "caller": (getattr(signal, "caller", None) or "").lower(),
+        "source": getattr(signal, "source", None) or "",
+        "platform": getattr(signal, "platform", None) or "",
+    }
+
+
+class AttributionStore:
+    def __init__(self, db_path: pathlib.Path, half_life_sec: float = 7 * 86_400.0):
+        self.db_path = pathlib.Path(db_path)
+        self.half_life_sec = float(half_life_sec)
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.db_path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._stats: Dict[Tuple[str, str], PerfStats] = {
+            (r["dim"], r["key"]): PerfStats(**{c: r[c] for c in _STAT_COLS})
+            for r in self._conn.execute("SELECT * FROM attribution_stats")
+        }
+
+    @classmethod
+    def from_env(cls, data_dir: pathlib.Path) -> "AttributionStore":
+        days = float(os.getenv("ATTRIBUTION_HALF_LIFE_DAYS", "7") or 7)
+        return cls(pathlib.Path(data_dir) / "attribution.db", half_life_sec=days * 86_400.0)
+
+    def link(self, pos_id: int, signal: Any, ts_open: float, quote: str) -> None:
+        keys = signal_keys(signal)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO signal_links "
+                "(pos_id, platform, source, caller, ts_signal, quote, ts_open) "
+                "VALUES (?,?,?,?,?,?,?)",
+                (
+                    int(pos_id),
+                    keys["platform"],
+                    keys["source"],
+                    keys["caller"],
+                    getattr(signal, "timestamp", None) or getattr(signal, "ts", None),
+                    quote,
+                    float(ts_open),
+                ),
+            )
+
+    def record_close(
+        self, pos_id: int, closed: Dict[str, Any], peak_ts: Optional[float] = None
+    ) -> bool:
+        """Realize a linked position; False if it was not opened from a signal."""
+        ts_close = float(closed["ts_close"])
+        entry = float(closed.get("entry_base") or 0.0)
+        pnl = float(closed.get("pnl_base") or 0.0)
+        ret = pnl / entry if entry > 0 else 0.0
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, platform, source, caller, ts_open FROM signal_links "
+                "WHERE pos_id=? AND ts_close IS NULL ORDER BY id DESC LIMIT 1",
+                (int(pos_id),),
+            ).fetchone()
+            if row is None:
+                return False
+            ttp = max(0.0, peak_ts - row["ts_open"]) if peak_ts is not None else None
+            updated = {}
+            for dim in DIMS:
+                key = row[dim]
+                if key:
+                    prev = self._stats.get((dim, key), PerfStats())
+                    updated[(dim, key)] = prev.updated(ts_close, ret, ttp, self.half_life_sec)
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "UPDATE signal_links SET ts_close=?, pnl_base=?, ret=?, time_to_peak_sec=? "
+                    "WHERE id=?",
+                    (ts_close, pnl, ret, ttp, row["id"]),
+                )
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO attribution_stats (dim, key, {','.join(_STAT_COLS)}) "
+                    f"VALUES (?,?,{','.join('?' * len(_STAT_COLS))})",
+                    [(d, k, *(getattr(st, c) for c in _STAT_COLS)) for (d, k), st in updated.items()],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._stats.update(updated)
+        return True
+
+    def stats(self, dim: str, key: str) -> Optional[PerfStats]:
+        if dim == "caller":
+            key = key.lower()
+        return self._stats.get((dim, key))
+
+    def table(self, dim: str, min_n: int = 0) -> Dict[str, PerfStats]:
+        return {k: st for (d, k), st in list(self._stats.items()) if d == dim and st.n >= min_n}
+
+    def close_store(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_attr: Optional[AttributionStore] = None
+_attr_dir: Optional[str] = None
+_attr_lock = threading.Lock()
+
+
+def get_attribution() -> AttributionStore:
+    """Process-wide attribution store for ``MEMEBOT_DATA_DIR``."""
+    global _attr, _attr_dir
+    data_dir = os.getenv("MEMEBOT_DATA_DIR", "./data")
+    with _attr_lock:
+        if _attr is None or _attr_dir != data_dir:
+            if _attr is not None:
+                _attr.close_store()
+            _attr, _attr_dir = AttributionStore.from_env(pathlib.Path(data_dir)), data_dir
+        return _attr
+
+
+def reset_attribution() -> None:
+    global _attr, _attr_dir
+    with _attr_lock:
+        if _attr is not None:
+            _attr.close_store()
+        _attr, _attr_dir = None, None
@@ -0,0 +1,160 @@
+"""Vectorized TP/SL/trailing exit evaluation.
+
+The open book is held as parallel NumPy columns (``ExitBook``) and each tick
+evaluates every position with a handful of array masks instead of a Python
+loop. Live ``tick_exits`` scans one tick, the backtester a whole window of
+ticks; both go through ``scan_exits``, so they apply identical rules.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+import numpy as np
+
+NO_EXIT = 0
+TAKE_PROFIT = 1
+STOP_LOSS = 2
+TRAILING_EXIT = 3
+REASONS = ("", "take_profit", "stop_loss", "trailing_exit")
+
+
+@dataclass
+class ExitScan:
+    reason: np.ndarray  # int8 codes into REASONS, per position
+    row: np.ndarray  # tick index of the exit (0 where still open)
+    pnl_pct: np.ndarray  # PnL at that tick
+    exit_base: np.ndarray  # exit value at that tick
+    peak_pnl_pct: np.ndarray  # peak after the scan (NaN if never evaluated)
+    evaluated: np.ndarray  # bool: had a quote past min hold at some tick
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.reason != NO_EXIT
+
+
+def scan_exits(
+    entry_base: np.ndarray,
+    exit_base: np.ndarray,
+    tick_ts: Any,
+    ts_open: np.ndarray,
+    peak_pnl_pct: np.ndarray,
+    rules: Any,
+) -> ExitScan:
+    """Apply ``rules`` to every position over a run of ticks at once.
+
+    ``exit_base`` is ``ticks x positions`` (a 1-D array is one tick) with
+    NaN where a position has no quote; ``peak_pnl_pct`` is NaN where no peak
+    is recorded yet (the current PnL is used). The trailing peak is a running
+    max down each column, and each position exits at its first hit. A single
+    tick applies TP, then SL, then the trailing stop, in that order.
+    """
+    entry = np.asarray(entry_base, dtype=np.float64)
+    ex = np.atleast_2d(np.asarray(exit_base, dtype=np.float64))
+    ts = np.atleast_1d(np.asarray(tick_ts, dtype=np.float64))
+    peak0 = np.asarray(peak_pnl_pct, dtype=np.float64)
+    n = len(entry)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pnl = np.where(entry == 0, 0.0, (ex - entry) / entry * 100.0)
+    valid = ~np.isnan(ex) & ((ts[:, None] - np.asarray(ts_open)[None, :]) >= rules.min_hold_sec)
+
+    # Peak recorded before each tick: fmax skips NaN (unevaluated) cells
+    peaks = np.fmax.accumulate(np.vstack([peak0[None, :], np.where(valid, pnl, np.nan)]), axis=0)
+    prev = peaks[:-1]
+    cur_peak = np.where(np.isnan(prev), pnl, prev)
+
+    tp = valid & (pnl >= rules.tp_pct)
+    sl = valid & ~tp & (pnl <= rules.sl_pct)
+    trail = valid & ~tp & ~sl & ((cur_peak - pnl) >= rules.trail_pct)
+    hit = tp | sl | trail
+
+    closes = hit.any(axis=0)
+    row = np.where(closes, hit.argmax(axis=0), 0)
+    cols = np.arange(n)
+    codes = np.where(
+        tp[row, cols], TAKE_PROFIT, np.where(sl[row, cols], STOP_LOSS, TRAILING_EXIT)
+    )
+    reason = np.where(closes, codes, NO_EXIT).astype(np.int8)
+    pnl_at = pnl[row, cols]
+    peak = np.where(
+        closes, np.where(reason == TRAILING_EXIT, cur_peak[row, cols], pnl_at), peaks[-1]
+    )
+    return ExitScan(
+        reason=reason,
+        row=row,
+        pnl_pct=pnl_at,
+        exit_base=ex[row, cols],
+        peak_pnl_pct=peak,
+        evaluated=valid.any(axis=0),
+    )
+
+
+class ExitBook:
+    """Columnar open book: one NumPy array per field, plus row keys."""
+
+    FIELDS = ("entry_base", "entry_out_raw", "ts_open", "peak_pnl_pct", "exit_base")
+
+    def __init__(self) -> None:
+        self.keys: List[Hashable] = []
+        self.mints: List[str] = []
+        self.entry_base = np.empty(0)
+        self.entry_out_raw = np.empty(0)
+        self.ts_open = np.empty(0)
+        self.peak_pnl_pct = np.empty(0)
+        self.exit_base = np.empty(0)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]], key: str = "id") -> "ExitBook":
+        book = cls()
+        rows = list(rows)
+        book.keys = [r.get(key) for r in rows]
+        book.mints = [str(r.get("quote")) for r in rows]
+        book.entry_base = np.array([float(r.get("entry_base", 0.0)) for r in rows])
+        book.entry_out_raw = np.array([float(r.get("entry_out_raw", 0.0)) for r in rows])
+        book.ts_open = np.array([float(r.get("ts_open", 0.0)) for r in rows])
+        peaks = [r.get("peak_pnl_pct") for r in rows]
+        book.peak_pnl_pct = np.array([np.nan if p is None else float(p) for p in peaks])
+        book.exit_base = np.full(len(rows), np.nan)
+        return book
+
+    def add(
+        self,
+        key: Hashable,
+        mint: str,
+        entry_base: float,
+        entry_out_raw: float,
+        ts_open: float,
+        peak_pnl_pct: Optional[float] = None,
+    ) -> None:
+        self.keys.append(key)
+        self.mints.append(mint)
+        self.entry_base = np.append(self.entry_base, float(entry_base))
+        self.entry_out_raw = np.append(self.entry_out_raw, float(entry_out_raw))
+        self.ts_open = np.append(self.ts_open, float(ts_open))
+        self.peak_pnl_pct = np.append(
+            self.peak_pnl_pct, np.nan if peak_pnl_pct is None else float(peak_pnl_pct)
+        )
+        self.exit_base = np.append(self.exit_base, np.nan)
+
+    def evaluate(self, now: float, rules: Any) -> ExitScan:
+        """One tick against the ``exit_base`` column; stores the new peaks."""
+        return self.scan(np.array([now]), self.exit_base, rules)
+
+    def scan(self, tick_ts: np.ndarray, exit_base: np.ndarray, rules: Any) -> ExitScan:
+        """Several ticks (``ticks x positions`` exit values); stores the new peaks."""
+        res = scan_exits(
+            self.entry_base, exit_base, tick_ts, self.ts_open, self.peak_pnl_pct, rules
+        )
+        self.peak_pnl_pct = res.peak_pnl_pct
+        return res
+
+    def remove(self, mask: np.ndarray) -> None:
+        keep = ~np.asarray(mask, dtype=bool)
+        idx = np.flatnonzero(keep)
+        self.keys = [self.keys[i] for i in idx]
+        self.mints = [self.mints[i] for i in idx]
+        for f in self.FIELDS:
+            setattr(self, f, getattr(self, f)[keep])
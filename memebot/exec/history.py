@@ -0,0 +1,263 @@
+"""Columnar history of paper trades and closed positions.
+
+Rows are stored column-wise under ``<root>/<table>/day=YYYY-MM-DD/`` as one
+file per appended batch: Parquet when ``pyarrow`` is installed, otherwise
+NumPy ``.npz`` (one array per column). This is an export for offline
+analysis (pandas, DuckDB, NumPy); the bot's own PnL queries are answered by
+``exec.pnl``'s running aggregates.
+
+``sync_csv`` appends whatever was added to a CSV journal since the last
+sync (a byte-offset watermark per table); if the CSV was rewritten the
+table is rebuilt from scratch. ``compact`` merges a day's parts into one
+file once a day has accumulated more than ``HISTORY_COMPACT_PARTS``.
+"""
+
+import os
+import csv
+import json
+import time
+import hashlib
+import pathlib
+import shutil
+import itertools
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from memebot.exec.store import CLOSED_FIELDS
+from memebot.exec.paper import TRADE_FIELDS
+
+# Optional deps (used if present)
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+
+    HAVE_PYARROW = True
+except Exception:
+    HAVE_PYARROW = False
+
+_STR_FIELDS = {"chain", "side", "base", "quote", "reason"}
+
+# table -> (timestamp column, column order)
+TABLES: Dict[str, tuple] = {
+    "closed": ("ts_close", tuple(CLOSED_FIELDS)),
+    "trades": ("ts", tuple(TRADE_FIELDS)),
+}
+
+_TAIL = 4096
+_seq = itertools.count()
+
+
+def _is_str(col: str) -> bool:
+    return col in _STR_FIELDS
+
+
+def _to_float(v: object) -> float:
+    try:
+        return float(v)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def columns_from_rows(table: str, rows: Iterable[Dict[str, object]]) -> Dict[str, np.ndarray]:
+    """Row dicts -> typed column arrays (missing fields become 0.0 / "")."""
+    _, cols = TABLES[table]
+    rows = list(rows)
+    out: Dict[str, np.ndarray] = {}
+    for c in cols:
+        if _is_str(c):
+            out[c] = np.array([str(r.get(c) or "") for r in rows], dtype=str)
+        else:
+            out[c] = np.array([_to_float(r.get(c)) for r in rows], dtype=np.float64)
+    return out
+
+
+class HistoryStore:
+    def __init__(self, root: pathlib.Path, fmt: Optional[str] = None):
+        self.root = pathlib.Path(root)
+        self.fmt = fmt or ("parquet" if HAVE_PYARROW else "npz")
+        if self.fmt == "parquet" and not HAVE_PYARROW:
+            raise RuntimeError("pyarrow not installed")
+
+    # --- layout ---
+
+    def _table_dir(self, table: str) -> pathlib.Path:
+        if table not in TABLES:
+            raise KeyError(f"unknown history table {table!r}")
+        return self.root / table
+
+    def days(self, table: str) -> List[str]:
+        d = self._table_dir(table)
+        if not d.exists():
+            return []
+        return sorted(p.name[4:] for p in d.iterdir() if p.is_dir() and p.name.startswith("day="))
+
+    def _parts(self, table: str, day: str) -> List[pathlib.Path]:
+        d = self._table_dir(table) / f"day={day}"
+        return sorted(p for p in d.iterdir() if p.suffix in (".parquet", ".npz"))
+
+    # --- write ---
+
+    def _write_part(self, path: pathlib.Path, cols: Dict[str, np.ndarray]) -> None:
+        tmp = path.with_name(path.name + ".tmp")
+        if self.fmt == "parquet":
+            pq.write_table(pa.table({k: v for k, v in cols.items()}), tmp)
+        else:
+            with open(tmp, "wb") as f:
+                np.savez(f, **cols)
+        os.replace(tmp, path)
+
+    def append(self, table: str, cols: Dict[str, np.ndarray]) -> int:
+        """Append a column batch, one new part per UTC day it spans."""
+        ts_col, names = TABLES[table]
+        ts = cols[ts_col]
+        if not len(ts):
+            return 0
+        day_idx = np.floor(ts / 86_400).astype(np.int64)
+        for idx in np.unique(day_idx):
+            mask = day_idx == idx
+            d = self._table_dir(table) / f"day={_day(int(idx) * 86_400)}"
+            d.mkdir(parents=True, exist_ok=True)
+            name = f"part-{time.time_ns()}-{next(_seq)}.{self.fmt}"
+            self._write_part(d / name, {c: cols[c][mask] for c in names})
+        return int(len(ts))
+
+    # --- read ---
+
+    def _read_part(self, path: pathlib.Path, columns: Sequence[str]) -> Dict[str, np.ndarray]:
+        if path.suffix == ".parquet":
+            t = pq.read_table(path, columns=list(columns))
+            return {c: t.column(c).to_numpy(zero_copy_only=False) for c in columns}
+        with np.load(path) as z:  # npz members are decompressed on access only
+            return {c: z[c] for c in columns}
+
+    # --- maintenance ---
+
+    def compact(self, table: str, max_parts: Optional[int] = None) -> int:
+        """Merge days with more than ``max_parts`` parts; returns days merged."""
+        if max_parts is None:
+            max_parts = int(os.getenv("HISTORY_COMPACT_PARTS", "16") or 16)
+        _, names = TABLES[table]
+        merged = 0
+        for day in self.days(table):
+            parts = self._parts(table, day)
+            if len(parts) <= max_parts:
+                continue
+            data = [self._read_part(p, names) for p in parts]
+            cols = {c: np.concatenate([d[c] for d in data]) for c in names}
+            self._write_part(parts[0].with_name(f"part-{time.time_ns()}-{next(_seq)}.{self.fmt}"), cols)
+            for p in parts:
+                p.unlink()
+            merged += 1
+        return merged
+
+    def clear(self, table: str) -> None:
+        shutil.rmtree(self._table_dir(table), ignore_errors=True)
+
+    # --- CSV ingest ---
+
+    def _mark_path(self, table: str) -> pathlib.Path:
+        return self._table_dir(table) / "_source.json"
+
+    def sync_csv(self, table: str, csv_path: pathlib.Path) -> int:
+        """Append rows added to ``csv_path`` since the last sync."""
+        csv_path = pathlib.Path(csv_path)
+        if not csv_path.exists():
+            return 0
+        mark_path = self._mark_path(table)
+        try:
+            mark = json.loads(mark_path.read_text())
+        except (OSError, ValueError):
+            mark = {}
+        rows, mark, rewritten = read_csv_tail(csv_path, mark)
+        if rewritten:
+            self.clear(table)
+        n = self.append(table, columns_from_rows(table, rows)) if rows else 0
+        mark_path.parent.mkdir(parents=True, exist_ok=True)
+        mark_path.write_text(json.dumps(mark))
+        if n:
+            self.compact(table)
+        return n
+
+
+def read_csv_tail(
+    csv_path: pathlib.Path, mark: Dict[str, Any]
+) -> Tuple[List[Dict[str, str]], Dict[str, Any], bool]:
+    """Rows appended to ``csv_path`` since ``mark`` (a previous return value).
+
+    Returns ``(rows, new_mark, rewritten)``; ``rewritten`` means the file no
+    longer extends the one ``mark`` was taken from, and ``rows`` then holds
+    the whole file. Only complete lines are returned; a half-written row is
+    picked up next time.
+    """
+    rows, _, new_mark, rewritten = read_csv_tail_spans(csv_path, mark)
+    return rows, new_mark, rewritten
+
+
+def read_csv_tail_spans(
+    csv_path: pathlib.Path, mark: Dict[str, Any]
+) -> Tuple[List[Dict[str, str]], List[Tuple[int, int]], Dict[str, Any], bool]:
+    """``read_csv_tail`` plus the ``(start, end)`` byte span of each row.
+
+    Spans can be handed back to ``read_csv_range`` to re-read those rows.
+    """
+    size = csv_path.stat().st_size
+    with open(csv_path, "rb") as f:
+        header = f.readline()
+        offset = int(mark.get("offset", 0))
+        rewritten = (
+            mark.get("path") != str(csv_path)
+            or mark.get("header") != header.decode(errors="replace")
+            or offset > size
+            or _tail_hash(f, offset) != mark.get("tail")
+        )
+        if rewritten:
+            offset = len(header)
+        f.seek(offset)
+        raw = f.read()
+        end = raw.rfind(b"\n") + 1
+        tail = _tail_hash(f, offset + end)
+    lines = raw[:end].splitlines(keepends=True)
+    spans = []
+    pos = offset
+    for line in lines:
+        spans.append((pos, pos + len(line)))
+        pos += len(line)
+    new_mark = {
+        "path": str(csv_path),
+        "header": header.decode(errors="replace"),
+        "offset": offset + end,
+        "tail": tail,
+    }
+    return _parse_rows(header, lines), spans, new_mark, rewritten
+
+
+def read_csv_range(csv_path: pathlib.Path, start: int, end: int) -> List[Dict[str, str]]:
+    """Rows whose lines lie in bytes ``[start, end)`` of ``csv_path``."""
+    with open(csv_path, "rb") as f:
+        header = f.readline()
+        f.seek(start)
+        raw = f.read(max(0, end - start))
+    return _parse_rows(header, raw.splitlines(keepends=True))
+
+
+def _parse_rows(header: bytes, lines: List[bytes]) -> List[Dict[str, str]]:
+    names = next(csv.reader([header.decode()]), [])
+    return list(csv.DictReader(b"".join(lines).decode().splitlines(), fieldnames=names))
+
+
+def _tail_hash(f, offset: int) -> str:
+    """Hash of the bytes just before ``offset`` to detect a rewritten file."""
+    start = max(0, offset - _TAIL)
+    f.seek(start)
+    return hashlib.sha1(f.read(offset - start)).hexdigest()
+
+
+def history_for(csv_path: pathlib.Path) -> HistoryStore:
+    """History store kept next to a CSV journal (``<dir>/history``)."""
+    return HistoryStore(pathlib.Path(csv_path).parent / "history")
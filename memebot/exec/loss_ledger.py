@@ -0,0 +1,170 @@
+"""In-memory daily realized-loss accounting for the daily loss cap.
+
+``DailyLossLedger`` holds the loss realized since the current day boundary.
+``record`` is called as positions close in this process, so ``exceeded(cap)``
+is usually a comparison rather than a scan of the closed book. Closes made
+by other processes (the exits tool, a second bot) are picked up by
+re-reading today's closes from the store (an indexed ``ts_close >= ?``
+query) at most every ``LOSS_LEDGER_SYNC_SEC``. The day rolls over at
+``DAILY_RESET_HOUR_UTC`` (default midnight UTC).
+
+A close is written to the store before it is recorded here, so a sync may
+or may not have seen a close this process also records. Losses are
+therefore kept as counts per ``(ts_close, pnl_base)``, once for local
+records and once for the last sync. Each key counts at the larger of its
+two counts. A close seen by both is counted once, and a close the sync
+missed is still counted.
+"""
+
+import os
+import time
+import pathlib
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from memebot.exec.store import get_store
+
+ClosedSource = Callable[[float], Iterable[Dict[str, Any]]]
+
+DAY_SEC = 86_400
+
+
+class DailyLossLedger:
+    def __init__(
+        self,
+        reset_hour_utc: float = 0.0,
+        clock: Optional[Callable[[], float]] = None,
+        source: Optional[ClosedSource] = None,
+        sync_sec: float = 5.0,
+    ):
+        self.reset_hour_utc = float(reset_hour_utc)
+        self._clock = clock
+        self._source = source
+        self.sync_sec = float(sync_sec)
+        self._synced_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._day = self.day_of(self._now())
+        self._loss = 0.0
+        # (ts_close, pnl_base) -> closes, from record() and from the last sync
+        self._local: Counter = Counter()
+        self._synced: Counter = Counter()
+
+    @classmethod
+    def from_env(cls, **kwargs: Any) -> "DailyLossLedger":
+        return cls(
+            reset_hour_utc=float(os.getenv("DAILY_RESET_HOUR_UTC", "0") or 0),
+            sync_sec=float(os.getenv("LOSS_LEDGER_SYNC_SEC", "5") or 0),
+            **kwargs,
+        )
+
+    def _now(self) -> float:
+        return self._clock() if self._clock else time.time()
+
+    def day_of(self, ts: float) -> int:
+        """Index of the accounting day containing ``ts``."""
+        return int((ts - self.reset_hour_utc * 3600) // DAY_SEC)
+
+    def day_start(self, ts: Optional[float] = None) -> float:
+        """Timestamp of the day boundary at or before ``ts`` (default now)."""
+        day = self.day_of(self._now() if ts is None else ts)
+        return day * DAY_SEC + self.reset_hour_utc * 3600
+
+    def _roll(self, day: int) -> None:
+        if day > self._day:
+            self._day = day
+            self._loss = 0.0
+            self._local.clear()
+            self._synced.clear()
+
+    def record(self, ts_close: float, pnl_base: float) -> None:
+        """Account for one closed position; gains and past days are ignored."""
+        if pnl_base >= 0:
+            return
+        key = (float(ts_close), float(pnl_base))
+        day = self.day_of(ts_close)
+        with self._lock:
+            self._roll(day)
+            if day == self._day:
+                self._local[key] += 1
+                if self._local[key] > self._synced[key]:
+                    self._loss -= pnl_base
+
+    def rebuild(self, closed_rows: Iterable[Dict[str, Any]]) -> None:
+        """Replace the synced view with closed rows (``ts_close``, ``pnl_base``).
+
+        The rows are tallied before the lock is taken, and the swap happens
+        under it, so concurrent ``record`` calls are neither lost nor
+        double counted.
+        """
+        day = self.day_of(self._now())
+        synced: Counter = Counter()
+        for r in closed_rows:
+            ts, pnl = float(r.get("ts_close") or 0.0), float(r.get("pnl_base") or 0.0)
+            if pnl < 0 and self.day_of(ts) == day:
+                synced[(ts, pnl)] += 1
+        with self._lock:
+            self._roll(day)
+            if day != self._day:
+                return  # the rows are from a day that has already rolled over
+            self._synced = synced
+            self._loss = _loss_of(self._local, synced)
+
+    def sync(self) -> None:
+        """Recompute today's loss from ``source`` (every process's closes)."""
+        if self._source is None:
+            return
+        self._synced_at = time.monotonic()
+        self.rebuild(self._source(self.day_start()))
+
+    def _maybe_sync(self) -> None:
+        synced = self._synced_at
+        if self._source is not None and (
+            synced is None or time.monotonic() - synced >= self.sync_sec
+        ):
+            self.sync()
+
+    def loss_today(self) -> float:
+        self._maybe_sync()
+        with self._lock:
+            self._roll(self.day_of(self._now()))
+            return self._loss
+
+    def exceeded(self, cap: float) -> bool:
+        return self.loss_today() >= cap
+
+
+def _loss_of(local: Counter, synced: Counter) -> float:
+    keys: Iterable[Tuple[float, float]] = set(local) | set(synced)
+    return sum(-pnl * max(local[(ts, pnl)], synced[(ts, pnl)]) for ts, pnl in keys)
+
+
+_ledger: Optional[DailyLossLedger] = None
+_ledger_dir: Optional[str] = None
+_ledger_lock = threading.Lock()
+
+
+def get_loss_ledger() -> DailyLossLedger:
+    """Process-wide ledger over the position store of ``MEMEBOT_DATA_DIR``.
+
+    A change of ``MEMEBOT_DATA_DIR`` (tests, tools) gives a fresh ledger.
+    """
+    global _ledger, _ledger_dir
+    data_dir = os.getenv("MEMEBOT_DATA_DIR", "./data")
+    with _ledger_lock:
+        if _ledger is None or _ledger_dir != data_dir:
+            d = pathlib.Path(data_dir)
+            d.mkdir(parents=True, exist_ok=True)
+            ledger = DailyLossLedger.from_env(
+                source=lambda since: get_store(d).list_closed(since_ts=since)
+            )
+            ledger.sync()
+            _ledger, _ledger_dir = ledger, data_dir
+        return _ledger
+
+
+def reset_loss_ledger() -> None:
+    global _ledger, _ledger_dir
+    with _ledger_lock:
+        _ledger = None
+        _ledger_dir = None
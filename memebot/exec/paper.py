@@ -1,10 +1,32 @@
-from dataclasses import dataclass
-from typing import List
+"""Paper-trade journal.
+
+``append_trade`` records a trade in a bounded in-memory history
+(``TRADE_HISTORY_MAX`` most recent) and hands it to a ``TradeJournal``.
+The journal keeps ``trades.csv`` and ``trades.jsonl`` open on a background
+writer thread and writes rows in batches: when ``JOURNAL_BATCH_SIZE`` rows
+are pending, ``JOURNAL_FLUSH_SEC`` after the first pending row, on
+``flush_trades()``, or at shutdown. ``JOURNAL_FSYNC`` chooses durability:
+``off`` (leave it to the OS), ``batch`` (fsync after every batch) or
+``close`` (fsync once at shutdown).
+"""
+
+from dataclasses import dataclass, asdict
+from typing import Any, Deque, Dict, List, Optional, TextIO
+from collections import deque
 import csv
 import json
+import time
+import queue
+import atexit
+import logging
+import threading
 from pathlib import Path
 import os
 
+logger = logging.getLogger("memebot.journal")
+
+FSYNC_POLICIES = ("off", "batch", "close")
+
 
 @dataclass
 class PaperTrade:
@@ -25,7 +47,26 @@ class PaperTrade:
         return self.side
 
 
-_trades: List[PaperTrade] = []
+TRADE_FIELDS = [
+    "ts",
+    "chain",
+    "side",
+    "base",
+    "quote",
+    "size_base",
+    "out_amount",
+    "price_impact_bps",
+    "slippage_bps",
+    "reason",
+    "entry_value",
+]
+
+
+def _history_max() -> int:
+    return max(1, int(os.getenv("TRADE_HISTORY_MAX", "10000") or 10000))
+
+
+_trades: Deque[PaperTrade] = deque(maxlen=_history_max())
 
 
 def _trades_csv() -> Path:
@@ -38,35 +79,150 @@ def _trades_jsonl() -> Path:
     return data_dir / "trades.jsonl"
 
 
+_STOP = object()
+
+
+class TradeJournal:
+    """Batched CSV + JSONL appender running on its own thread."""
+
+    def __init__(
+        self,
+        csv_path: Path,
+        jsonl_path: Path,
+        batch_size: int = 64,
+        flush_sec: float = 0.5,
+        fsync: str = "off",
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"JOURNAL_FSYNC must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.csv_path = Path(csv_path)
+        self.jsonl_path = Path(jsonl_path)
+        self.batch_size = max(1, int(batch_size))
+        self.flush_sec = max(0.0, float(flush_sec))
+        self.fsync = fsync
+        self.written = 0
+        self._q: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._csv: Optional[TextIO] = None
+        self._jsonl: Optional[TextIO] = None
+        self._writer: Any = None
+        self._thread = threading.Thread(target=self._run, name="trade-journal", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls, csv_path: Path, jsonl_path: Path) -> "TradeJournal":
+        return cls(
+            csv_path,
+            jsonl_path,
+            batch_size=int(os.getenv("JOURNAL_BATCH_SIZE", "64") or 64),
+            flush_sec=float(os.getenv("JOURNAL_FLUSH_SEC", "0.5") or 0),
+            fsync=(os.getenv("JOURNAL_FSYNC", "off") or "off").strip().lower(),
+        )
+
+    def append(self, row: Dict[str, Any]) -> None:
+        self._q.put(row)
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Block until every row appended so far is written."""
+        if not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._q.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        if self._thread.is_alive():
+            self._q.put(_STOP)
+            self._thread.join(timeout)
+
+    def _open(self) -> None:
+        if self._csv is not None:
+            return
+        self.csv_path.parent.mkdir(parents=True, exist_ok=True)
+        self._csv = self.csv_path.open("a", newline="")
+        self._jsonl = self.jsonl_path.open("a")
+        self._writer = csv.DictWriter(self._csv, fieldnames=TRADE_FIELDS)
+        if self._csv.tell() == 0:
+            self._writer.writeheader()
+
+    def _write(self, rows: List[Dict[str, Any]], fsync: bool) -> None:
+        if not rows:
+            return
+        self._open()
+        self._writer.writerows(rows)
+        self._jsonl.write("".join(json.dumps(r) + "\n" for r in rows))
+        for f in (self._csv, self._jsonl):
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        self.written += len(rows)
+
+    def _run(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        deadline: Optional[float] = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._q.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if isinstance(item, dict):
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_sec
+                if len(batch) < self.batch_size:
+                    continue
+            try:
+                stopping = item is _STOP
+                self._write(batch, self.fsync == "batch" or (stopping and self.fsync == "close"))
+            except Exception as e:
+                logger.error(f"[journal] write failed, {len(batch)} rows lost: {e}")
+            batch, deadline = [], None
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                for f in (self._csv, self._jsonl):
+                    if f is not None:
+                        f.close()
+                return
+
+
+_journal: Optional[TradeJournal] = None
+_journal_lock = threading.Lock()
+
+
+def get_journal() -> TradeJournal:
+    """Process-wide journal; reopened if ``MEMEBOT_DATA_DIR`` changes."""
+    global _journal
+    csv_path = _trades_csv()
+    with _journal_lock:
+        if _journal is None or _journal.csv_path != csv_path:
+            if _journal is not None:
+                _journal.close()
+            _journal = TradeJournal.from_env(csv_path, _trades_jsonl())
+        return _journal
+
+
+def flush_trades(timeout: Optional[float] = 5.0) -> bool:
+    j = _journal
+    return j.flush(timeout) if j is not None else True
+
+
+def close_journal() -> None:
+    global _journal
+    with _journal_lock:
+        if _journal is not None:
+            _journal.close()
+        _journal = None
+
+
+atexit.register(close_journal)
+
+
 def append_trade(trade: PaperTrade):
     if trade.size_base > 0 and trade.out_amount > 0 and trade.entry_value == 0:
         trade.entry_value = trade.out_amount
     _trades.append(trade)
-
-    file_path = _trades_csv()
-    write_header = not file_path.exists() or file_path.stat().st_size == 0
-
-    with file_path.open("a", newline="") as f:
-        fieldnames = [
-            "ts",
-            "chain",
-            "side",
-            "base",
-            "quote",
-            "size_base",
-            "out_amount",
-            "price_impact_bps",
-            "slippage_bps",
-            "reason",
-            "entry_value",
-        ]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        if write_header:
-            writer.writeheader()
-        writer.writerow(trade.__dict__)
-
-    with _trades_jsonl().open("a") as f:
-        f.write(json.dumps(trade.__dict__) + "\n")
+    get_journal().append(asdict(trade))
 
 
 def get_all_trades() -> List[PaperTrade]:
@@ -75,4 +231,4 @@ def get_all_trades() -> List[PaperTrade]:
 
 def reset_trades():
     global _trades
-    _trades = []
+    _trades = deque(maxlen=_history_max())
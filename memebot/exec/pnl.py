@@ -1,7 +1,32 @@
-import csv
+"""Closed-position PnL summaries from running aggregates.
+
+``PnLAggregates`` keeps totals, winners/losers, per-token gross and one
+bucket per UTC day for the closed book. It folds in only the rows appended
+to ``positions_closed.csv`` since its last update (both store backends keep
+that file current) and is persisted next to it as ``pnl_aggregates.json``,
+so answering a summary costs O(days) rather than a pass over every trade.
+
+A ``since`` cutoff on a day boundary is answered from the buckets alone.
+A cutoff in the middle of a day uses the whole buckets after that day.
+The first day is re-read from the CSV and filtered on the exact close
+time. Each day keeps the byte span its rows occupy, so that re-read covers
+one day's rows.
+"""
+
+import json
 import pathlib
 import os
+import threading
+import time
 from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from memebot.exec.history import read_csv_range, read_csv_tail_spans
+from memebot.exec.loss_ledger import DAY_SEC
+
+AGG_FILE = "pnl_aggregates.json"
+AGG_VERSION = 2  # bumped when the saved layout changes; older files are rebuilt
 
 
 def _data_dir() -> pathlib.Path:
@@ -23,16 +48,245 @@ class PnLSummary:
     losers: int
 
 
+def _num(v: Any) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _bucket() -> Dict[str, Any]:
+    return {"trades": 0, "net": 0.0, "exit": 0.0, "winners": 0, "losers": 0, "tokens": {}}
+
+
+def _add(dst: Dict[str, Any], src: Dict[str, Any]) -> None:
+    for k in ("trades", "net", "exit", "winners", "losers"):
+        dst[k] += src[k]
+    for tok, (n, gross) in src["tokens"].items():
+        t = dst["tokens"].setdefault(tok, [0, 0.0])
+        t[0] += n
+        t[1] += gross
+
+
+def _one(quote: str, exit_base: float, pnl_base: float) -> Dict[str, Any]:
+    return {
+        "trades": 1,
+        "net": pnl_base,
+        "exit": exit_base,
+        "winners": int(pnl_base > 0),
+        "losers": int(pnl_base < 0),
+        "tokens": {quote or "UNKNOWN": [1, pnl_base]},
+    }
+
+
+def day_of(ts: float) -> int:
+    return int(ts // DAY_SEC)
+
+
+def parse_since(since: str, now: Optional[float] = None) -> Optional[float]:
+    """``all`` | ``today`` | ``<N>d`` | ``YYYY-MM-DD`` | epoch seconds -> ts.
+
+    Returns None for ``all``; raises ValueError for anything else.
+    """
+    s = (since or "all").strip().lower()
+    now = time.time() if now is None else now
+    if s == "all":
+        return None
+    if s == "today":
+        return day_of(now) * DAY_SEC
+    if s.endswith("d") and s[:-1].isdigit():
+        return now - int(s[:-1]) * DAY_SEC
+    try:
+        return datetime.strptime(s, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        pass
+    try:
+        return float(s)
+    except ValueError:
+        raise ValueError(f"bad since {since!r}: use all, today, <N>d, YYYY-MM-DD or epoch")
+
+
+class PnLAggregates:
+    def __init__(self) -> None:
+        self.total = _bucket()
+        self.days: Dict[int, Dict[str, Any]] = {}
+        # day -> [start, end) byte range of the CSV holding that day's rows
+        self.spans: Dict[int, List[int]] = {}
+        self.mark: Dict[str, Any] = {}
+
+    def record(
+        self,
+        ts_close: float,
+        quote: str,
+        exit_base: float,
+        pnl_base: float,
+        span: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        one = _one(quote, exit_base, pnl_base)
+        day = day_of(ts_close)
+        _add(self.total, one)
+        _add(self.days.setdefault(day, _bucket()), one)
+        if span is not None:
+            lo, hi = self.spans.setdefault(day, [span[0], span[1]])
+            self.spans[day] = [min(lo, span[0]), max(hi, span[1])]
+
+    def catch_up(self, csv_path: pathlib.Path) -> bool:
+        """Fold in rows appended to ``csv_path``; rebuild if it was rewritten.
+
+        Returns True when anything changed (i.e. the aggregates need saving).
+        """
+        if not csv_path.exists():
+            return False
+        rows, spans, mark, rewritten = read_csv_tail_spans(csv_path, self.mark)
+        if rewritten:
+            self.total, self.days, self.spans = _bucket(), {}, {}
+        for r, span in zip(rows, spans):
+            self.record(
+                _num(r.get("ts_close")),
+                r.get("quote") or "",
+                _num(r.get("exit_base")),
+                _num(r.get("pnl_base")),
+                span,
+            )
+        self.mark = mark
+        return bool(rows) or rewritten
+
+    def _first_day(self, since_ts: float) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """First day at or after ``since_ts`` and its bucket cut at ``since_ts``.
+
+        The bucket is None when the cutoff is on a day boundary and the
+        stored one applies whole.
+        """
+        first = day_of(since_ts)
+        if since_ts == first * DAY_SEC or first not in self.days:
+            return first, None
+        out = _bucket()
+        span = self.spans.get(first)
+        if span is not None and self.mark.get("path"):
+            for r in read_csv_range(pathlib.Path(self.mark["path"]), span[0], span[1]):
+                ts = _num(r.get("ts_close"))
+                if day_of(ts) == first and ts >= since_ts:
+                    _add(
+                        out,
+                        _one(r.get("quote") or "", _num(r.get("exit_base")), _num(r.get("pnl_base"))),
+                    )
+        return first, out
+
+    def bucket(self, since_ts: Optional[float] = None) -> Dict[str, Any]:
+        if since_ts is None:
+            return self.total
+        first, partial = self._first_day(since_ts)
+        out = _bucket()
+        for day, b in self.days.items():
+            if day > first or (day == first and partial is None):
+                _add(out, b)
+        if partial is not None:
+            _add(out, partial)
+        return out
+
+    def summary(self, since_ts: Optional[float] = None) -> Dict[str, Any]:
+        b = self.bucket(since_ts)
+        return {
+            "trades": b["trades"],
+            "gross": b["net"],
+            "exit_base": b["exit"],
+            "winners": b["winners"],
+            "losers": b["losers"],
+            "tokens": {k: {"trades": n, "gross": g} for k, (n, g) in b["tokens"].items()},
+        }
+
+    def daily(self, since_ts: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        days = dict(self.days)
+        if since_ts is not None:
+            first, partial = self._first_day(since_ts)
+            days = {d: b for d, b in days.items() if d >= first}
+            if partial is not None:
+                days[first] = partial
+        return {
+            datetime.fromtimestamp(day * DAY_SEC, tz=timezone.utc).strftime("%Y-%m-%d"): {
+                "trades": b["trades"],
+                "gross": b["net"],
+            }
+            for day, b in sorted(days.items())
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": AGG_VERSION,
+            "total": self.total,
+            "days": {str(k): v for k, v in self.days.items()},
+            "spans": {str(k): v for k, v in self.spans.items()},
+            "mark": self.mark,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "PnLAggregates":
+        agg = cls()
+        if d.get("version") != AGG_VERSION:
+            return agg  # no mark, so the next catch_up rebuilds from the CSV
+        agg.total = d.get("total") or _bucket()
+        agg.days = {int(k): v for k, v in (d.get("days") or {}).items()}
+        agg.spans = {int(k): v for k, v in (d.get("spans") or {}).items()}
+        agg.mark = d.get("mark") or {}
+        return agg
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "PnLAggregates":
+        try:
+            return cls.from_dict(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self, path: pathlib.Path) -> None:
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self.to_dict()))
+        os.replace(tmp, path)
+
+
+_aggs: Dict[str, PnLAggregates] = {}
+_aggs_lock = threading.Lock()
+
+
+def pnl_aggregates(closed_csv: Optional[pathlib.Path] = None) -> PnLAggregates:
+    """Up-to-date aggregates for ``closed_csv`` (default: the data dir's).
+
+    Loaded from disk once per path, then caught up with the CSV tail and
+    re-saved whenever new closes were folded in.
+    """
+    path = pathlib.Path(closed_csv) if closed_csv is not None else _closed_csv()
+    agg_path = path.parent / AGG_FILE
+    with _aggs_lock:
+        agg = _aggs.get(str(path))
+        if agg is None:
+            agg = _aggs[str(path)] = PnLAggregates.load(agg_path)
+        if agg.catch_up(path):
+            agg.save(agg_path)
+        return agg
+
+
+def pnl_summary(
+    since_ts: Optional[float] = None,
+    closed_csv: Optional[pathlib.Path] = None,
+    daily: bool = False,
+) -> Dict[str, Any]:
+    """``PnLAggregates.summary`` taken under the aggregates lock."""
+    agg = pnl_aggregates(closed_csv)
+    with _aggs_lock:
+        out = agg.summary(since_ts)
+        if daily:
+            out["days"] = agg.daily(since_ts)
+        return out
+
+
+def reset_pnl_aggregates() -> None:
+    with _aggs_lock:
+        _aggs.clear()
+
+
 def report(since_ts: float | None = None) -> PnLSummary:
     path = _closed_csv()
     if not path.exists():
         return PnLSummary(0, 0.0, 0.0, 0, 0)
-    rows = list(csv.DictReader(open(path)))
-    if since_ts is not None:
-        rows = [r for r in rows if float(r.get("ts_close", 0.0)) >= float(since_ts)]
-    trades = len(rows)
-    gross = sum(float(r.get("exit_base", 0.0)) for r in rows)
-    net = sum(float(r.get("pnl_base", 0.0)) for r in rows)
-    wins = sum(1 for r in rows if float(r.get("pnl_base", 0.0)) > 0)
-    losses = trades - wins
-    return PnLSummary(trades, gross, net, wins, losses)
+    s = pnl_summary(since_ts, path)
+    trades, winners = s["trades"], s["winners"]
+    return PnLSummary(trades, s["exit_base"], s["gross"], winners, trades - winners)
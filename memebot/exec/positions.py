@@ -1,11 +1,23 @@
-import csv
 import os
 import time
+import logging
 import pathlib
+import numpy as np
 from dataclasses import dataclass, asdict
 from typing import List, Dict, Any, Optional
 from memebot.config import settings
 from memebot.solana.jupiter import estimate_price_impact_solana
+from memebot.exec.store import PositionStore, get_store, _read_csv, _write_csv  # noqa: F401
+from memebot.exec.quote_engine import QuoteEngine, TickStats, get_quote_engine
+from memebot.exec.exit_engine import REASONS, ExitBook
+from memebot.exec.loss_ledger import get_loss_ledger
+from memebot.exec.pnl import pnl_aggregates
+from memebot.exec.attribution import get_attribution
+from memebot import metrics
+
+logger = logging.getLogger("memebot.exits")
+
+_last_tick_stats = TickStats()
 
 
 def _data_dir() -> pathlib.Path:
@@ -58,6 +70,12 @@ class OpenPosition:
     entry_base: float
     entry_out_raw: float
     note: str = ""
+    # Exit state maintained by tick_exits
+    peak_pnl_pct: Optional[float] = None
+    last_quote_ts: Optional[float] = None
+    last_exit_base: Optional[float] = None
+    quote_failures: int = 0
+    peak_ts: Optional[float] = None
 
 
 @dataclass
@@ -83,46 +101,21 @@ class ExitRules:
     min_hold_sec = 10.0
 
 
-def _read_csv(path: pathlib.Path) -> List[Dict[str, Any]]:
-    if not path.exists():
-        return []
-    with open(path, newline="") as f:
-        return list(csv.DictReader(f))
-
-
-def _write_csv(path: pathlib.Path, rows: List[Dict[str, Any]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    if not rows:
-        header = [
-            "ts_open",
-            "chain",
-            "base",
-            "quote",
-            "entry_base",
-            "entry_out_raw",
-            "note",
-            "ts_close",
-            "exit_base",
-            "pnl_base",
-            "reason",
-        ]
-        with open(path, "w", newline="") as f:
-            csv.DictWriter(f, fieldnames=header).writeheader()
-        return
-    keys = []
-    for r in rows:
-        for k in r.keys():
-            if k not in keys:
-                keys.append(k)
-    with open(path, "w", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=keys)
-        w.writeheader()
-        for r in rows:
-            w.writerow(r)
-
-
-def list_open_positions():
-    return _read_csv(_open_csv())
+def _store() -> PositionStore:
+    return get_store(_data_dir())
+
+
+def list_open_positions() -> List[Dict[str, Any]]:
+    return _store().list_open()
+
+
+def list_closed_positions(since_ts: Optional[float] = None) -> List[Dict[str, Any]]:
+    return _store().list_closed(since_ts)
+
+
+def export_positions_csv() -> None:
+    """Write full CSV snapshots of the open and closed books."""
+    _store().export_csv(_open_csv(), _closed_csv())
 
 
 def open_position(
@@ -132,7 +125,9 @@ def open_position(
     entry_base: float,
     entry_out_raw: float,
     note: str = "",
+    signal: Any = None,
 ) -> OpenPosition:
+    """Record a new open position; ``signal`` links it for attribution."""
     pos = OpenPosition(
         ts_open=time.time(),
         chain=chain,
@@ -142,9 +137,9 @@ def open_position(
         entry_out_raw=float(entry_out_raw),
         note=note,
     )
-    rows = _read_csv(_open_csv())
-    rows.append(asdict(pos))
-    _write_csv(_open_csv(), rows)
+    pos_id = _store().add_open(asdict(pos))
+    if signal is not None:
+        get_attribution().link(pos_id, signal, pos.ts_open, quote)
     return pos
 
 
@@ -159,84 +154,128 @@ def ENV_EXIT_RULES() -> ExitRules:
     return r
 
 
+def last_tick_stats() -> TickStats:
+    """Latency/coverage stats from the most recent tick_exits() call."""
+    return _last_tick_stats
+
+
+metrics.gauge(
+    "memebot_open_positions", "Positions currently open", lambda: _store().count_open()
+)
+metrics.gauge(
+    "memebot_exit_tick_duration_ms",
+    "Duration of the most recent exit tick",
+    lambda: _last_tick_stats.elapsed_ms,
+)
+
+
+def _quote_exit(mint: str, amount: int) -> dict:
+    return estimate_price_impact_solana(mint, settings.wsol_mint, amount)  # type: ignore[arg-type]
+
+
+def _valid_quote(quote: Any) -> bool:
+    return bool(quote) and quote not in ("None", "")
+
+
 def tick_exits(
     target_gain_pct: float = 20.0,
     target_stop_pct: float = -30.0,
     rules: Optional[ExitRules] = None,
+    engine: Optional[QuoteEngine] = None,
 ) -> Dict[str, int]:
-    open_path = _open_csv()
-    closed_path = _closed_csv()
-    open_rows = _read_csv(open_path)
+    global _last_tick_stats
+    store = _store()
+    open_rows = store.list_open()
     if rules is None:
         rules = ENV_EXIT_RULES()
     if not open_rows:
-        _write_csv(closed_path, _read_csv(closed_path))
+        _last_tick_stats = TickStats()
         return {"closed": 0}
-    remaining: List[Dict[str, Any]] = []
-    closed: List[Dict[str, Any]] = _read_csv(closed_path)
-    closed_count = 0
-    now = time.time()
+
+    # Quote every solana mint once, concurrently; positions sharing a mint
+    # are merged into one request for their combined size.
+    amounts: Dict[str, int] = {}
     for r in open_rows:
-        chain = r.get("chain", "solana")
-        base = r.get("base", "SOL")
         quote = r.get("quote")
-        entry_base = float(r.get("entry_base", 0.0))
-        entry_out_raw = float(r.get("entry_out_raw", 0.0))
-        should_close = False
-        reason = ""
-        ts_open = float(r.get("ts_open", now))
-        exit_base = 0.0
-
-        if chain == "solana":
-            amt = int(entry_out_raw)
-            if not quote or quote in ("None", ""):
-                continue
-            q = estimate_price_impact_solana(str(quote), settings.wsol_mint, amt)  # type: ignore[arg-type]
-
-            if q.get("ok") and int(q.get("out_amount", 0)) > 0:
-                exit_base = int(q["out_amount"]) / 1_000_000_000
-                hold_ok = (now - ts_open) >= rules.min_hold_sec
-                if hold_ok:
-                    pnl_pct = (
-                        0.0
-                        if entry_base == 0
-                        else (exit_base - entry_base) / entry_base * 100.0
-                    )
-                    if pnl_pct >= rules.tp_pct:
-                        should_close, reason = True, "take_profit"
-                    elif pnl_pct <= rules.sl_pct:
-                        should_close, reason = True, "stop_loss"
-                    else:
-                        note = r.get("note", "") or ""
-                        peak_key = "peak="
-                        peak = (
-                            float(note.split(peak_key)[1])
-                            if peak_key in note
-                            else pnl_pct
-                        )
-                        new_peak = max(peak, pnl_pct)
-                        r["note"] = f"peak={new_peak:.6f}"
-                        if peak - pnl_pct >= rules.trail_pct:
-                            should_close, reason = True, "trailing_exit"
-
-        if should_close:
-            cp = ClosedPosition(
-                ts_open=float(r.get("ts_open", now)),
-                ts_close=now,
-                chain=chain,
-                base=base,
-                quote=str(quote),
-                entry_base=entry_base,
-                entry_out_raw=entry_out_raw,
-                exit_base=exit_base,
-                pnl_base=exit_base - entry_base,
-                reason=reason or "rule_exit",
-            )
-            closed.append(asdict(cp))
-            closed_count += 1
+        if r.get("chain", "solana") == "solana" and _valid_quote(quote):
+            key = str(quote)
+            amounts[key] = amounts.get(key, 0) + int(float(r.get("entry_out_raw", 0.0)))
+    quotes, stats = (engine or get_quote_engine()).quote_all(
+        amounts, _quote_exit, positions=len(open_rows)
+    )
+    _last_tick_stats = stats
+    metrics.observe("exit_tick", stats.elapsed_ms)
+    logger.debug(
+        f"[exits] positions={stats.positions} mints={stats.mints} "
+        f"quoted={stats.quoted} failed={stats.failed} timed_out={stats.timed_out} "
+        f"elapsed={stats.elapsed_ms:.1f}ms p50={stats.p50_ms:.1f}ms "
+        f"p95={stats.p95_ms:.1f}ms"
+    )
+
+    # Only solana rows with a valid mint and a successful quote this tick
+    # get an exit value; everything else stays NaN and is left alone.
+    rows = [
+        r
+        for r in open_rows
+        if r.get("chain", "solana") == "solana" and _valid_quote(r.get("quote"))
+    ]
+    book = ExitBook.from_rows(rows)
+    now = time.time()
+    updates: Dict[int, Dict[str, Any]] = {}
+    for i, r in enumerate(rows):
+        key = str(r.get("quote"))
+        q = quotes.get(key)  # None if it missed the tick deadline
+        if q and q.get("ok") and int(q.get("out_amount", 0)) > 0:
+            # Pro-rate a merged quote back to this position's share
+            amt = int(book.entry_out_raw[i])
+            total = amounts.get(key, 0)
+            share = amt / total if total > 0 else 1.0
+            book.exit_base[i] = int(q["out_amount"]) * share / 1_000_000_000
+            updates[r["id"]] = {
+                "last_quote_ts": now,
+                "last_exit_base": float(book.exit_base[i]),
+                "quote_failures": 0,
+            }
         else:
-            remaining.append(r)
+            updates[r["id"]] = {"quote_failures": int(r.get("quote_failures") or 0) + 1}
+
+    prev_peak = book.peak_pnl_pct.copy()
+    ev = book.evaluate(now, rules)
+    # A new high (or the first evaluation) moves the time-to-peak mark to now
+    new_high = np.isnan(prev_peak) | (ev.peak_pnl_pct > prev_peak)
 
-    _write_csv(closed_path, closed)
-    _write_csv(open_path, remaining)
+    closed_count = 0
+    for i in np.flatnonzero(ev.evaluated):
+        r = rows[i]
+        if not ev.close[i]:
+            updates[r["id"]]["peak_pnl_pct"] = float(ev.peak_pnl_pct[i])
+            if new_high[i]:
+                updates[r["id"]]["peak_ts"] = now
+            continue
+        updates.pop(r["id"], None)
+        entry_base = float(book.entry_base[i])
+        exit_base = float(book.exit_base[i])
+        cp = ClosedPosition(
+            ts_open=float(book.ts_open[i]),
+            ts_close=now,
+            chain=r.get("chain", "solana"),
+            base=r.get("base", "SOL"),
+            quote=str(r.get("quote")),
+            entry_base=entry_base,
+            entry_out_raw=float(book.entry_out_raw[i]),
+            exit_base=exit_base,
+            pnl_base=exit_base - entry_base,
+            reason=REASONS[ev.reason[i]] or "rule_exit",
+        )
+        if not store.close(r["id"], asdict(cp)):
+            continue  # already closed elsewhere (e.g. another process)
+        get_loss_ledger().record(cp.ts_close, cp.pnl_base)
+        at_high = np.isnan(prev_peak[i]) or ev.pnl_pct[i] >= prev_peak[i]
+        peak_ts = now if at_high else (r.get("peak_ts") or cp.ts_open)
+        get_attribution().record_close(r["id"], asdict(cp), peak_ts)
+        closed_count += 1
+
+    store.update_open_many(updates)
+    if closed_count:
+        pnl_aggregates(_closed_csv())  # fold this tick's closes into the running PnL
     return {"closed": closed_count}
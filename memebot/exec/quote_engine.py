@@ -0,0 +1,113 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+QuoteFn = Callable[[str, int], dict]
+
+
+@dataclass
+class TickStats:
+    positions: int = 0
+    mints: int = 0
+    quoted: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    elapsed_ms: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+def _pct(sorted_vals: List[float], pct: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    idx = min(len(sorted_vals) - 1, int(round(pct / 100.0 * (len(sorted_vals) - 1))))
+    return sorted_vals[idx]
+
+
+class QuoteEngine:
+    """Fan exit quotes out over a bounded thread pool.
+
+    Requests are keyed by mint so positions sharing a mint cost one quote.
+    Quotes still running when the tick deadline passes are reported as
+    timed out and left out of the result.
+    """
+
+    def __init__(self, max_concurrency: int = 16, deadline_sec: float = 5.0):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.deadline_sec = float(deadline_sec)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="exit-quote"
+        )
+
+    def quote_all(
+        self,
+        amounts: Dict[str, int],
+        quote_fn: QuoteFn,
+        positions: int = 0,
+    ) -> Tuple[Dict[str, dict], TickStats]:
+        stats = TickStats(positions=positions or len(amounts), mints=len(amounts))
+        if not amounts:
+            return {}, stats
+
+        started = time.perf_counter()
+        latencies: Dict[str, float] = {}
+        lat_lock = threading.Lock()
+
+        def _run(mint: str, amount: int) -> dict:
+            t0 = time.perf_counter()
+            try:
+                return quote_fn(mint, amount)
+            except Exception as e:
+                return {"ok": False, "out_amount": 0, "error": str(e)}
+            finally:
+                with lat_lock:
+                    latencies[mint] = (time.perf_counter() - t0) * 1000.0
+
+        futures = {
+            self._pool.submit(_run, mint, amt): mint for mint, amt in amounts.items()
+        }
+        done, pending = wait(futures, timeout=self.deadline_sec)
+        for f in pending:
+            f.cancel()
+
+        results: Dict[str, dict] = {}
+        for f in done:
+            q = f.result()
+            results[futures[f]] = q
+            if q.get("ok"):
+                stats.quoted += 1
+            else:
+                stats.failed += 1
+        stats.timed_out = len(pending)
+
+        with lat_lock:
+            lat = sorted(latencies.values())
+        stats.elapsed_ms = (time.perf_counter() - started) * 1000.0
+        stats.p50_ms = _pct(lat, 50)
+        stats.p95_ms = _pct(lat, 95)
+        stats.max_ms = lat[-1] if lat else 0.0
+        return results, stats
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_engine: Optional[QuoteEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_quote_engine() -> QuoteEngine:
+    """Process-wide engine sized by EXIT_QUOTE_CONCURRENCY / EXIT_TICK_DEADLINE_SEC."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = QuoteEngine(
+                max_concurrency=int(os.getenv("EXIT_QUOTE_CONCURRENCY", "16") or 16),
+                deadline_sec=float(os.getenv("EXIT_TICK_DEADLINE_SEC", "5") or 5),
+            )
+        return _engine
@@ -0,0 +1,533 @@
+import csv
+import os
+import pathlib
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+OPEN_FIELDS = [
+    "id",
+    "ts_open",
+    "chain",
+    "base",
+    "quote",
+    "entry_base",
+    "entry_out_raw",
+    "note",
+    "peak_pnl_pct",
+    "last_quote_ts",
+    "last_exit_base",
+    "quote_failures",
+    "peak_ts",
+]
+
+# Per-position exit state kept by tick_exits; None until first set.
+STATE_FIELDS = ["peak_pnl_pct", "last_quote_ts", "last_exit_base", "quote_failures", "peak_ts"]
+
+CLOSED_FIELDS = [
+    "ts_open",
+    "ts_close",
+    "chain",
+    "base",
+    "quote",
+    "entry_base",
+    "entry_out_raw",
+    "exit_base",
+    "pnl_base",
+    "reason",
+]
+
+_FLOAT_FIELDS = {
+    "ts_open",
+    "ts_close",
+    "entry_base",
+    "entry_out_raw",
+    "exit_base",
+    "pnl_base",
+}
+_OPTIONAL_FLOAT_FIELDS = {"peak_pnl_pct", "last_quote_ts", "last_exit_base", "peak_ts"}
+_INT_FIELDS = {"quote_failures"}
+
+
+def _read_csv(path: pathlib.Path) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def _write_csv(path: pathlib.Path, rows: List[Dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not rows:
+        header = [
+            "ts_open",
+            "chain",
+            "base",
+            "quote",
+            "entry_base",
+            "entry_out_raw",
+            "note",
+            "ts_close",
+            "exit_base",
+            "pnl_base",
+            "reason",
+        ]
+        with open(path, "w", newline="") as f:
+            csv.DictWriter(f, fieldnames=header).writeheader()
+        return
+    keys = []
+    for r in rows:
+        for k in r.keys():
+            if k not in keys:
+                keys.append(k)
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=keys)
+        w.writeheader()
+        for r in rows:
+            w.writerow(r)
+
+
+def _coerce(row: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """Pick ``fields`` out of a CSV row, converting numeric columns."""
+    out: Dict[str, Any] = {}
+    for k in fields:
+        v = row.get(k)
+        if k in _FLOAT_FIELDS:
+            try:
+                v = float(v) if v not in (None, "") else 0.0
+            except (TypeError, ValueError):
+                v = 0.0
+        elif k in _OPTIONAL_FLOAT_FIELDS:
+            try:
+                v = float(v) if v not in (None, "") else None
+            except (TypeError, ValueError):
+                v = None
+        elif k in _INT_FIELDS:
+            try:
+                v = int(float(v)) if v not in (None, "") else 0
+            except (TypeError, ValueError):
+                v = 0
+        elif k != "id":
+            v = "" if v is None else str(v)
+        out[k] = v
+    return out
+
+
+def _coerce_open(raw: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """``_coerce`` for open rows; rows written before the exit-state columns
+    existed carry the trailing peak as ``note="peak=<pct>"``, moved here."""
+    row = _coerce(raw, fields)
+    note = row.get("note") or ""
+    if "peak_pnl_pct" not in raw and note.startswith("peak="):
+        try:
+            row["peak_pnl_pct"] = float(note[len("peak=") :])
+            row["note"] = ""
+        except ValueError:
+            pass
+    return row
+
+
+def append_closed_export(path: pathlib.Path, row: Dict[str, Any]) -> bool:
+    """Append one closed row to the CSV export.
+
+    Returns False when the existing file has a different header; the caller
+    should then rewrite the export from its store.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists() and path.stat().st_size > 0:
+        with open(path, newline="") as f:
+            header = next(csv.reader(f), [])
+        if header != CLOSED_FIELDS:
+            return False
+        with open(path, "a", newline="") as f:
+            csv.DictWriter(f, fieldnames=CLOSED_FIELDS).writerow(
+                {k: row.get(k) for k in CLOSED_FIELDS}
+            )
+        return True
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=CLOSED_FIELDS)
+        w.writeheader()
+        w.writerow({k: row.get(k) for k in CLOSED_FIELDS})
+    return True
+
+
+class PositionStore:
+    """Backend interface for open/closed position storage.
+
+    Open rows are dicts keyed by ``OPEN_FIELDS`` (``id`` identifies the row
+    for updates and closes); closed rows are keyed by ``CLOSED_FIELDS``.
+    """
+
+    def list_open(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def count_open(self) -> int:
+        return len(self.list_open())
+
+    def add_open(self, row: Dict[str, Any]) -> int:
+        raise NotImplementedError
+
+    def update_open(self, pos_id: int, **fields: Any) -> None:
+        raise NotImplementedError
+
+    def update_open_many(self, updates: Dict[int, Dict[str, Any]]) -> None:
+        """Apply ``{id: fields}`` updates; backends batch them where they can."""
+        for pos_id, fields in updates.items():
+            self.update_open(pos_id, **fields)
+
+    def close(self, pos_id: int, closed: Dict[str, Any]) -> bool:
+        """Move an open row to the closed book; False if ``pos_id`` isn't open."""
+        raise NotImplementedError
+
+    def list_closed(self, since_ts: Optional[float] = None) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def export_csv(self, open_path: pathlib.Path, closed_path: pathlib.Path) -> None:
+        open_rows = self.list_open()
+        closed_rows = self.list_closed()
+        _write_csv(open_path, open_rows)
+        if closed_rows:
+            _write_csv(closed_path, closed_rows)
+        else:
+            with open(closed_path, "w", newline="") as f:
+                csv.DictWriter(f, fieldnames=CLOSED_FIELDS).writeheader()
+
+    def close_store(self) -> None:
+        pass
+
+
+class CsvPositionStore(PositionStore):
+    """Legacy backend: every mutation rewrites the CSV files.
+
+    Ids are never reused: the next id is kept in ``<open csv>.next_id`` so
+    it survives the highest-numbered position closing (cf. AUTOINCREMENT).
+    """
+
+    def __init__(self, open_path: pathlib.Path, closed_path: pathlib.Path):
+        self.open_path = open_path
+        self.closed_path = closed_path
+        self.seq_path = open_path.with_name(open_path.name + ".next_id")
+        self._lock = threading.Lock()
+        self._open_count: Optional[int] = None
+
+    def _next_id(self, rows: List[Dict[str, Any]]) -> int:
+        try:
+            saved = int(self.seq_path.read_text())
+        except (OSError, ValueError):
+            saved = 0
+        return max(saved, max((r["id"] for r in rows), default=0) + 1)
+
+    def _load_open(self) -> List[Dict[str, Any]]:
+        rows = [_coerce_open(r, OPEN_FIELDS) for r in _read_csv(self.open_path)]
+        # Legacy files have no id column; number them after the highest id.
+        next_id = max((int(r["id"]) for r in rows if r["id"] not in (None, "")), default=0)
+        for r in rows:
+            if r["id"] in (None, ""):
+                next_id += 1
+                r["id"] = next_id
+            else:
+                r["id"] = int(r["id"])
+        return rows
+
+    def _save_open(self, rows: List[Dict[str, Any]]) -> None:
+        self._open_count = len(rows)
+        self.open_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.open_path, "w", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=OPEN_FIELDS)
+            w.writeheader()
+            for r in rows:
+                w.writerow(r)
+
+    def list_open(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._load_open()
+            self._open_count = len(rows)
+            return rows
+
+    def count_open(self) -> int:
+        """Row count cached from the last read or write of the open CSV."""
+        with self._lock:
+            if self._open_count is None:
+                self._open_count = len(self._load_open())
+            return self._open_count
+
+    def add_open(self, row: Dict[str, Any]) -> int:
+        with self._lock:
+            rows = self._load_open()
+            new = _coerce(row, OPEN_FIELDS)
+            new["id"] = self._next_id(rows)
+            rows.append(new)
+            self._save_open(rows)
+            self.seq_path.write_text(str(new["id"] + 1))
+            return new["id"]
+
+    def update_open(self, pos_id: int, **fields: Any) -> None:
+        self.update_open_many({pos_id: fields})
+
+    def update_open_many(self, updates: Dict[int, Dict[str, Any]]) -> None:
+        with self._lock:
+            rows = self._load_open()
+            for r in rows:
+                if r["id"] in updates:
+                    r.update(updates[r["id"]])
+            self._save_open(rows)
+
+    def close(self, pos_id: int, closed: Dict[str, Any]) -> bool:
+        with self._lock:
+            open_rows = self._load_open()
+            rows = [r for r in open_rows if r["id"] != pos_id]
+            if len(rows) == len(open_rows):
+                return False
+            self._save_open(rows)
+            if not append_closed_export(self.closed_path, closed):
+                existing = [
+                    _coerce(r, CLOSED_FIELDS) for r in _read_csv(self.closed_path)
+                ]
+                _write_csv(self.closed_path, existing + [closed])
+        return True
+
+    def list_closed(self, since_ts: Optional[float] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = [_coerce(r, CLOSED_FIELDS) for r in _read_csv(self.closed_path)]
+        if since_ts is not None:
+            rows = [r for r in rows if r["ts_close"] >= float(since_ts)]
+        return rows
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions_open (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts_open REAL NOT NULL,
+    chain TEXT NOT NULL,
+    base TEXT NOT NULL,
+    quote TEXT NOT NULL,
+    entry_base REAL NOT NULL,
+    entry_out_raw REAL NOT NULL,
+    note TEXT NOT NULL DEFAULT '',
+    peak_pnl_pct REAL,
+    last_quote_ts REAL,
+    last_exit_base REAL,
+    quote_failures INTEGER NOT NULL DEFAULT 0,
+    peak_ts REAL
+);
+CREATE INDEX IF NOT EXISTS ix_open_quote ON positions_open(quote);
+CREATE INDEX IF NOT EXISTS ix_open_ts_open ON positions_open(ts_open);
+
+CREATE TABLE IF NOT EXISTS positions_closed (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts_open REAL NOT NULL,
+    ts_close REAL NOT NULL,
+    chain TEXT NOT NULL,
+    base TEXT NOT NULL,
+    quote TEXT NOT NULL,
+    entry_base REAL NOT NULL,
+    entry_out_raw REAL NOT NULL,
+    exit_base REAL NOT NULL,
+    pnl_base REAL NOT NULL,
+    reason TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_closed_quote ON positions_closed(quote);
+CREATE INDEX IF NOT EXISTS ix_closed_ts_open ON positions_closed(ts_open);
+CREATE INDEX IF NOT EXISTS ix_closed_ts_close ON positions_closed(ts_close);
+"""
+
+
+class SqlitePositionStore(PositionStore):
+    """SQLite (WAL) backend with indexes on quote, ts_open and ts_close.
+
+    Each open and each close is its own single-row transaction. Closed rows
+    are also appended to ``closed_path`` so CSV consumers keep working.
+    On first creation, existing CSV files are imported once.
+    """
+
+    def __init__(
+        self,
+        db_path: pathlib.Path,
+        open_path: Optional[pathlib.Path] = None,
+        closed_path: Optional[pathlib.Path] = None,
+    ):
+        self.db_path = db_path
+        self.open_path = open_path
+        self.closed_path = closed_path
+        self._lock = threading.Lock()
+        fresh = not db_path.exists()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(db_path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate_state_columns()
+        if fresh:
+            self._import_legacy_csv()
+
+    def _migrate_state_columns(self) -> None:
+        """Add the exit-state columns to databases created before them."""
+        have = {r["name"] for r in self._conn.execute("PRAGMA table_info(positions_open)")}
+        missing = [c for c in STATE_FIELDS if c not in have]
+        if not missing:
+            return
+        types = {"quote_failures": "INTEGER NOT NULL DEFAULT 0"}
+        self._conn.execute("BEGIN")
+        for col in missing:
+            self._conn.execute(
+                f"ALTER TABLE positions_open ADD COLUMN {col} {types.get(col, 'REAL')}"
+            )
+        self._conn.execute(
+            "UPDATE positions_open SET peak_pnl_pct=CAST(substr(note, 6) AS REAL), "
+            "note='' WHERE peak_pnl_pct IS NULL AND note LIKE 'peak=%'"
+        )
+        self._conn.execute("COMMIT")
+
+    def _import_legacy_csv(self) -> None:
+        open_rows = _read_csv(self.open_path) if self.open_path else []
+        closed_rows = _read_csv(self.closed_path) if self.closed_path else []
+        if not open_rows and not closed_rows:
+            return
+        open_cols = OPEN_FIELDS[1:]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                f"INSERT INTO positions_open ({','.join(open_cols)}) "
+                f"VALUES ({','.join('?' * len(open_cols))})",
+                [
+                    tuple(_coerce_open(r, open_cols)[k] for k in open_cols)
+                    for r in open_rows
+                ],
+            )
+            self._conn.executemany(
+                f"INSERT INTO positions_closed ({','.join(CLOSED_FIELDS)}) "
+                f"VALUES ({','.join('?' * len(CLOSED_FIELDS))})",
+                [
+                    tuple(_coerce(r, CLOSED_FIELDS)[k] for k in CLOSED_FIELDS)
+                    for r in closed_rows
+                ],
+            )
+            self._conn.execute("COMMIT")
+
+    def list_open(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            cur = self._conn.execute(
+                f"SELECT {','.join(OPEN_FIELDS)} FROM positions_open ORDER BY id"
+            )
+            return [dict(r) for r in cur.fetchall()]
+
+    def count_open(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM positions_open").fetchone()[0])
+
+    def add_open(self, row: Dict[str, Any]) -> int:
+        cols = OPEN_FIELDS[1:]
+        vals = _coerce(row, cols)
+        with self._lock:
+            cur = self._conn.execute(
+                f"INSERT INTO positions_open ({','.join(cols)}) "
+                f"VALUES ({','.join('?' * len(cols))})",
+                tuple(vals[k] for k in cols),
+            )
+            return int(cur.lastrowid or 0)
+
+    def update_open(self, pos_id: int, **fields: Any) -> None:
+        self.update_open_many({pos_id: fields})
+
+    def update_open_many(self, updates: Dict[int, Dict[str, Any]]) -> None:
+        """One transaction for the whole batch (e.g. every row touched by a tick)."""
+        # Group rows by the set of columns they touch so each group is one executemany
+        groups: Dict[tuple, List[tuple]] = {}
+        for pos_id, fields in updates.items():
+            cols = tuple(k for k in fields if k in OPEN_FIELDS and k != "id")
+            if cols:
+                groups.setdefault(cols, []).append(
+                    tuple(fields[k] for k in cols) + (pos_id,)
+                )
+        if not groups:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for cols, params in groups.items():
+                    self._conn.executemany(
+                        f"UPDATE positions_open SET {','.join(f'{k}=?' for k in cols)} "
+                        "WHERE id=?",
+                        params,
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self, pos_id: int, closed: Dict[str, Any]) -> bool:
+        vals = _coerce(closed, CLOSED_FIELDS)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cur = self._conn.execute("DELETE FROM positions_open WHERE id=?", (pos_id,))
+                if cur.rowcount == 0:
+                    self._conn.execute("ROLLBACK")
+                    return False
+                self._conn.execute(
+                    f"INSERT INTO positions_closed ({','.join(CLOSED_FIELDS)}) "
+                    f"VALUES ({','.join('?' * len(CLOSED_FIELDS))})",
+                    tuple(vals[k] for k in CLOSED_FIELDS),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if self.closed_path is not None:
+            if not append_closed_export(self.closed_path, vals):
+                _write_csv(self.closed_path, self.list_closed())
+        return True
+
+    def list_closed(self, since_ts: Optional[float] = None) -> List[Dict[str, Any]]:
+        sql = f"SELECT {','.join(CLOSED_FIELDS)} FROM positions_closed"
+        params: tuple = ()
+        if since_ts is not None:
+            sql += " WHERE ts_close >= ?"
+            params = (float(since_ts),)
+        with self._lock:
+            cur = self._conn.execute(sql + " ORDER BY id", params)
+            return [dict(r) for r in cur.fetchall()]
+
+    def close_store(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_stores: Dict[tuple, PositionStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(data_dir: pathlib.Path) -> PositionStore:
+    """Return the process-wide store for ``data_dir``.
+
+    The backend is chosen by ``POSITION_STORE`` (``sqlite`` by default, or
+    ``csv``).
+    """
+    backend = os.getenv("POSITION_STORE", "sqlite").strip().lower() or "sqlite"
+    key = (backend, str(data_dir.resolve()))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            open_path = data_dir / "positions_open.csv"
+            closed_path = data_dir / "positions_closed.csv"
+            if backend == "csv":
+                store = CsvPositionStore(open_path, closed_path)
+            elif backend == "sqlite":
+                store = SqlitePositionStore(
+                    data_dir / "positions.db", open_path, closed_path
+                )
+            else:
+                raise ValueError(f"unknown POSITION_STORE backend: {backend}")
+            _stores[key] = store
+        return store
+
+
+def reset_stores() -> None:
+    """Close and forget cached stores (used when the data dir changes)."""
+    with _stores_lock:
+        for store in _stores.values():
+            store.close_store()
+        _stores.clear()
@@ -0,0 +1,142 @@
+import os
+import time
+import asyncio
+import inspect
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger("memebot.bus")
+
+POLICIES = ("block", "drop_new", "drop_oldest")
+
+
+@dataclass
+class BusStats:
+    depth: int = 0
+    max_depth: int = 0
+    published: int = 0
+    handled: int = 0
+    failed: int = 0
+    dropped_new: int = 0
+    dropped_oldest: int = 0
+    blocked_sec: float = 0.0
+
+
+class SignalBus:
+    """Bounded asyncio queue between ingest sources and entry planning.
+
+    Sources ``await bus.publish(sig)``. When the queue is full the policy
+    decides: ``block`` applies backpressure to the source, ``drop_new``
+    rejects the incoming signal, ``drop_oldest`` evicts the oldest queued
+    one. A pool of consumer tasks hands signals to ``handler``; sync
+    handlers run on a thread pool so a slow quote never stalls the loop.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1000,
+        policy: str = "block",
+        consumers: int = 4,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown bus policy: {policy}")
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self.consumers = max(1, int(consumers))
+        self.stats = BusStats()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_env(cls) -> "SignalBus":
+        return cls(
+            maxsize=int(os.getenv("SIGNAL_BUS_MAXSIZE", "1000") or 1000),
+            policy=(os.getenv("SIGNAL_BUS_POLICY", "block") or "block").strip().lower(),
+            consumers=int(os.getenv("SIGNAL_CONSUMERS", "4") or 4),
+        )
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+        return self._queue
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _accepted(self) -> None:
+        self.stats.published += 1
+        self.stats.depth = self.queue.qsize()
+        self.stats.max_depth = max(self.stats.max_depth, self.stats.depth)
+
+    def publish_nowait(self, sig: Any) -> bool:
+        """Publish without waiting; a full queue drops per policy."""
+        q = self.queue
+        if q.full():
+            if self.policy == "drop_oldest":
+                q.get_nowait()
+                q.task_done()
+                self.stats.dropped_oldest += 1
+            else:
+                self.stats.dropped_new += 1
+                return False
+        q.put_nowait(sig)
+        self._accepted()
+        return True
+
+    async def publish(self, sig: Any) -> bool:
+        q = self.queue
+        if self.policy == "block" and q.full():
+            t0 = time.monotonic()
+            await q.put(sig)
+            self.stats.blocked_sec += time.monotonic() - t0
+            self._accepted()
+            return True
+        return self.publish_nowait(sig)
+
+    async def _consume(self, handler: Callable[[Any], Any]) -> None:
+        q = self.queue
+        loop = asyncio.get_running_loop()
+        is_async = inspect.iscoroutinefunction(handler)
+        while True:
+            sig = await q.get()
+            self.stats.depth = q.qsize()
+            try:
+                if is_async:
+                    await handler(sig)
+                else:
+                    await loop.run_in_executor(self._executor, handler, sig)
+                self.stats.handled += 1
+            except Exception as e:
+                self.stats.failed += 1
+                logger.exception(f"[bus] handler failed: {e}")
+            finally:
+                q.task_done()
+
+    def start(self, handler: Callable[[Any], Any]) -> None:
+        """Spawn consumer tasks on the running loop."""
+        self._loop = asyncio.get_running_loop()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.consumers, thread_name_prefix="signal-consumer"
+        )
+        self._tasks = [
+            asyncio.create_task(self._consume(handler), name=f"consumer-{i}")
+            for i in range(self.consumers)
+        ]
+
+    async def join(self) -> None:
+        """Wait until everything published so far has been handled."""
+        await self.queue.join()
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -4,6 +4,8 @@ import hashlib
 import argparse
 import json
 import logging
+import asyncio
+from typing import List, Optional, Tuple
 from fastapi import FastAPI, Request, Header, HTTPException
 import uvicorn
 
@@ -11,6 +13,16 @@ from memebot.config import settings
 from memebot.strategy.fusion import Signal
 from memebot.ingest.stream_helius import enqueue_signal
 from memebot.ingest.llm_filter import filter_signal_with_llm  # ✅ Correct import
+from memebot.ingest.prefilter import prefilter_signal
+from memebot import metrics
+from memebot.ingest.seen import get_seen_txs, tx_key
+from memebot.ingest.webhook_queue import (
+    DUPLICATE,
+    QUEUED,
+    REJECTED,
+    WebhookQueue,
+    delivery_id,
+)
 
 logger = logging.getLogger("memebot.helius")
 app = FastAPI()
@@ -31,20 +43,48 @@ def verify_signature(secret: str, body: bytes, signature: str) -> bool:
         return False
 
 
-@app.post("/helius")
-async def helius_handler(
-    request: Request,
-    x_helius_signature: str = Header(None),
-):
-    body = await request.body()
+async def _process_one(sig: Signal) -> bool:
+    # Wallet txs are deduped upstream by signature; only screen for noise
+    with metrics.span("prefilter"):
+        keep = prefilter_signal(sig, dedupe=False).keep
+    if not keep:
+        metrics.INGEST_DROPPED.inc("prefilter")
+        return False
+
+    # ✅ LLM filter
+    with metrics.span("llm_filter"):
+        filtered = await filter_signal_with_llm(sig)
+    if not filtered or not filtered.get("valuable"):
+        metrics.INGEST_DROPPED.inc("llm_filter")
+        return False
+
+    sig.symbol = filtered.get("token")
+    sig.contract = filtered.get("contract", sig.contract)
+    sig.confidence = filtered.get("confidence", sig.confidence)
+
+    enqueue_signal(sig)
+    return True
 
-    secret = settings.helius_webhook_secret or ""
-    if not verify_signature(secret, body, x_helius_signature or ""):
-        raise HTTPException(status_code=401, detail="Invalid signature")
 
-    payload = json.loads(body)
-    accepted, dropped = 0, 0
+async def process_signals(signals: List[Signal]) -> None:
+    """Background half of the webhook: filter concurrently, then enqueue."""
+    results = await asyncio.gather(*(_process_one(s) for s in signals))
+    accepted = sum(1 for ok in results if ok)
+    logger.info(f"[helius] accepted={accepted} dropped={len(results) - accepted}")
 
+
+webhook_queue = WebhookQueue.from_env(process_signals, name="helius")
+metrics.gauge(
+    "memebot_queue_depth",
+    "Items waiting in a queue",
+    lambda: webhook_queue.depth(),
+    queue="webhook_helius",
+)
+
+
+def _parse_signals(payload: dict) -> List[Tuple[Optional[str], Signal]]:
+    """Signals keyed by ``signature:mint`` (None when the tx has no signature)."""
+    signals: List[Tuple[Optional[str], Signal]] = []
     for txn in payload.get("transactions", []):
         account = txn.get("account", "")
         description = txn.get("description", "")
@@ -53,6 +93,7 @@ async def helius_handler(
         if not token:
             continue
 
+        signature = txn.get("signature")
         sig = Signal(
             platform="helius",
             type="wallet",
@@ -62,22 +103,47 @@ async def helius_handler(
             confidence=1.0,
             contract=token,
         )
+        signals.append((tx_key(signature, token) if signature else None, sig))
+    return signals
 
-        # ✅ LLM filter
-        filtered = await filter_signal_with_llm(sig)
-        if not filtered or not filtered.get("valuable"):
-            dropped += 1
-            continue
 
-        sig.symbol = filtered.get("token")
-        sig.contract = filtered.get("contract", sig.contract)
-        sig.confidence = filtered.get("confidence", sig.confidence)
+@app.post("/helius")
+async def helius_handler(
+    request: Request,
+    x_helius_signature: str = Header(None),
+):
+    body = await request.body()
 
-        enqueue_signal(sig)
-        accepted += 1
+    secret = settings.helius_webhook_secret or ""
+    if not verify_signature(secret, body, x_helius_signature or ""):
+        raise HTTPException(status_code=401, detail="Invalid signature")
 
-    logger.info(f"[helius] accepted={accepted} dropped={dropped}")
-    return {"ok": True, "accepted": accepted, "dropped": dropped}
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+
+    did = delivery_id(body)
+    keyed = _parse_signals(payload if isinstance(payload, dict) else {})
+    seen = get_seen_txs()
+    signals, claimed = seen.claim_new(keyed)
+    for sig in signals:
+        metrics.mark_received(sig)
+    status = webhook_queue.submit(did, signals)
+    if status != DUPLICATE:  # a resent delivery is counted once, as a delivery
+        webhook_queue.count_tx_duplicates(len(keyed) - len(signals))
+    if status != QUEUED:
+        for key in claimed:
+            seen.forget(key)
+    if status == REJECTED:
+        raise HTTPException(status_code=503, detail="Webhook queue full")
+    return {
+        "ok": True,
+        "delivery_id": did,
+        "duplicate": status == DUPLICATE,
+        "queued": len(signals) if status == QUEUED else 0,
+        "duplicate_txs": len(keyed) - len(signals),
+    }
 
 
 def start(port: int | None = None):
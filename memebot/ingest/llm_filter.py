@@ -1,56 +1,292 @@
 # memebot/ingest/llm_filter.py
 import os
+import re
 import json
-from typing import Dict, Any
+import time
+import asyncio
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Tuple
 from memebot.types import SocialSignal
-import openai  # or another LLM client
+from memebot import metrics
 
-# Use environment variable for API key
-openai.api_key = os.getenv("OPENAI_API_KEY", "")
+# Optional deps (used if present)
+try:
+    import openai  # type: ignore
 
+    HAVE_OPENAI = True
+except Exception:  # pragma: no cover
+    HAVE_OPENAI = False
 
-async def filter_signal_with_llm(signal: SocialSignal) -> Dict[str, Any]:
+NO_KEY_RESULT = {
+    "valuable": False,
+    "reason": "No LLM API key set",
+    "token": None,
+    "confidence": 0.0,
+}
+
+PROMPT = """
+You are an expert crypto researcher analyzing social media.
+Classify each of the following messages independently:
+
+{messages}
+
+Instructions:
+- If a message contains a genuine crypto signal (e.g. buy/sell/mention of a token/contract), mark valuable=true.
+- If it's spam, giveaway, unrelated noise, mark valuable=false.
+- If valuable=true, extract the token symbol/contract if mentioned.
+- Assign a confidence score (0.0–1.0) for how likely this is actionable.
+
+Respond ONLY in JSON of the form {{"results": [...]}} with one object per message, in order.
+Each object has keys: valuable (true/false), reason (string), token (string|null), confidence (float).
+"""
+
+
+def _api_key() -> str:
+    return os.getenv("OPENAI_API_KEY", "")
+
+
+def _text(signal: Any) -> str:
+    return getattr(signal, "text", None) or getattr(signal, "content", None) or ""
+
+
+def content_key(signal: Any) -> str:
+    """Hash of the normalized message text; identical shills share a key."""
+    norm = re.sub(r"\s+", " ", _text(signal).strip().lower())
+    return hashlib.sha256(norm.encode()).hexdigest()
+
+
+def _error_result(reason: str) -> Dict[str, Any]:
+    return {"valuable": False, "reason": reason, "token": None, "confidence": 0.0}
+
+
+@dataclass
+class LLMStats:
+    calls: int = 0
+    messages: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    coalesced: int = 0
+    errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms_total: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["avg_batch"] = self.messages / self.calls if self.calls else 0.0
+        d["avg_latency_ms"] = self.latency_ms_total / self.calls if self.calls else 0.0
+        return d
+
+
+class ResultCache:
+    """Thread-safe TTL + LRU cache of classification results."""
+
+    def __init__(self, ttl_sec: float = 600.0, max_entries: int = 4096):
+        self.ttl_sec = float(ttl_sec)
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.ttl_sec <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return dict(entry[1])
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        if self.ttl_sec <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_sec, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+stats = LLMStats()
+result_cache = ResultCache(
+    ttl_sec=float(os.getenv("LLM_CACHE_TTL_SEC", "600") or 0),
+    max_entries=int(os.getenv("LLM_CACHE_MAX", "4096") or 4096),
+)
+
+
+class LLMClassifier:
+    """Micro-batching classifier bound to one event loop.
+
+    Messages arriving within ``window_ms`` (or until ``max_batch`` is
+    reached) share one chat completion. Identical texts waiting in the same
+    window are sent once. ``max_concurrency`` caps in-flight requests.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model: str = "gpt-4o-mini",
+        window_ms: float = 50.0,
+        max_batch: int = 16,
+        max_concurrency: int = 4,
+        http_client: Any = None,
+    ):
+        self.api_key = api_key if api_key is not None else _api_key()
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL") or None
+        self.model = model
+        self.window_sec = max(0.0, float(window_ms)) / 1000.0
+        self.max_batch = max(1, int(max_batch))
+        self._sem = asyncio.Semaphore(max(1, int(max_concurrency)))
+        self._http_client = http_client
+        self._client: Any = None
+        self._pending: List[Tuple[str, Any, "asyncio.Future[Dict[str, Any]]"]] = []
+        self._pending_keys: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @classmethod
+    def from_env(cls) -> "LLMClassifier":
+        return cls(
+            model=os.getenv("LLM_MODEL", "gpt-4o-mini"),
+            window_ms=float(os.getenv("LLM_BATCH_WINDOW_MS", "50") or 0),
+            max_batch=int(os.getenv("LLM_BATCH_MAX", "16") or 16),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "4") or 4),
+        )
+
+    def _get_client(self) -> Any:
+        if self._client is None:
+            self._client = openai.AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                http_client=self._http_client,
+            )
+        return self._client
+
+    async def classify(self, signal: Any) -> Dict[str, Any]:
+        key = content_key(signal)
+        hit = result_cache.get(key)
+        if hit is not None:
+            stats.cache_hits += 1
+            return hit
+        waiting = self._pending_keys.get(key)
+        if waiting is not None:
+            stats.coalesced += 1
+            return dict(await asyncio.shield(waiting))
+        stats.cache_misses += 1
+
+        loop = asyncio.get_running_loop()
+        fut: "asyncio.Future[Dict[str, Any]]" = loop.create_future()
+        self._pending.append((key, signal, fut))
+        self._pending_keys[key] = fut
+        if len(self._pending) >= self.max_batch or self.window_sec == 0:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_sec, self._flush)
+        return dict(await fut)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(
+        self, batch: List[Tuple[str, Any, "asyncio.Future[Dict[str, Any]]"]]
+    ) -> None:
+        signals = [sig for _, sig, _ in batch]
+        async with self._sem:
+            t0 = time.perf_counter()
+            try:
+                results = await self._call(signals)
+                ok = True
+            except Exception as e:
+                stats.errors += 1
+                results = [_error_result(f"LLM error: {e}")] * len(batch)
+                ok = False
+            stats.calls += 1
+            stats.messages += len(batch)
+            stats.latency_ms_total += (time.perf_counter() - t0) * 1000.0
+        for (key, _, fut), res in zip(batch, results):
+            if ok:
+                result_cache.put(key, res)
+            self._pending_keys.pop(key, None)
+            if not fut.done():
+                fut.set_result(res)
+
+    async def _call(self, signals: List[Any]) -> List[Dict[str, Any]]:
+        messages = "\n".join(
+            f"{i + 1}. Message: {_text(s)}\n   Source: "
+            f"{getattr(s, 'platform', '')} / {getattr(s, 'source', '')}"
+            for i, s in enumerate(signals)
+        )
+        resp = await self._get_client().chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": PROMPT.format(messages=messages)}],
+            temperature=0,
+            response_format={"type": "json_object"},
+        )
+        usage = getattr(resp, "usage", None)
+        if usage is not None:
+            stats.prompt_tokens += int(getattr(usage, "prompt_tokens", 0) or 0)
+            stats.completion_tokens += int(getattr(usage, "completion_tokens", 0) or 0)
+        data = json.loads(resp.choices[0].message.content or "{}")
+        results = data.get("results") if isinstance(data, dict) else data
+        if isinstance(results, dict):
+            results = [results]
+        if not isinstance(results, list) or len(results) != len(signals):
+            raise ValueError("malformed batch response")
+        return [r if isinstance(r, dict) else _error_result("malformed") for r in results]
+
+
+_classifiers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LLMClassifier]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_classifier() -> LLMClassifier:
+    """Classifier for the running loop (asyncio primitives are loop-bound)."""
+    loop = asyncio.get_running_loop()
+    clf = _classifiers.get(loop)
+    if clf is None:
+        clf = LLMClassifier.from_env()
+        _classifiers[loop] = clf
+    return clf
+
+
+def llm_stats() -> Dict[str, Any]:
+    return stats.as_dict()
+
+
+def _llm_hit_ratio() -> float:
+    lookups = stats.cache_hits + stats.cache_misses
+    return stats.cache_hits / lookups if lookups else 0.0
+
+
+metrics.gauge("memebot_cache_hit_ratio", "Lookups served from cache", _llm_hit_ratio, cache="llm")
+
+
+async def filter_signal_with_llm(
+    signal: SocialSignal, classifier: Optional[LLMClassifier] = None
+) -> Dict[str, Any]:
     """
     Pass a SocialSignal through an LLM to determine if it's valuable.
     Returns a dict with 'valuable', 'reason', 'token', 'confidence'.
     """
-    if not openai.api_key:
+    clf = classifier or (get_classifier() if _api_key() else None)
+    if clf is None or not clf.api_key or not HAVE_OPENAI:
         # Fail-safe: if no key, mark everything as noise
-        return {
-            "valuable": False,
-            "reason": "No LLM API key set",
-            "token": None,
-            "confidence": 0.0,
-        }
-
-    prompt = f"""
-    You are an expert crypto researcher analyzing social media.
-    Classify the following message:
-
-    Message: {signal.text}
-    Source: {signal.platform} / {signal.source}
-
-    Instructions:
-    - If the message contains a genuine crypto signal (e.g. buy/sell/mention of a token/contract), mark valuable=true.
-    - If it's spam, giveaway, unrelated noise, mark valuable=false.
-    - If valuable=true, extract the token symbol/contract if mentioned.
-    - Assign a confidence score (0.0–1.0) for how likely this is actionable.
-
-    Respond ONLY in JSON with keys: valuable (true/false), reason (string), token (string|null), confidence (float).
-    """
-
-    try:
-        resp = await openai.ChatCompletion.acreate(
-            model="gpt-4o-mini",  # lightweight fast model
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0,
-        )
-        raw = resp.choices[0].message["content"]
-        return json.loads(raw)
-    except Exception as e:
-        return {
-            "valuable": False,
-            "reason": f"LLM error: {e}",
-            "token": None,
-            "confidence": 0.0,
-        }
\ No newline at end of file
+        return dict(NO_KEY_RESULT)
+    return await clf.classify(signal)
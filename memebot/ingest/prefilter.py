@@ -0,0 +1,174 @@
+"""Cheap local prefilter that runs before the LLM filter.
+
+Drops obvious noise (no contract, ticker or buy keyword; spammy wording;
+re-delivered messages) in microseconds and fills in ``contract`` /
+``symbol`` from the message text when the source didn't set them.
+"""
+
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+SOLANA_ADDR_RE = re.compile(r"(?<![0-9A-Za-z])[1-9A-HJ-NP-Za-km-z]{32,44}(?![0-9A-Za-z])")
+EVM_ADDR_RE = re.compile(r"\b0x[a-fA-F0-9]{40}\b")
+TICKER_RE = re.compile(r"\$([A-Za-z][A-Za-z0-9]{1,9})\b")
+BUY_RE = re.compile(
+    r"\b(buy|buying|bought|ape|aped|aping|entry|long|send|sending|moon|pump|launch|launched|gem|ca)\b",
+    re.IGNORECASE,
+)
+
+SPAM_WEIGHTS: Dict[str, float] = {
+    "giveaway": 2.0,
+    "airdrop": 1.0,
+    "free": 1.0,
+    "dm me": 2.0,
+    "dm for": 2.0,
+    "claim": 1.0,
+    "whitelist": 1.0,
+    "promo": 1.5,
+    "promotion": 1.5,
+    "follow": 0.5,
+    "retweet": 1.0,
+    "like and": 1.0,
+    "winner": 1.0,
+    "guaranteed": 1.5,
+    "100x guaranteed": 2.0,
+    "connect wallet": 2.0,
+    "seed phrase": 3.0,
+}
+SPAM_RE = re.compile(
+    "|".join(re.escape(k) for k in sorted(SPAM_WEIGHTS, key=len, reverse=True)),
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class PrefilterResult:
+    keep: bool
+    reason: str
+    contracts: List[str] = field(default_factory=list)
+    tickers: List[str] = field(default_factory=list)
+    spam_score: float = 0.0
+
+
+def _text(sig: Any) -> str:
+    return getattr(sig, "text", None) or getattr(sig, "content", None) or ""
+
+
+def spam_score(text: str) -> float:
+    return sum(SPAM_WEIGHTS[m.group(0).lower()] for m in SPAM_RE.finditer(text))
+
+
+def extract_contracts(text: str) -> List[str]:
+    found = EVM_ADDR_RE.findall(text)
+    found += SOLANA_ADDR_RE.findall(text)
+    return list(dict.fromkeys(found))
+
+
+class Prefilter:
+    def __init__(
+        self,
+        spam_threshold: float = 2.0,
+        dedupe_ttl_sec: float = 300.0,
+        dedupe_max: int = 10_000,
+    ):
+        self.spam_threshold = float(spam_threshold)
+        self.dedupe_ttl_sec = float(dedupe_ttl_sec)
+        self.dedupe_max = max(1, int(dedupe_max))
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.kept = 0
+        self.dropped: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "Prefilter":
+        return cls(
+            spam_threshold=float(os.getenv("PREFILTER_SPAM_THRESHOLD", "2") or 2),
+            dedupe_ttl_sec=float(os.getenv("PREFILTER_DEDUPE_TTL_SEC", "300") or 0),
+            dedupe_max=int(os.getenv("PREFILTER_DEDUPE_MAX", "10000") or 10000),
+        )
+
+    def _dedupe_key(self, sig: Any, text: str) -> str:
+        # Same message re-delivered by the same source; cross-source repeats
+        # pass so fusion can still boost them.
+        norm = re.sub(r"\s+", " ", text.strip().lower())
+        raw = "|".join(
+            [
+                str(getattr(sig, "platform", "")),
+                str(getattr(sig, "source", "")),
+                str(getattr(sig, "contract", "") or ""),
+                norm,
+            ]
+        )
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    def _seen_before(self, key: str) -> bool:
+        if self.dedupe_ttl_sec <= 0:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            while self._seen:
+                _, ts = next(iter(self._seen.items()))
+                if now - ts < self.dedupe_ttl_sec:
+                    break
+                self._seen.popitem(last=False)
+            if key in self._seen:
+                return True
+            self._seen[key] = now
+            while len(self._seen) > self.dedupe_max:
+                self._seen.popitem(last=False)
+            return False
+
+    def _drop(self, reason: str, **kw: Any) -> PrefilterResult:
+        with self._lock:
+            self.dropped[reason] = self.dropped.get(reason, 0) + 1
+        return PrefilterResult(keep=False, reason=reason, **kw)
+
+    def check(self, sig: Any, dedupe: bool = True) -> PrefilterResult:
+        """Classify ``sig`` and fill in contract/symbol from its text."""
+        text = _text(sig)
+        score = spam_score(text) if text else 0.0
+        contracts = extract_contracts(text) if text else []
+        tickers = [t.upper() for t in TICKER_RE.findall(text)] if text else []
+
+        if score >= self.spam_threshold:
+            return self._drop("spam", contracts=contracts, tickers=tickers, spam_score=score)
+
+        has_contract = bool(getattr(sig, "contract", None)) or bool(contracts)
+        if not (has_contract or tickers or (text and BUY_RE.search(text))):
+            return self._drop("no_signal", spam_score=score)
+
+        if dedupe and self._seen_before(self._dedupe_key(sig, text)):
+            return self._drop("duplicate", contracts=contracts, tickers=tickers, spam_score=score)
+
+        if contracts and not getattr(sig, "contract", None):
+            sig.contract = contracts[0]
+        if tickers and not getattr(sig, "symbol", None):
+            sig.symbol = tickers[0]
+        with self._lock:
+            self.kept += 1
+        return PrefilterResult(
+            keep=True, reason="ok", contracts=contracts, tickers=tickers, spam_score=score
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"kept": self.kept, "dropped": dict(self.dropped)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._seen.clear()
+            self.kept = 0
+            self.dropped = {}
+
+
+prefilter = Prefilter.from_env()
+
+
+def prefilter_signal(sig: Any, dedupe: bool = True) -> PrefilterResult:
+    return prefilter.check(sig, dedupe=dedupe)
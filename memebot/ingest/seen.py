@@ -0,0 +1,165 @@
+"""Bounded, time-expiring set of processed transactions.
+
+Webhook paths key each (transaction signature, mint) pair here before
+trading on it, so provider retries and overlapping notifications for the
+same transaction are dropped. With a db path the set is mirrored to SQLite
+and reloaded on start, so a restart does not re-buy recent transactions.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import pathlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+logger = logging.getLogger("memebot.seen")
+
+
+def tx_key(signature: str, mint: str) -> str:
+    return f"{signature}:{mint}"
+
+
+class SeenSet:
+    def __init__(
+        self,
+        ttl_sec: float = 3600.0,
+        max_entries: int = 100_000,
+        db_path: Optional[pathlib.Path] = None,
+    ):
+        self.ttl_sec = float(ttl_sec)
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.added = 0
+        self.duplicates = 0
+        self.evictions = 0
+        if db_path is not None:
+            self._open_db(pathlib.Path(db_path))
+
+    @classmethod
+    def from_env(cls) -> "SeenSet":
+        db = os.getenv("WEBHOOK_SEEN_DB", "")
+        return cls(
+            ttl_sec=float(os.getenv("WEBHOOK_SEEN_TTL_SEC", "3600") or 0),
+            max_entries=int(os.getenv("WEBHOOK_SEEN_MAX", "100000") or 100000),
+            db_path=pathlib.Path(db) if db else None,
+        )
+
+    def _open_db(self, path: pathlib.Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY, ts REAL NOT NULL)")
+        cutoff = time.time() - self.ttl_sec
+        conn.execute("DELETE FROM seen WHERE ts < ?", (cutoff,))
+        rows = conn.execute(
+            "SELECT key, ts FROM seen ORDER BY ts DESC LIMIT ?", (self.max_entries,)
+        ).fetchall()
+        for key, ts in reversed(rows):
+            self._entries[key] = ts
+        self._conn = conn
+        logger.info(f"[seen] loaded {len(rows)} entries from {path}")
+
+    def _expire(self, now: float) -> None:
+        # Caller holds self._lock
+        while self._entries:
+            _, ts = next(iter(self._entries.items()))
+            if now - ts < self.ttl_sec:
+                break
+            self._entries.popitem(last=False)
+
+    def first_seen(self, key: str) -> bool:
+        """Record ``key``; False if it was already seen inside the TTL."""
+        if self.ttl_sec <= 0:
+            return True
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            if key in self._entries:
+                self.duplicates += 1
+                return False
+            self._entries[key] = now
+            self.added += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO seen (key, ts) VALUES (?, ?)", (key, now)
+                )
+                if self.added % 1000 == 0:
+                    self._conn.execute("DELETE FROM seen WHERE ts < ?", (now - self.ttl_sec,))
+            return True
+
+    def claim_new(self, items: Iterable[Tuple[Optional[str], T]]) -> Tuple[List[T], List[str]]:
+        """Split ``(key, item)`` pairs into unseen items and the keys claimed.
+
+        Items without a key can't be deduped and always pass.
+        """
+        fresh: List[T] = []
+        claimed: List[str] = []
+        for key, item in items:
+            if key is None:
+                fresh.append(item)
+            elif self.first_seen(key):
+                fresh.append(item)
+                claimed.append(key)
+        return fresh, claimed
+
+    def forget(self, key: str) -> None:
+        """Undo ``first_seen`` (e.g. the work for ``key`` was not queued)."""
+        with self._lock:
+            self._entries.pop(key, None)
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM seen WHERE key = ?", (key,))
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            ts = self._entries.get(key)
+            return ts is not None and time.time() - ts < self.ttl_sec
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "added": self.added,
+                "duplicates": self.duplicates,
+                "evictions": self.evictions,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_seen_txs: Optional[SeenSet] = None
+_lock = threading.Lock()
+
+
+def get_seen_txs() -> SeenSet:
+    """Process-wide seen-set shared by every webhook route."""
+    global _seen_txs
+    with _lock:
+        if _seen_txs is None:
+            _seen_txs = SeenSet.from_env()
+        return _seen_txs
+
+
+def reset_seen_txs() -> None:
+    global _seen_txs
+    with _lock:
+        if _seen_txs is not None:
+            _seen_txs.close()
+        _seen_txs = None
@@ -3,32 +3,50 @@ import queue
 import threading
 import time
 import asyncio
+import inspect
 from typing import Callable, Generator, Optional
 from memebot.types import SocialSignal
 from memebot.config.watchlist import watchlist
 from memebot.ingest.llm_filter import filter_signal_with_llm  # ✅ Correct LLM filter
+from memebot.ingest.prefilter import prefilter_signal
+from memebot import metrics
 
 logger = logging.getLogger("memebot.discord")
 
 
-def _process_signal(sig: SocialSignal, callback: Callable[[SocialSignal], None], debug: bool = False):
-    """Run LLM filter before passing to callback."""
-    filtered = asyncio.run(filter_signal_with_llm(sig))
+async def _process_signal(sig: SocialSignal, callback: Callable[[SocialSignal], None], debug: bool = False):
+    """Run prefilter and LLM filter before passing to callback."""
+    metrics.mark_received(sig)
+    with metrics.span("prefilter"):
+        pre = prefilter_signal(sig)
+    if not pre.keep:
+        metrics.INGEST_DROPPED.inc("prefilter")
+        if debug:
+            logger.info(f"[discord][prefilter] dropped {pre.reason}: {(sig.text or '')[:60]}")
+        return
+    with metrics.span("llm_filter"):
+        filtered = await filter_signal_with_llm(sig)
     if not filtered or not filtered.get("valuable"):
+        metrics.INGEST_DROPPED.inc("llm_filter")
         if debug:
             logger.info(f"[discord] dropped noise: {sig.text[:60]}")
         return
 
-    sig.symbol = filtered.get("token")
-    sig.contract = filtered.get("token")
+    sig.symbol = filtered.get("token") or sig.symbol
+    sig.contract = sig.contract or filtered.get("token")
     sig.confidence = filtered.get("confidence", sig.confidence)
 
     if debug:
         logger.info(f"[discord] accepted signal: {sig.model_dump()}")
-    callback(sig)
+    if inspect.iscoroutinefunction(callback):
+        await callback(sig)
+    else:
+        callback(sig)
 
 
-def run_discord_ingest(callback: Callable[[SocialSignal], None], debug: bool = False):
+async def run_discord_ingest_async(
+    callback: Callable[[SocialSignal], None], debug: bool = False
+):
     """Fake Discord ingest (real impl would use discord.py)."""
     channels = watchlist.get("discord_channels", [])
     logger.info(f"[discord] monitoring channels: {channels}")
@@ -44,7 +62,12 @@ def run_discord_ingest(callback: Callable[[SocialSignal], None], debug: bool = F
             text=msg_text,
             caller="dc-user",
         )
-        _process_signal(sig, callback, debug=debug)
+        await _process_signal(sig, callback, debug=debug)
+
+
+def run_discord_ingest(callback: Callable[[SocialSignal], None], debug: bool = False):
+    """Blocking wrapper: runs the async ingest on its own event loop."""
+    asyncio.run(run_discord_ingest_async(callback, debug=debug))
 
 
 async def verify_discord_credentials() -> str:
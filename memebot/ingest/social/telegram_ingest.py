@@ -5,6 +5,8 @@ from typing import Callable, Generator, Optional
 from memebot.types import SocialSignal
 from memebot.config.watchlist import watchlist
 from memebot.ingest.llm_filter import filter_signal_with_llm
+from memebot.ingest.prefilter import prefilter_signal
+from memebot import metrics
 
 logger = logging.getLogger("memebot.telegram")
 
@@ -17,8 +19,17 @@ if USE_REAL_TELEGRAM:
 
 
 async def _process_signal(sig: SocialSignal, callback, debug: bool = False):
-    """Run a signal through the LLM filter before forwarding."""
-    result = await filter_signal_with_llm(sig)
+    """Run a signal through the prefilter and LLM filter before forwarding."""
+    metrics.mark_received(sig)
+    with metrics.span("prefilter"):
+        pre = prefilter_signal(sig)
+    if not pre.keep:
+        metrics.INGEST_DROPPED.inc("prefilter")
+        if debug:
+            logger.info(f"[telegram][prefilter] dropped: {pre.reason}")
+        return
+    with metrics.span("llm_filter"):
+        result = await filter_signal_with_llm(sig)
     if result["valuable"]:
         sig.symbol = result.get("token") or sig.symbol
         sig.confidence = result.get("confidence", sig.confidence)
@@ -29,6 +40,7 @@ async def _process_signal(sig: SocialSignal, callback, debug: bool = False):
         else:
             callback(sig)
     else:
+        metrics.INGEST_DROPPED.inc("llm_filter")
         if debug:
             logger.info(f"[telegram][LLM] dropped as noise: {result.get('reason')}")
 
@@ -0,0 +1,173 @@
+"""Fast-ack webhook intake with background processing.
+
+Routes validate the request, hand the parsed payload to ``submit`` and
+return immediately; a pool of workers (a ``SignalBus``) runs the slow part
+(LLM filtering, quoting, trading). Deliveries are identified by a hash of
+the raw body, so a provider retrying the same request gets the original
+delivery id back and the payload is not processed twice.
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+import inspect
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from memebot import metrics
+from memebot.ingest.bus import SignalBus
+
+logger = logging.getLogger("memebot.webhook")
+
+QUEUED = "queued"
+DUPLICATE = "duplicate"
+REJECTED = "rejected"
+
+
+def delivery_id(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+@dataclass
+class WebhookStats:
+    received: int = 0
+    queued: int = 0
+    duplicates: int = 0
+    tx_duplicates: int = 0
+    rejected: int = 0
+    processed: int = 0
+    failed: int = 0
+
+
+class WebhookQueue:
+    def __init__(
+        self,
+        handler: Callable[[Any], Any],
+        maxsize: int = 1000,
+        workers: int = 4,
+        dedupe_ttl_sec: float = 600.0,
+        dedupe_max: int = 10_000,
+        name: str = "webhook",
+    ):
+        self.handler = handler
+        self.maxsize = max(1, int(maxsize))
+        self.workers = max(1, int(workers))
+        self.dedupe_ttl_sec = float(dedupe_ttl_sec)
+        self.dedupe_max = max(1, int(dedupe_max))
+        self.name = name
+        self.stats = WebhookStats()
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bus: Optional[SignalBus] = None
+
+    @classmethod
+    def from_env(cls, handler: Callable[[Any], Any], name: str = "webhook") -> "WebhookQueue":
+        return cls(
+            handler,
+            maxsize=int(os.getenv("WEBHOOK_QUEUE_MAXSIZE", "1000") or 1000),
+            workers=int(os.getenv("WEBHOOK_WORKERS", "4") or 4),
+            dedupe_ttl_sec=float(os.getenv("WEBHOOK_DEDUPE_TTL_SEC", "600") or 0),
+            name=name,
+        )
+
+    def _ensure_started(self) -> SignalBus:
+        # Workers live on the serving loop; rebuild if the app moved loops
+        loop = asyncio.get_running_loop()
+        if self._bus is None or self._bus._loop is not loop:
+            self._bus = SignalBus(maxsize=self.maxsize, policy="drop_new", consumers=self.workers)
+            self._bus.start(self._worker_fn())
+        return self._bus
+
+    def _worker_fn(self) -> Callable[[Tuple[str, Any]], Any]:
+        if inspect.iscoroutinefunction(self.handler):
+
+            async def run_async(item: Tuple[str, Any]) -> None:
+                _, payload = item
+                try:
+                    await self.handler(payload)
+                except Exception:
+                    self.stats.failed += 1
+                    raise
+                self.stats.processed += 1
+
+            return run_async
+
+        def run(item: Tuple[str, Any]) -> None:
+            _, payload = item
+            try:
+                self.handler(payload)
+            except Exception:
+                with self._lock:
+                    self.stats.failed += 1
+                raise
+            with self._lock:
+                self.stats.processed += 1
+
+        return run
+
+    def _remember(self, did: str) -> bool:
+        """Record ``did``; False if it was already seen inside the TTL."""
+        if self.dedupe_ttl_sec <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            while self._seen:
+                _, ts = next(iter(self._seen.items()))
+                if now - ts < self.dedupe_ttl_sec:
+                    break
+                self._seen.popitem(last=False)
+            if did in self._seen:
+                return False
+            self._seen[did] = now
+            while len(self._seen) > self.dedupe_max:
+                self._seen.popitem(last=False)
+            return True
+
+    def _forget(self, did: str) -> None:
+        with self._lock:
+            self._seen.pop(did, None)
+
+    def submit(self, did: str, payload: Any) -> str:
+        """Queue ``payload`` for the workers; returns queued/duplicate/rejected."""
+        bus = self._ensure_started()
+        self.stats.received += 1
+        if not self._remember(did):
+            self.stats.duplicates += 1
+            metrics.WEBHOOK_DUPLICATES.inc("delivery")
+            return DUPLICATE
+        if not bus.publish_nowait((did, payload)):
+            # Let the provider retry this delivery once we have room
+            self._forget(did)
+            self.stats.rejected += 1
+            logger.warning(f"[{self.name}] queue full, rejected delivery {did}")
+            return REJECTED
+        self.stats.queued += 1
+        return QUEUED
+
+    def count_tx_duplicates(self, n: int) -> None:
+        """Record ``n`` transactions dropped by the seen-set before ``submit``."""
+        self.stats.tx_duplicates += n
+        if n:
+            metrics.WEBHOOK_DUPLICATES.inc("tx", n=n)
+
+    def depth(self) -> int:
+        return self._bus.depth() if self._bus is not None else 0
+
+    def stats_dict(self) -> Dict[str, Any]:
+        d = asdict(self.stats)
+        d["depth"] = self.depth()
+        return d
+
+    async def join(self) -> None:
+        """Wait until every queued delivery has been processed."""
+        if self._bus is not None:
+            await self._bus.join()
+
+    async def stop(self) -> None:
+        if self._bus is not None:
+            await self._bus.stop()
+            self._bus = None
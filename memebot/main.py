@@ -1,21 +1,26 @@
 import time
-import threading
 import asyncio
 import logging
+import itertools
+from typing import Optional
 import typer
 
 from memebot.config.settings import settings
 from memebot.config.watchlist import watchlist
 from memebot.strategy.simple import decide
 from memebot.strategy.entry import plan_entry
-from memebot.exec.paper import PaperTrade, append_trade
+from memebot.strategy.sizing import install_sighup_reload, reload_policy
+from memebot.exec.paper import PaperTrade, append_trade, close_journal
 from memebot.exec.sim import simulate_swap
+from memebot.exec.positions import open_position
 from memebot.ingest.mock import stream_mock_signals
-from memebot.solana.trade import trade_live
+from memebot.solana.trade import get_sender, trade_live
 from memebot.solana.jupiter import get_quote
 from memebot.strategy.exits import ExitManager, ExitLoop
 from memebot.ingest.social.telegram_ingest import run_telegram_ingest
-from memebot.ingest.social.discord_ingest import run_discord_ingest
+from memebot.ingest.social.discord_ingest import run_discord_ingest_async
+from memebot.ingest.bus import SignalBus
+from memebot import metrics
 
 
 app = typer.Typer()
@@ -29,8 +34,19 @@ logger = logging.getLogger("memebot")
 
 
 def handle_signal(sig, debug: bool = False, mode: str = "simulate"):
-    ok, reason, size_native, out_amt, impact_bps = plan_entry(sig)
-    decision = decide(sig, liq_ok=ok, est_price_impact_bps=impact_bps)
+    try:
+        return _handle_signal(sig, debug, mode)
+    finally:
+        metrics.observe_since("receipt_to_submit", sig)
+
+
+def _handle_signal(sig, debug: bool, mode: str):
+    with metrics.span("plan_entry"):
+        ok, reason, size_native, out_amt, impact_bps = plan_entry(sig)
+    with metrics.span("decide"):
+        decision = decide(sig, liq_ok=ok, est_price_impact_bps=impact_bps)
+    if decision.action != "buy":
+        metrics.SIGNALS_DROPPED.inc(decision.reason)
 
     if debug:
         logger.info(
@@ -58,9 +74,14 @@ def handle_signal(sig, debug: bool = False, mode: str = "simulate"):
                 if debug:
                     logger.warning(f"[live] no_quote {quote}")
                 return decision
-            res = trade_live(quote)
+            res = trade_live(quote, confidence=sig.confidence)
             if debug:
                 logger.info(f"[live] {res}")
+            if res.get("ok"):
+                open_position(
+                    "solana", base, sig.contract, size_native,
+                    float(quote.get("out_amount", out_amt)), note="live", signal=sig,
+                )
             return decision
 
         append_trade(
@@ -77,67 +98,116 @@ def handle_signal(sig, debug: bool = False, mode: str = "simulate"):
                 reason=decision.reason,
             )
         )
+        if mode == "paper":
+            open_position(
+                settings.network, base, sig.contract or "", size_native, float(out_amt),
+                note="paper", signal=sig,
+            )
         trade = simulate_swap(decision)
         if debug:
             logger.info(f"[simulate] {trade}")
     return decision
 
 
-@app.command()
-def run(
-    mode: str = typer.Option("simulate", help="simulate | paper | live"),
-    debug: bool = typer.Option(False, help="verbose logs"),
-    enable_exits: bool = typer.Option(False, help="enable exit loop"),
-    max_signals: int = typer.Option(0, help="limit signals for testing (0=unlimited)"),
-):
-    if debug:
-        logger.setLevel(logging.DEBUG)
+async def _iter_sync_stream(stream, bus: SignalBus, pace_sec: float = 0.2):
+    """Pump a blocking generator into the bus without blocking the loop."""
+    it = iter(stream)
+    sentinel = object()
+    while True:
+        sig = await asyncio.to_thread(next, it, sentinel)
+        if sig is sentinel:
+            return
+        metrics.mark_received(sig)
+        await bus.publish(sig)
+        await asyncio.sleep(pace_sec)
 
-    logger.info(
-        f"Starting MemeBot in {mode} mode (network={settings.network}, chain_id={settings.chain_id})"
-    )
 
-    streams = []
-    threads = []
+async def _run_pipeline(
+    mode: str, debug: bool, max_signals: int, bus: Optional[SignalBus] = None
+):
+    bus = bus or SignalBus.from_env()
+    done = asyncio.Event()
+    # next() on a count is atomic, so exactly one consumer thread sees max_signals
+    handled = itertools.count(1)
+
+    def consume(sig):
+        try:
+            handle_signal(sig, debug, mode)
+        finally:
+            if next(handled) == max_signals:
+                loop.call_soon_threadsafe(done.set)
+
+    loop = asyncio.get_running_loop()
+    bus.start(consume)
+    metrics.gauge(
+        "memebot_queue_depth", "Items waiting in a queue", bus.depth, queue="signal_bus"
+    )
 
+    sources = []
     # Mock data stream
     if settings.enable_mock:
-        streams.append(stream_mock_signals())
+        sources.append(_iter_sync_stream(stream_mock_signals(), bus))
 
-    # Telegram ingest thread
+    # Telegram ingest
     if (
         settings.enable_telegram
         and watchlist.get("telegram_groups")
         and watchlist.get("telegram_api_id")
         and watchlist.get("telegram_api_hash")
     ):
+        logger.info("[telegram] starting ingest")
+        sources.append(run_telegram_ingest(bus.publish, debug=debug))
 
-        def tg_runner():
-            logger.info("[telegram] starting ingest")
-            asyncio.run(
-                run_telegram_ingest(
-                    lambda sig: handle_signal(sig, debug, mode), debug=debug
-                )
-            )
-
-        t = threading.Thread(target=tg_runner, daemon=True, name="TelegramThread")
-        threads.append(t)
-        t.start()
-
-    # Discord ingest thread
+    # Discord ingest
     if (
         settings.enable_discord
         and watchlist.get("discord_channels")
         and watchlist.get("discord_token")
     ):
+        logger.info("[discord] starting ingest")
+        sources.append(run_discord_ingest_async(bus.publish, debug=debug))
+
+    source_tasks = [asyncio.create_task(src) for src in sources]
 
-        def dc_runner():
-            logger.info("[discord] starting ingest")
-            run_discord_ingest(lambda sig: handle_signal(sig, debug, mode), debug=debug)
+    async def drained():
+        await asyncio.gather(*source_tasks, return_exceptions=True)
+        await bus.join()
+
+    drain_task = asyncio.create_task(drained())
+    stop_task = asyncio.create_task(done.wait())
+    try:
+        await asyncio.wait({drain_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+        if done.is_set():
+            logger.info(f"Reached max_signals={max_signals}, exiting...")
+    finally:
+        for t in source_tasks + [drain_task, stop_task]:
+            t.cancel()
+        await bus.stop()
+        st = bus.stats
+        logger.info(
+            f"[bus] published={st.published} handled={st.handled} failed={st.failed} "
+            f"dropped_new={st.dropped_new} dropped_oldest={st.dropped_oldest} "
+            f"max_depth={st.max_depth} blocked={st.blocked_sec:.2f}s"
+        )
+
+
+@app.command()
+def run(
+    mode: str = typer.Option("simulate", help="simulate | paper | live"),
+    debug: bool = typer.Option(False, help="verbose logs"),
+    enable_exits: bool = typer.Option(False, help="enable exit loop"),
+    max_signals: int = typer.Option(0, help="limit signals for testing (0=unlimited)"),
+):
+    if debug:
+        logger.setLevel(logging.DEBUG)
 
-        t = threading.Thread(target=dc_runner, daemon=True, name="DiscordThread")
-        threads.append(t)
-        t.start()
+    logger.info(
+        f"Starting MemeBot in {mode} mode (network={settings.network}, chain_id={settings.chain_id})"
+    )
+    reload_policy()  # a bad sizing config fails here, not on the first signal
+    install_sighup_reload()
+    if mode == "live" and settings.network == "solana":
+        get_sender()  # load the keypair and RPC endpoints before the first signal
 
     # Exit loop manager
     exit_loop = None
@@ -146,21 +216,12 @@ def run(
         exit_loop = ExitLoop(exit_manager, mode=mode)
         exit_loop.start(debug=debug)
 
-    count = 0
     try:
-        for stream in streams:
-            for sig in stream:
-                handle_signal(sig, debug=debug, mode=mode)
-                count += 1
-                if max_signals and count >= max_signals:
-                    logger.info(f"Reached max_signals={max_signals}, exiting...")
-                    return
-                time.sleep(0.2)
+        asyncio.run(_run_pipeline(mode, debug, max_signals))
     finally:
         if exit_loop:
             exit_loop.stop()
-        for t in threads:
-            t.join(timeout=1)
+        close_journal()
 
 @app.command()
 def observe(debug: bool = False):
@@ -0,0 +1,293 @@
+"""Bot metrics: stage latency histograms, counters and gauges.
+
+Stages are timed with ``span(name)`` (context manager) or ``observe(name,
+ms)``. Each stage keeps a fixed set of log-spaced buckets, so memory is
+constant and recording is a bisect plus a few additions under a lock.
+``snapshot()`` reports count/mean/p50/p95/p99/max per stage.
+
+``Counter`` accumulates into a per-thread dict, so ingest threads never
+contend on increments; a scrape sums the per-thread cells. Gauges are
+callables sampled at scrape time. ``prometheus_text()`` renders all of it
+for ``GET /metrics``.
+
+With ``METRICS_ENABLED=0`` ``span`` returns a shared no-op context and
+nothing is recorded.
+
+Stage names used by the pipeline:
+
+- ``prefilter``, ``llm_filter``: ingest filters
+- ``plan_entry``, ``quote``: entry sizing and each Jupiter quote it makes
+- ``decide``: strategy decision
+- ``swap_request``, ``sign_send``: live order build and submission
+- ``receipt_to_submit``: message receipt until ``handle_signal`` returns
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Bucket upper bounds in ms: 10us .. ~120s, four buckets per doubling.
+BUCKETS_MS: List[float] = [0.01 * 2 ** (k / 4) for k in range(95)]
+QUANTILES = (0.5, 0.95, 0.99)
+
+_enabled = os.getenv("METRICS_ENABLED", "1").strip().lower() not in ("0", "false", "no", "")
+_NOOP = nullcontext()
+
+
+class Histogram:
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, ms: float) -> None:
+        i = bisect_left(BUCKETS_MS, ms)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum_ms += ms
+            if ms > self.max_ms:
+                self.max_ms = ms
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile (capped at max)."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q * self.count
+            seen = 0
+            for i, c in enumerate(self.counts):
+                seen += c
+                if seen >= rank and c:
+                    bound = BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+                    return min(bound, self.max_ms)
+            return self.max_ms
+
+    def summary(self) -> Dict[str, float]:
+        out = {
+            "count": self.count,
+            "mean_ms": self.sum_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+        }
+        for q in QUANTILES:
+            out[f"p{int(q * 100)}_ms"] = self.quantile(q)
+        return out
+
+
+_hists: Dict[str, Histogram] = {}
+_hists_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(on: bool) -> None:
+    global _enabled
+    _enabled = bool(on)
+
+
+def histogram(stage: str) -> Histogram:
+    h = _hists.get(stage)
+    if h is None:
+        with _hists_lock:
+            h = _hists.setdefault(stage, Histogram())
+    return h
+
+
+def observe(stage: str, ms: float) -> None:
+    if _enabled:
+        histogram(stage).observe(ms)
+
+
+class _Span:
+    __slots__ = ("stage", "t0")
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+
+    def __enter__(self) -> "_Span":
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        histogram(self.stage).observe((time.perf_counter() - self.t0) * 1000.0)
+
+
+def span(stage: str) -> Any:
+    """``with span("decide"): ...`` times the block into ``stage``."""
+    return _Span(stage) if _enabled else _NOOP
+
+
+class Counter:
+    """Labelled monotonic counter with per-thread accumulation."""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._local = threading.local()
+        self._cells: List[Dict[Tuple[str, ...], float]] = []
+        self._cells_lock = threading.Lock()
+
+    def _cell(self) -> Dict[Tuple[str, ...], float]:
+        cell = getattr(self._local, "cell", None)
+        if cell is None:
+            cell = self._local.cell = {}
+            with self._cells_lock:  # once per thread
+                self._cells.append(cell)
+        return cell
+
+    def inc(self, *label_values: str, n: float = 1) -> None:
+        if not _enabled:
+            return
+        cell = self._cell()
+        cell[label_values] = cell.get(label_values, 0) + n
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        with self._cells_lock:
+            cells = list(self._cells)
+        out: Dict[Tuple[str, ...], float] = {}
+        for cell in cells:
+            for k, v in dict(cell).items():
+                out[k] = out.get(k, 0) + v
+        return out
+
+    def reset(self) -> None:
+        with self._cells_lock:
+            for cell in self._cells:
+                cell.clear()
+
+
+_counters: Dict[str, Counter] = {}
+# name -> (help, {labels: fn})
+_gauges: Dict[str, Tuple[str, Dict[Tuple[Tuple[str, str], ...], Callable[[], float]]]] = {}
+_registry_lock = threading.Lock()
+
+
+def counter(name: str, help: str, labels: Tuple[str, ...] = ()) -> Counter:
+    with _registry_lock:
+        c = _counters.get(name)
+        if c is None:
+            c = _counters[name] = Counter(name, help, labels)
+        return c
+
+
+def gauge(name: str, help: str, fn: Callable[[], float], **labels: str) -> None:
+    """Sample ``fn()`` at scrape time; re-registering the same labels replaces it."""
+    with _registry_lock:
+        _, fns = _gauges.setdefault(name, (help, {}))
+        fns[tuple(sorted(labels.items()))] = fn
+
+
+SIGNALS_RECEIVED = counter(
+    "memebot_signals_received_total", "Signals received at ingest", ("platform",)
+)
+SIGNALS_DROPPED = counter(
+    "memebot_signals_dropped_total", "Signals not traded, by decision reason", ("reason",)
+)
+INGEST_DROPPED = counter(
+    "memebot_ingest_dropped_total", "Signals dropped before entry planning", ("stage",)
+)
+QUOTES = counter("memebot_quotes_total", "Jupiter quote requests issued", ("result",))
+WEBHOOK_DUPLICATES = counter(
+    "memebot_webhook_duplicates_total",
+    "Webhook deliveries or (tx, mint) pairs skipped as already seen",
+    ("kind",),
+)
+
+
+def mark_received(sig: Any) -> None:
+    """Count a received signal and stamp it for ``observe_since``."""
+    if _enabled:
+        SIGNALS_RECEIVED.inc(str(getattr(sig, "platform", "unknown")))
+        try:
+            sig._received_at = time.perf_counter()
+        except (AttributeError, TypeError, ValueError):
+            pass
+
+
+def observe_since(stage: str, sig: Any) -> None:
+    """Record time since ``mark_received(sig)``; no-op for unmarked signals."""
+    t0: Optional[float] = getattr(sig, "_received_at", None) if _enabled else None
+    if t0 is not None:
+        histogram(stage).observe((time.perf_counter() - t0) * 1000.0)
+
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    with _hists_lock:
+        items = sorted(_hists.items())
+    return {stage: h.summary() for stage, h in items}
+
+
+def _labels(pairs: Tuple[Tuple[str, str], ...]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def _sample(fn: Callable[[], float]) -> Optional[float]:
+    try:
+        return float(fn())
+    except Exception:
+        return None  # a broken gauge must not break the scrape
+
+
+def prometheus_text() -> str:
+    """Prometheus exposition of every counter, gauge and stage summary."""
+    lines: List[str] = []
+    with _registry_lock:
+        counters = sorted(_counters.items())
+        gauges = sorted((k, (h, dict(fns))) for k, (h, fns) in _gauges.items())
+    for name, c in counters:
+        lines += [f"# HELP {name} {c.help}", f"# TYPE {name} counter"]
+        for values, v in sorted(c.values().items()):
+            lines.append(f"{name}{_labels(tuple(zip(c.labels, values)))} {v:g}")
+    for name, (help, fns) in gauges:
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+        for pairs, fn in sorted(fns.items()):
+            v = _sample(fn)
+            if v is not None:
+                lines.append(f"{name}{_labels(pairs)} {v:g}")
+    prefix = "memebot_stage_latency_ms"
+    lines += [
+        f"# HELP {prefix} Hot-path stage latency in milliseconds",
+        f"# TYPE {prefix} summary",
+    ]
+    for stage, s in snapshot().items():
+        for q in QUANTILES:
+            v = s[f"p{int(q * 100)}_ms"]
+            lines.append(f'{prefix}{{stage="{stage}",quantile="{q}"}} {v:.6f}')
+        lines.append(f'{prefix}_sum{{stage="{stage}"}} {s["mean_ms"] * s["count"]:.6f}')
+        lines.append(f'{prefix}_count{{stage="{stage}"}} {int(s["count"])}')
+    return "\n".join(lines) + "\n"
+
+
+def counters_snapshot() -> Dict[str, Dict[str, float]]:
+    """``{counter: {"label,values": n}}`` for the JSON view."""
+    with _registry_lock:
+        counters = sorted(_counters.items())
+    return {name: {",".join(k): v for k, v in c.values().items()} for name, c in counters}
+
+
+def gauges_snapshot() -> Dict[str, Dict[str, Optional[float]]]:
+    with _registry_lock:
+        gauges = {k: dict(fns) for k, (_, fns) in _gauges.items()}
+    return {
+        name: {",".join(v for _, v in pairs): _sample(fn) for pairs, fn in fns.items()}
+        for name, fns in sorted(gauges.items())
+    }
+
+
+def reset() -> None:
+    """Clear recorded values (gauge registrations are kept)."""
+    with _hists_lock:
+        _hists.clear()
+    with _registry_lock:
+        for c in _counters.values():
+            c.reset()
@@ -1,10 +1,22 @@
 from fastapi import FastAPI, Request, Header, HTTPException
-from fastapi.responses import JSONResponse
-from typing import Optional, List, Dict, Any
+from fastapi.responses import JSONResponse, PlainTextResponse
+from typing import Optional, List, Dict, Any, Tuple
+import json
 import time
 from memebot.config import settings
+from memebot import metrics
 from memebot.types import SocialSignal
 from memebot.main import handle_signal
+from memebot.exec import positions  # noqa: F401  (registers position gauges)
+from memebot.exec.pnl import parse_since, pnl_summary
+from memebot.ingest.seen import get_seen_txs, tx_key
+from memebot.ingest.webhook_queue import (
+    DUPLICATE,
+    QUEUED,
+    REJECTED,
+    WebhookQueue,
+    delivery_id,
+)
 
 app = FastAPI(title="MemeBot Webhooks")
 
@@ -16,6 +28,17 @@ def _auth_ok(provided: Optional[str]) -> bool:
     return provided == secret
 
 
+def _tx_signature(helius_payload: Dict[str, Any]) -> Optional[str]:
+    sig = helius_payload.get("signature")
+    if sig:
+        return sig
+    sig = (helius_payload.get("signatureInfo", {}) or {}).get("signature")
+    if sig:
+        return sig
+    sigs = (helius_payload.get("transaction", {}) or {}).get("signatures") or []
+    return sigs[0] if sigs else None
+
+
 def _extract_signals(helius_payload: Dict[str, Any]) -> List[SocialSignal]:
     signals: List[SocialSignal] = []
     events = helius_payload.get("events") or {}
@@ -43,20 +66,89 @@ def _extract_signals(helius_payload: Dict[str, Any]) -> List[SocialSignal]:
     return signals
 
 
+def process_signals(signals: List[SocialSignal]) -> None:
+    """Background half of the webhook; runs on a worker thread."""
+    for sig in signals:
+        handle_signal(sig, debug=True)
+
+
+webhook_queue = WebhookQueue.from_env(process_signals, name="server")
+metrics.gauge(
+    "memebot_queue_depth",
+    "Items waiting in a queue",
+    lambda: webhook_queue.depth(),
+    queue="webhook_server",
+)
+
+
 @app.post("/webhooks/helius")
 async def helius_webhook(
     request: Request, x_helius_signature: Optional[str] = Header(default=None)
 ):
     if not _auth_ok(x_helius_signature):
         raise HTTPException(status_code=401, detail="bad signature")
-    payload = await request.json()
+    body = await request.body()
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid json")
     notifications = payload if isinstance(payload, list) else [payload]
-    accepted = 0
+    keyed: List[Tuple[Optional[str], SocialSignal]] = []
     for note in notifications:
         data = note.get("data") if isinstance(note, dict) else None
         if not isinstance(data, dict):
             data = note
-        for sig in _extract_signals(data if isinstance(data, dict) else {}):
-            handle_signal(sig, debug=True)
-            accepted += 1
-    return JSONResponse({"ok": True, "accepted": accepted})
+        data = data if isinstance(data, dict) else {}
+        signature = _tx_signature(data)
+        for sig in _extract_signals(data):
+            key = tx_key(signature, sig.contract or "") if signature else None
+            keyed.append((key, sig))
+
+    seen = get_seen_txs()
+    signals, claimed = seen.claim_new(keyed)
+    for sig in signals:
+        metrics.mark_received(sig)
+    did = delivery_id(body)
+    status = webhook_queue.submit(did, signals)
+    if status != DUPLICATE:  # a resent delivery is counted once, as a delivery
+        webhook_queue.count_tx_duplicates(len(keyed) - len(signals))
+    if status != QUEUED:
+        for key in claimed:
+            seen.forget(key)
+    if status == REJECTED:
+        raise HTTPException(status_code=503, detail="webhook queue full")
+    return JSONResponse(
+        {
+            "ok": True,
+            "delivery_id": did,
+            "duplicate": status == DUPLICATE,
+            "accepted": len(signals) if status == QUEUED else 0,
+            "duplicate_txs": len(keyed) - len(signals),
+        }
+    )
+
+
+@app.get("/metrics")
+async def metrics_endpoint(format: str = "prometheus"):
+    """Counters, gauges and stage latency; ``?format=json`` for a dict."""
+    if format == "json":
+        return JSONResponse(
+            {
+                "enabled": metrics.enabled(),
+                "counters": metrics.counters_snapshot(),
+                "gauges": metrics.gauges_snapshot(),
+                "stages": metrics.snapshot(),
+                "webhook": webhook_queue.stats_dict(),
+            }
+        )
+    return PlainTextResponse(metrics.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/pnl")
+async def pnl_endpoint(since: str = "all", days: bool = False):
+    """Realized PnL from the running aggregates; ``since`` as in ``pnl_cli``."""
+    try:
+        since_ts = parse_since(since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse({"since_ts": since_ts, **pnl_summary(since_ts, daily=days)})
@@ -0,0 +1,182 @@
+"""Priority-fee oracle for live swaps.
+
+``FeeOracle`` samples ``getRecentPrioritizationFees`` from an RPC
+(``SOLANA_FEE_RPC``, default ``SOLANA_HTTP``), keeps a rolling window of
+per-slot fees and caches it sorted so a percentile lookup is an index.
+When the cache is older than ``PRIORITY_FEE_TTL_SEC`` the stale value is
+served while one background refresh runs; only the very first lookup
+waits on the RPC, and lookups racing it wait for that same fetch.
+
+``fee_lamports(urgency, confidence)`` turns a percentile into the total
+``prioritizationFeeLamports`` Jupiter expects, assuming
+``SWAP_COMPUTE_UNITS`` compute units, clamped to
+``[PRIORITY_FEE_MIN_LAMPORTS, PRIORITY_FEE_MAX_LAMPORTS]``.
+
+Urgency tiers:
+
+- ``entry``: p50 at confidence 0.5 rising linearly to p90 at 1.0
+- ``exit``: take-profit / trailing exits, p75
+- ``stop_loss``: p95 with a 1.5x bump; losing a landing race here costs
+  more than a late entry
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from memebot.config import settings
+from memebot.solana import http_client
+from memebot.solana.sender import DEFAULT_RPC
+
+logger = logging.getLogger("memebot.fees")
+
+# urgency -> (percentile, multiplier); ``entry`` percentile scales with confidence
+URGENCY_TIERS: Dict[str, Tuple[float, float]] = {
+    "entry": (50.0, 1.0),
+    "exit": (75.0, 1.0),
+    "stop_loss": (95.0, 1.5),
+}
+ENTRY_MAX_PERCENTILE = 90.0
+
+FeeFetch = Callable[[], List[Tuple[int, int]]]
+
+
+def urgency_for_exit(reason: str) -> str:
+    """Urgency tier for an exit ``reason`` from the exit rules."""
+    return "stop_loss" if reason == "stop_loss" else "exit"
+
+
+def _percentile(sorted_vals: List[int], pct: float) -> int:
+    if not sorted_vals:
+        return 0
+    idx = min(len(sorted_vals) - 1, int(round(pct / 100.0 * (len(sorted_vals) - 1))))
+    return sorted_vals[idx]
+
+
+def rpc_fetch(url: str, timeout: float = 2.0) -> FeeFetch:
+    """Fetcher returning ``[(slot, micro_lamports_per_cu), ...]`` from ``url``."""
+
+    def _fetch() -> List[Tuple[int, int]]:
+        r = http_client.post(
+            url,
+            json={"jsonrpc": "2.0", "id": 1, "method": "getRecentPrioritizationFees", "params": []},
+            timeout=timeout,
+        )
+        if r.status_code != 200:
+            raise RuntimeError(f"HTTP {r.status_code}")
+        rows = r.json().get("result") or []
+        return [(int(x["slot"]), int(x["prioritizationFee"])) for x in rows]
+
+    return _fetch
+
+
+class FeeOracle:
+    def __init__(
+        self,
+        fetch: FeeFetch,
+        ttl_sec: float = 2.0,
+        window: int = 300,
+        compute_units: int = 300_000,
+        min_lamports: int = 0,
+        max_lamports: int = 5_000_000,
+    ):
+        self._fetch = fetch
+        self.ttl_sec = float(ttl_sec)
+        self.window = max(1, int(window))
+        self.compute_units = int(compute_units)
+        self.min_lamports = int(min_lamports)
+        self.max_lamports = int(max_lamports)
+        self._slots: "OrderedDict[int, int]" = OrderedDict()
+        self._sorted: List[int] = []
+        self._fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._first_done = threading.Event()
+
+    @classmethod
+    def from_env(cls, fetch: Optional[FeeFetch] = None) -> "FeeOracle":
+        url = os.getenv("SOLANA_FEE_RPC") or settings.solana_http or DEFAULT_RPC
+        return cls(
+            fetch or rpc_fetch(url),
+            ttl_sec=float(os.getenv("PRIORITY_FEE_TTL_SEC", "2") or 2),
+            window=int(os.getenv("PRIORITY_FEE_WINDOW", "300") or 300),
+            compute_units=int(os.getenv("SWAP_COMPUTE_UNITS", "300000") or 300_000),
+            min_lamports=int(os.getenv("PRIORITY_FEE_MIN_LAMPORTS", "0") or 0),
+            max_lamports=int(os.getenv("PRIORITY_FEE_MAX_LAMPORTS", "5000000") or 5_000_000),
+        )
+
+    def refresh(self) -> bool:
+        """Fetch recent fees into the rolling window; False if the RPC failed."""
+        try:
+            rows = self._fetch()
+        except Exception as e:
+            logger.debug(f"[fees] refresh failed: {e}")
+            with self._lock:
+                self._refreshing = False
+                self._fetched_at = time.monotonic()  # back off until the next TTL
+            self._first_done.set()
+            return False
+        with self._lock:
+            for slot, fee in rows:
+                self._slots[slot] = fee
+            self._slots = OrderedDict(sorted(self._slots.items())[-self.window :])
+            self._sorted = sorted(self._slots.values())
+            self._fetched_at = time.monotonic()
+            self._refreshing = False
+        self._first_done.set()
+        return True
+
+    def _maybe_refresh(self) -> None:
+        with self._lock:
+            first = self._fetched_at is None
+            if self._refreshing:
+                if not first:
+                    return
+                join = True  # another caller is doing the first fetch
+            elif self._fetched_at is not None and time.monotonic() - self._fetched_at < self.ttl_sec:
+                return
+            else:
+                join = False
+                self._refreshing = True
+        if join:
+            self._first_done.wait()
+        elif first:
+            self.refresh()
+        else:
+            threading.Thread(target=self.refresh, name="fee-oracle", daemon=True).start()
+
+    def percentile(self, pct: float) -> int:
+        """Micro-lamports per compute unit at ``pct`` of the rolling window."""
+        self._maybe_refresh()
+        with self._lock:
+            return _percentile(self._sorted, pct)
+
+    def fee_lamports(self, urgency: str = "entry", confidence: Optional[float] = None) -> int:
+        pct, mult = URGENCY_TIERS.get(urgency, URGENCY_TIERS["entry"])
+        if urgency == "entry" and confidence is not None:
+            c = min(1.0, max(0.0, (float(confidence) - 0.5) / 0.5))
+            pct += (ENTRY_MAX_PERCENTILE - pct) * c
+        micro = self.percentile(pct) * mult
+        lamports = int(micro * self.compute_units / 1_000_000)
+        return max(self.min_lamports, min(self.max_lamports, lamports))
+
+
+_oracle: Optional[FeeOracle] = None
+_oracle_lock = threading.Lock()
+
+
+def get_fee_oracle() -> FeeOracle:
+    global _oracle
+    with _oracle_lock:
+        if _oracle is None:
+            _oracle = FeeOracle.from_env()
+        return _oracle
+
+
+def reset_fee_oracle() -> None:
+    global _oracle
+    with _oracle_lock:
+        _oracle = None
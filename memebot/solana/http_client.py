@@ -0,0 +1,145 @@
+"""Shared pooled HTTP client for Jupiter traffic.
+
+Sync calls go through one ``requests.Session`` with keep-alive pooling and
+urllib3 retries; async calls go through one ``httpx.AsyncClient`` (HTTP/2
+when the ``h2`` package is installed). Both retry 429/5xx with jittered
+exponential backoff.
+"""
+
+import os
+import random
+import asyncio
+import threading
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Optional deps (used if present)
+try:
+    import httpx  # type: ignore
+
+    HAVE_HTTPX = True
+except Exception:  # pragma: no cover
+    HAVE_HTTPX = False
+
+try:
+    import h2  # type: ignore  # noqa: F401
+
+    HAVE_H2 = True
+except Exception:
+    HAVE_H2 = False
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _max_per_host() -> int:
+    return int(os.getenv("JUPITER_MAX_CONN_PER_HOST", "20") or 20)
+
+
+def _retries() -> int:
+    return int(os.getenv("JUPITER_HTTP_RETRIES", "2") or 0)
+
+
+def _backoff() -> float:
+    return float(os.getenv("JUPITER_HTTP_BACKOFF_SEC", "0.2") or 0.0)
+
+
+_session: Optional[requests.Session] = None
+_async_client: Optional[Any] = None
+_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=_retries(),
+        backoff_factor=_backoff(),
+        backoff_jitter=_backoff(),
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=4, pool_maxsize=_max_per_host(), max_retries=retry
+    )
+    s = requests.Session()
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _lock:
+        if _session is None:
+            _session = _build_session()
+        return _session
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    return get_session().get(url, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> requests.Response:
+    return get_session().post(url, **kwargs)
+
+
+def get_async_client() -> Any:
+    """Return the shared ``httpx.AsyncClient``.
+
+    httpx clients are bound to the event loop they first run on, so use this
+    from the bot's single long-lived loop.
+    """
+    global _async_client
+    if not HAVE_HTTPX:
+        raise RuntimeError("httpx not installed")
+    if _async_client is None or _async_client.is_closed:
+        limits = httpx.Limits(
+            max_connections=_max_per_host(),
+            max_keepalive_connections=_max_per_host(),
+        )
+        _async_client = httpx.AsyncClient(http2=HAVE_H2, limits=limits)
+    return _async_client
+
+
+async def _arequest(method: str, url: str, **kwargs: Any) -> Any:
+    client = get_async_client()
+    attempts = _retries() + 1
+    backoff = _backoff()
+    resp = None
+    for attempt in range(attempts):
+        resp = await client.request(method, url, **kwargs)
+        if resp.status_code not in RETRY_STATUSES or attempt == attempts - 1:
+            return resp
+        delay = backoff * (2**attempt) + random.uniform(0, backoff)
+        retry_after = resp.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        await asyncio.sleep(delay)
+    return resp
+
+
+async def aget(url: str, **kwargs: Any) -> Any:
+    return await _arequest("GET", url, **kwargs)
+
+
+async def apost(url: str, **kwargs: Any) -> Any:
+    return await _arequest("POST", url, **kwargs)
+
+
+def close() -> None:
+    """Drop pooled sync connections (the next call builds a fresh session)."""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+async def aclose() -> None:
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
@@ -1,28 +1,28 @@
-import requests
 from memebot.config import settings
+from memebot.solana import http_client
+from memebot.solana.quote_cache import quote_cache
+from memebot import metrics
 
 
-def get_quote(
+def _quote_params(
     input_mint: str,
     output_mint: str,
     amount: int,
-    slippage_bps: int = 300,
-    only_direct_routes: bool = False,
+    slippage_bps: int,
+    only_direct_routes: bool,
 ) -> dict:
-    if settings.mock_jupiter:
-        return {"ok": True, "out_amount": int(amount * 120), "impact_bps": 30}
-    url = f"{settings.jupiter_base}/quote"
-    params = {
+    return {
         "inputMint": input_mint,
         "outputMint": output_mint,
         "amount": str(amount),
         "slippageBps": str(slippage_bps),
         "onlyDirectRoutes": "true" if only_direct_routes else "false",
     }
-    r = requests.get(url, params=params, timeout=10)
-    if r.status_code != 200:
-        return {"ok": False, "error": f"HTTP {r.status_code} {r.text}"}
-    data = r.json()
+
+
+def _parse_quote(status_code: int, text: str, data) -> dict:
+    if status_code != 200:
+        return {"ok": False, "error": f"HTTP {status_code} {text}"}
     if not data or "data" not in data or not data["data"]:
         return {"ok": False, "error": "no_route"}
     route = data["data"][0]
@@ -34,10 +34,81 @@ def get_quote(
     }
 
 
-def estimate_price_impact_solana(
-    input_mint: str, output_mint: str, amount: int
+def get_quote(
+    input_mint: str,
+    output_mint: str,
+    amount: int,
+    slippage_bps: int = 300,
+    only_direct_routes: bool = False,
+    estimate_only: bool = False,
+) -> dict:
+    if settings.mock_jupiter:
+        return {"ok": True, "out_amount": int(amount * 120), "impact_bps": 30}
+    url = f"{settings.jupiter_base}/quote"
+    params = _quote_params(
+        input_mint, output_mint, amount, slippage_bps, only_direct_routes
+    )
+
+    def fetch() -> dict:
+        try:
+            r = http_client.get(url, params=params, timeout=10)
+            q = _parse_quote(
+                r.status_code, r.text, r.json() if r.status_code == 200 else None
+            )
+        except Exception:
+            metrics.QUOTES.inc("failed")
+            raise
+        metrics.QUOTES.inc("ok" if q.get("ok") else "failed")
+        return q
+
+    if only_direct_routes:
+        return fetch()
+    key = quote_cache.key(input_mint, output_mint, amount, slippage_bps, bucket=estimate_only)
+    return quote_cache.get_or_fetch(key, amount, fetch)
+
+
+async def get_quote_async(
+    input_mint: str,
+    output_mint: str,
+    amount: int,
+    slippage_bps: int = 300,
+    only_direct_routes: bool = False,
+    estimate_only: bool = False,
 ) -> dict:
-    q = get_quote(input_mint, output_mint, amount)
+    if settings.mock_jupiter:
+        return {"ok": True, "out_amount": int(amount * 120), "impact_bps": 30}
+    url = f"{settings.jupiter_base}/quote"
+    params = _quote_params(
+        input_mint, output_mint, amount, slippage_bps, only_direct_routes
+    )
+
+    async def fetch() -> dict:
+        try:
+            r = await http_client.aget(url, params=params, timeout=10)
+            q = _parse_quote(
+                r.status_code, r.text, r.json() if r.status_code == 200 else None
+            )
+        except Exception:
+            metrics.QUOTES.inc("failed")
+            raise
+        metrics.QUOTES.inc("ok" if q.get("ok") else "failed")
+        return q
+
+    if only_direct_routes:
+        return await fetch()
+    key = quote_cache.key(input_mint, output_mint, amount, slippage_bps, bucket=estimate_only)
+    return await quote_cache.aget_or_fetch(key, amount, fetch)
+
+
+metrics.gauge(
+    "memebot_cache_hit_ratio",
+    "Lookups served from cache",
+    lambda: quote_cache.stats()["hit_rate"],
+    cache="jupiter_quote",
+)
+
+
+def _impact_result(q: dict) -> dict:
     if not q.get("ok"):
         return {
             "ok": False,
@@ -51,3 +122,17 @@ def estimate_price_impact_solana(
         "out_amount": q["out_amount"],
         "route": q.get("route"),
     }
+
+
+def estimate_price_impact_solana(
+    input_mint: str, output_mint: str, amount: int
+) -> dict:
+    return _impact_result(get_quote(input_mint, output_mint, amount, estimate_only=True))
+
+
+async def estimate_price_impact_solana_async(
+    input_mint: str, output_mint: str, amount: int
+) -> dict:
+    return _impact_result(
+        await get_quote_async(input_mint, output_mint, amount, estimate_only=True)
+    )
@@ -0,0 +1,183 @@
+"""Short-lived Jupiter quote cache with single-flight request coalescing.
+
+Keys are ``(input_mint, output_mint, amount, slippage_bps, bucketed)``.
+Quotes that may be executed are keyed on the exact amount. Estimate-only
+lookups (``bucket=True``) round the amount to ``QUOTE_CACHE_SIG_DIGITS``
+significant digits; a hit for a different amount in the same bucket has
+``out_amount`` scaled to the requested size. Every other field (route,
+``inAmount``, thresholds) still describes the cached amount, which is why
+those quotes must never be sent to the swap API. Only successful quotes
+are cached, and callers always get a deep copy.
+"""
+
+import os
+import copy
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+Key = Tuple[str, str, int, int, bool]
+
+
+def amount_bucket(amount: int, sig_digits: int) -> int:
+    """Round ``amount`` down to ``sig_digits`` significant digits (0 = exact)."""
+    amount = int(amount)
+    if sig_digits <= 0 or amount <= 0:
+        return amount
+    step = 10 ** max(0, len(str(amount)) - sig_digits)
+    return amount - amount % step
+
+
+class QuoteCache:
+    def __init__(self, ttl_sec: float = 2.0, max_entries: int = 1024, sig_digits: int = 4):
+        self.ttl_sec = float(ttl_sec)
+        self.max_entries = max(1, int(max_entries))
+        self.sig_digits = int(sig_digits)
+        self._entries: "OrderedDict[Key, Tuple[float, int, dict]]" = OrderedDict()
+        self._inflight: Dict[Key, Future] = {}
+        self._ainflight: Dict[Key, "asyncio.Future[dict]"] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_sec > 0
+
+    def key(
+        self,
+        input_mint: str,
+        output_mint: str,
+        amount: int,
+        slippage_bps: int,
+        bucket: bool = True,
+    ) -> Key:
+        return (
+            input_mint,
+            output_mint,
+            amount_bucket(amount, self.sig_digits) if bucket else int(amount),
+            int(slippage_bps),
+            bucket,
+        )
+
+    def _lookup(self, key: Key, amount: int) -> Optional[dict]:
+        # Caller holds self._lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, cached_amount, quote = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        out = copy.deepcopy(quote)
+        if cached_amount and cached_amount != amount and "out_amount" in out:
+            out["out_amount"] = int(int(out["out_amount"]) * amount / cached_amount)
+        return out
+
+    def _store(self, key: Key, amount: int, quote: dict) -> None:
+        # Caller holds self._lock
+        if not quote.get("ok"):
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_sec, int(amount), quote)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_fetch(self, key: Key, amount: int, fetch: Callable[[], dict]) -> dict:
+        """Return a cached quote, join an identical in-flight fetch, or fetch."""
+        if not self.enabled:
+            return fetch()
+        with self._lock:
+            hit = self._lookup(key, amount)
+            if hit is not None:
+                return hit
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = Future()
+                self._inflight[key] = fut
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        assert fut is not None
+        if not owner:
+            return copy.deepcopy(fut.result())
+        try:
+            quote = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            self._store(key, amount, quote)
+            self._inflight.pop(key, None)
+        fut.set_result(quote)
+        return copy.deepcopy(quote)
+
+    async def aget_or_fetch(
+        self, key: Key, amount: int, fetch: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        """Async variant; coalesces identical requests on the running loop."""
+        if not self.enabled:
+            return await fetch()
+        with self._lock:
+            hit = self._lookup(key, amount)
+            if hit is not None:
+                return hit
+            fut = self._ainflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = asyncio.get_running_loop().create_future()
+                self._ainflight[key] = fut
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        assert fut is not None
+        if not owner:
+            return copy.deepcopy(await asyncio.shield(fut))
+        try:
+            quote = await fetch()
+        except BaseException as e:
+            with self._lock:
+                self._ainflight.pop(key, None)
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved when nobody else is waiting
+            raise
+        with self._lock:
+            self._store(key, amount, quote)
+            self._ainflight.pop(key, None)
+        fut.set_result(quote)
+        return copy.deepcopy(quote)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.coalesced = self.evictions = 0
+
+
+quote_cache = QuoteCache(
+    ttl_sec=float(os.getenv("QUOTE_CACHE_TTL_SEC", "2") or 0),
+    max_entries=int(os.getenv("QUOTE_CACHE_MAX", "1024") or 1024),
+    sig_digits=int(os.getenv("QUOTE_CACHE_SIG_DIGITS", "4") or 0),
+)
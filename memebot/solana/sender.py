@@ -0,0 +1,271 @@
+"""Long-lived transaction signer/sender.
+
+``TxSender`` holds the keypair and one RPC client per endpoint for the
+life of the process. ``send`` signs a Jupiter swap transaction once and
+submits the same signed bytes to every endpoint in ``SOLANA_SEND_RPCS``
+in parallel. Because every endpoint gets identical bytes the signature is
+the same wherever it lands, so a duplicate submission cannot double-fill.
+
+Acceptance by an RPC only means the transaction was forwarded. Once the
+first endpoint accepts, ``getSignatureStatuses`` is polled on every
+endpoint every ``SOLANA_CONFIRM_POLL_SEC``. The first endpoint to report
+the signature at ``SOLANA_CONFIRM_COMMITMENT`` (default ``confirmed``)
+wins. If that takes longer than ``SOLANA_CONFIRM_TIMEOUT_SEC`` (``0``
+skips confirmation), the result has ``ok: False`` with ``submitted: True``
+and the signature, because the transaction may still land.
+"""
+
+import os
+import time
+import base64
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+# Optional deps (used if present)
+try:
+    from solders.transaction import VersionedTransaction  # type: ignore
+    from solders.signature import Signature  # type: ignore
+
+    HAVE_SOLDERS_TX = True
+except Exception:
+    HAVE_SOLDERS_TX = False
+
+logger = logging.getLogger("memebot.sender")
+
+DEFAULT_RPC = "http://localhost:8899"  # solana-py's own default
+
+COMMITMENTS = ("processed", "confirmed", "finalized")
+
+
+def endpoints_from_env(default: Optional[str] = None) -> List[str]:
+    """``SOLANA_SEND_RPCS`` (comma-separated), else ``default``."""
+    raw = os.getenv("SOLANA_SEND_RPCS", "")
+    urls = [u.strip() for u in raw.split(",") if u.strip()]
+    if not urls and default:
+        urls = [default]
+    return urls
+
+
+def sign_tx(raw: bytes, keypair: Any) -> bytes:
+    """Sign a serialized versioned transaction with ``keypair``.
+
+    Bytes that cannot be decoded (or no solders) are returned unchanged, as
+    the sender did before it signed anything itself.
+    """
+    if keypair is None or not HAVE_SOLDERS_TX:
+        return raw
+    try:
+        tx = VersionedTransaction.from_bytes(raw)
+        return bytes(VersionedTransaction(tx.message, [keypair]))
+    except Exception as e:
+        logger.warning(f"[sender] could not sign transaction, sending as given: {e}")
+        return raw
+
+
+def _signature(resp: Any) -> Optional[str]:
+    if isinstance(resp, dict):
+        sig = resp.get("result") or resp.get("signature") or resp.get("value")
+    else:
+        sig = getattr(resp, "value", resp)
+    return None if sig is None else str(sig)
+
+
+def _status(resp: Any) -> Optional[Dict[str, Any]]:
+    """First entry of a getSignatureStatuses response as a plain dict.
+
+    Accepts solana-py response objects or raw JSON-RPC dicts; None while
+    the node has not seen the signature.
+    """
+    if isinstance(resp, dict):
+        value = (resp.get("result") or {}).get("value") or [None]
+        st = value[0]
+        if st is None:
+            return None
+        return {
+            "confirmation_status": st.get("confirmationStatus"),
+            "err": st.get("err"),
+            "slot": st.get("slot"),
+        }
+    value = getattr(resp, "value", None) or [None]
+    st = value[0]
+    if st is None:
+        return None
+    level = getattr(st, "confirmation_status", None)
+    return {
+        "confirmation_status": None if level is None else str(level).split(".")[-1].lower(),
+        "err": getattr(st, "err", None),
+        "slot": getattr(st, "slot", None),
+    }
+
+
+def _reached(level: Optional[str], commitment: str) -> bool:
+    if level not in COMMITMENTS:
+        return False
+    return COMMITMENTS.index(level) >= COMMITMENTS.index(commitment)
+
+
+class TxSender:
+    """Sign once, fan out to several RPC endpoints, first confirmation wins."""
+
+    def __init__(
+        self,
+        keypair: Any,
+        endpoints: List[str],
+        client_factory: Callable[[str], Any],
+        timeout_sec: float = 10.0,
+        owner: Optional[str] = None,
+        confirm_timeout_sec: float = 30.0,
+        poll_sec: float = 0.5,
+        commitment: str = "confirmed",
+    ):
+        if commitment not in COMMITMENTS:
+            raise ValueError(f"commitment must be one of {COMMITMENTS}, got {commitment!r}")
+        self.keypair = keypair
+        self.owner = owner
+        self.endpoints = list(endpoints)
+        self.timeout_sec = float(timeout_sec)
+        self.confirm_timeout_sec = float(confirm_timeout_sec)
+        self.poll_sec = max(0.0, float(poll_sec))
+        self.commitment = commitment
+        self._client_factory = client_factory
+        self._clients: Dict[str, Any] = {}
+        self._clients_lock = threading.Lock()
+        # Room for a status poll per endpoint while slow sends are still running
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, 2 * len(self.endpoints)), thread_name_prefix="tx-send"
+        )
+
+    @classmethod
+    def from_env(
+        cls,
+        keypair: Any,
+        client_factory: Callable[[str], Any],
+        default_rpc: Optional[str] = None,
+        owner: Optional[str] = None,
+    ) -> "TxSender":
+        return cls(
+            keypair,
+            endpoints_from_env(default_rpc),
+            client_factory,
+            timeout_sec=float(os.getenv("SOLANA_SEND_TIMEOUT_SEC", "10") or 10),
+            owner=owner,
+            confirm_timeout_sec=float(os.getenv("SOLANA_CONFIRM_TIMEOUT_SEC", "30") or 0),
+            poll_sec=float(os.getenv("SOLANA_CONFIRM_POLL_SEC", "0.5") or 0.5),
+            commitment=(os.getenv("SOLANA_CONFIRM_COMMITMENT", "confirmed") or "confirmed")
+            .strip()
+            .lower(),
+        )
+
+    def client(self, url: str) -> Any:
+        c = self._clients.get(url)
+        if c is None:
+            with self._clients_lock:
+                c = self._clients.get(url)
+                if c is None:
+                    c = self._clients[url] = self._client_factory(url)
+        return c
+
+    def _submit(self, url: str, raw: bytes) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        try:
+            sig = _signature(self.client(url).send_raw_transaction(raw))
+        except Exception as e:
+            return {"ok": False, "endpoint": url, "error": str(e)}
+        if not sig:
+            return {"ok": False, "endpoint": url, "error": "no_signature"}
+        ms = (time.perf_counter() - t0) * 1000.0
+        return {"ok": True, "signature": sig, "endpoint": url, "latency_ms": ms}
+
+    def _submit_all(self, raw: bytes) -> Dict[str, Any]:
+        """Submit to every endpoint; the first acceptance is returned."""
+        pending = {self._pool.submit(self._submit, url, raw) for url in self.endpoints}
+        deadline = time.monotonic() + self.timeout_sec
+        errors: List[str] = []
+        while pending:
+            done, pending = wait(
+                pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for f in done:
+                res = f.result()
+                if res["ok"]:
+                    return res
+                errors.append(f"{res['endpoint']}: {res['error']}")
+        if pending:
+            errors.append(f"{len(pending)} endpoint(s) timed out")
+        return {"ok": False, "error": "send_failed: " + "; ".join(errors)}
+
+    def _poll(self, url: str, signature: str) -> Optional[Dict[str, Any]]:
+        arg = Signature.from_string(signature) if HAVE_SOLDERS_TX else signature
+        try:
+            st = _status(self.client(url).get_signature_statuses([arg]))
+        except Exception as e:
+            logger.debug(f"[sender] status poll on {url} failed: {e}")
+            return None
+        if st is None:
+            return None
+        if st["err"] is not None or _reached(st["confirmation_status"], self.commitment):
+            return {**st, "endpoint": url}
+        return None
+
+    def confirm(self, signature: str) -> Optional[Dict[str, Any]]:
+        """Poll every endpoint until one reports ``signature`` at the commitment.
+
+        Returns that endpoint's status (``err`` set if the transaction
+        failed on chain), or None on timeout.
+        """
+        deadline = time.monotonic() + self.confirm_timeout_sec
+        while True:
+            pending = {self._pool.submit(self._poll, url, signature) for url in self.endpoints}
+            while pending:
+                done, pending = wait(
+                    pending,
+                    timeout=max(0.0, deadline - time.monotonic()),
+                    return_when=FIRST_COMPLETED,
+                )
+                if not done:
+                    return None
+                for f in done:
+                    st = f.result()
+                    if st is not None:
+                        return st
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return None
+            time.sleep(min(self.poll_sec, left))
+
+    def send_raw(self, raw: bytes) -> Dict[str, Any]:
+        """Submit already-signed bytes everywhere; first confirmation wins."""
+        if not self.endpoints:
+            return {"ok": False, "error": "no_rpc_endpoints"}
+        t0 = time.perf_counter()
+        res = self._submit_all(raw)
+        if not res["ok"]:
+            return res
+        res["submitted"] = True
+        if self.confirm_timeout_sec <= 0:
+            return {**res, "confirmed": False}
+        st = self.confirm(res["signature"])
+        if st is None:
+            return {**res, "ok": False, "confirmed": False, "error": "not_confirmed"}
+        out = {
+            **res,
+            "confirmed": st["err"] is None,
+            "confirmation_status": st["confirmation_status"],
+            "confirmed_by": st["endpoint"],
+            "slot": st["slot"],
+            "confirm_ms": (time.perf_counter() - t0) * 1000.0,
+        }
+        if st["err"] is not None:
+            return {**out, "ok": False, "error": f"tx_failed: {st['err']}"}
+        return out
+
+    def send(self, tx_b64: str) -> Dict[str, Any]:
+        """Sign a base64 swap transaction and submit it."""
+        return self.send_raw(sign_tx(base64.b64decode(tx_b64), self.keypair))
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False)
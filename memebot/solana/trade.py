@@ -1,8 +1,11 @@
 import json
-import base64
 import os
-import requests
+import threading
 from memebot.config import settings
+from memebot.solana import http_client
+from memebot.solana.sender import DEFAULT_RPC, TxSender
+from memebot.solana.fee_oracle import get_fee_oracle
+from memebot import metrics
 
 # Optional deps (used if present)
 try:
@@ -70,7 +73,9 @@ def _owner_for_request(owner: str | None) -> str:
     return owner_pk
 
 
-def request_swap_tx(quote: dict, owner: str | None = None) -> dict:
+def request_swap_tx(
+    quote: dict, owner: str | None = None, priority_fee_lamports: int = 0
+) -> dict:
     """Ask Jupiter for a swap transaction (serialized, base64)."""
     url = f"{settings.jupiter_base}/swap"
     owner_pk = _owner_for_request(owner)
@@ -81,9 +86,9 @@ def request_swap_tx(quote: dict, owner: str | None = None) -> dict:
         "userPublicKey": owner_pk,
         "wrapAndUnwrapSol": True,
         "dynamicComputeUnitLimit": True,
-        "prioritizationFeeLamports": 0,
+        "prioritizationFeeLamports": int(priority_fee_lamports),
     }
-    r = requests.post(url, json=payload, timeout=15)
+    r = http_client.post(url, json=payload, timeout=15)
     if r.status_code != 200:
         return {"ok": False, "error": f"HTTP {r.status_code} {r.text}"}
     data = r.json()
@@ -92,37 +97,70 @@ def request_swap_tx(quote: dict, owner: str | None = None) -> dict:
     return {"ok": True, "tx_b64": data["swapTransaction"]}
 
 
+_sender: TxSender | None = None
+_sender_lock = threading.Lock()
+
+
+def get_sender() -> TxSender | None:
+    """Process-wide sender; the keypair is loaded on first use only.
+
+    Returns None (and caches nothing) while no usable key is configured.
+    """
+    global _sender
+    with _sender_lock:
+        if _sender is None:
+            kp, secret_txt, derived_owner = _load_private_from_env_or_file()
+            if kp is None and secret_txt is None:
+                return None
+            _sender = TxSender.from_env(
+                kp,
+                lambda url: Client(url),
+                default_rpc=settings.solana_http or DEFAULT_RPC,
+                owner=derived_owner,
+            )
+        return _sender
+
+
+def reset_sender() -> None:
+    """Drop the cached sender so the next trade reloads keys and endpoints."""
+    global _sender
+    with _sender_lock:
+        if _sender is not None:
+            _sender.close()
+        _sender = None
+
+
 def sign_and_send(tx_b64: str) -> dict:
     if not HAVE_SOLANA:
         return {"ok": False, "error": "solana libs not installed"}
-    kp, secret_txt, derived_owner = _load_private_from_env_or_file()
-    if kp is None and secret_txt is None:
+    sender = get_sender()
+    if sender is None:
         return {"ok": False, "error": "missing_keys"}
-    client = Client(settings.solana_http)
-    raw = base64.b64decode(tx_b64)
-    resp = client.send_raw_transaction(raw)
-    sig = None
-    if isinstance(resp, dict):
-        sig = resp.get("result") or resp.get("signature") or resp.get("value")
-    else:
-        sig = resp
-    return {"ok": True, "signature": sig}
+    return sender.send(tx_b64)
+
 
+def trade_live(quote: dict, confidence: float | None = None, urgency: str = "entry") -> dict:
+    """Build, sign and submit a swap for ``quote``.
 
-def trade_live(quote: dict) -> dict:
+    The priority fee comes from the fee oracle for ``urgency`` (see
+    ``fee_oracle.URGENCY_TIERS``); entries scale it with ``confidence``.
+    """
     # Gate live immediately so tests expecting 'live_disabled' pass deterministically
     if not _allow_live_env():
         return {"ok": False, "error": "live_disabled"}
     if settings.solana_cluster != "devnet" and not settings.force_mainnet_live:
         return {"ok": False, "error": "live_mainnet_blocked"}
 
-    kp, _, derived_owner = _load_private_from_env_or_file()
-    owner_pk = settings.solana_owner or derived_owner or ""
+    sender = get_sender()
+    owner_pk = settings.solana_owner or (sender.owner if sender else None) or ""
     if not owner_pk:
         return {"ok": False, "error": "missing_owner"}
 
-    swap = request_swap_tx(quote, owner=owner_pk)
+    with metrics.span("swap_request"):
+        fee = get_fee_oracle().fee_lamports(urgency, confidence)
+        swap = request_swap_tx(quote, owner=owner_pk, priority_fee_lamports=fee)
     if not swap.get("ok"):
         return swap
-    send = sign_and_send(swap["tx_b64"])
+    with metrics.span("sign_send"):
+        send = sign_and_send(swap["tx_b64"])
     return send
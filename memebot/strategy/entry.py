@@ -1,68 +1,70 @@
 import os
-from memebot.config import settings
+import logging
+from memebot.strategy.sizing import (
+    get_caller_sizer,
+    get_policy,
+    parse_caller_table,
+    parse_conf_table,
+)
 from memebot.strategy.risk import can_enter_solana
 from memebot.strategy.fusion import Signal as SocialSignal
-import memebot.tools.pnl as pnl
+from memebot.exec.loss_ledger import get_loss_ledger
+
+logger = logging.getLogger("memebot.entry")
 
 
 def _load_size_conf_table():
-    raw = os.getenv("SIZE_BY_CONF", "")
-    tbl = {}
-    for part in raw.split(","):
-        if not part.strip():
-            continue
-        k, v = part.split(":")
-        tbl[float(k)] = float(v)
-    return tbl
+    return parse_conf_table(os.getenv("SIZE_BY_CONF", ""))
 
 
 def _load_caller_allowlist():
-    raw = os.getenv("CALLER_ALLOWLIST", "")
-    tbl = {}
-    for part in raw.split(","):
-        if not part.strip():
-            continue
-        k, v = part.split(":")
-        tbl[k.lower()] = float(v)
-    return tbl
-
+    return parse_caller_table(os.getenv("CALLER_ALLOWLIST", ""))
 
-def _conf_multiplier(conf: float, table: dict[float, float]) -> float:
-    best = 1.0
-    for threshold, mult in sorted(table.items()):
-        if conf >= threshold:
-            best = mult
-    return best
 
+def plan_entry(signal: SocialSignal, can_enter=None, loss_exceeded=None, caller_mult=None):
+    """Size an entry and check it against the daily cap and liquidity.
 
-def plan_entry(signal: SocialSignal):
-    base_size = float(os.getenv("BASE_SIZE_SOL", str(settings.base_size_sol)))
+    ``can_enter(mint, size)`` and ``loss_exceeded(cap)`` default to the live
+    Jupiter check and the in-memory daily loss ledger; backtests pass offline
+    versions. Sizing comes from the cached ``sizing.get_policy()``. Callers
+    without a static allowlist entry (unless the policy is allowlist-only)
+    are sized by ``caller_mult(caller)``, which defaults to
+    ``sizing.get_caller_sizer()`` over the live attribution store.
+    """
+    policy = get_policy()
+    base_size = policy.base_size
 
     # 1. Daily loss cap check
-    cap = float(os.getenv("DAILY_LOSS_CAP_SOL", "0"))
-    if cap > 0 and pnl.daily_loss_exceeded(cap):
+    cap = policy.daily_loss_cap
+    if cap > 0 and (loss_exceeded or get_loss_ledger().exceeded)(cap):
         return False, "daily_cap_reached", 0.0, 0, 0
 
-    # 2. Caller allowlist
-    allow = _load_caller_allowlist()
+    # 2. Static caller multiplier, else adaptive sizing (or reject if allowlist-only)
     caller = (getattr(signal, "caller", "") or "").lower()
-    caller_mult = 1.0
-    if allow:
-        if caller not in allow:
-            return False, "caller_not_allowed", 0.0, 0, 0
-        caller_mult = allow[caller]
+    caller_mult_fn, caller_mult = caller_mult, 1.0
+    if caller in policy.callers:
+        caller_mult = policy.callers[caller]
+    elif policy.callers and policy.allowlist_only:
+        return False, "caller_not_allowed", 0.0, 0, 0
+    elif caller_mult_fn is not None:
+        caller_mult = caller_mult_fn(caller)
+    else:
+        sizer = get_caller_sizer(policy)
+        if sizer is not None:
+            caller_mult = sizer.multiplier(caller)
 
     # 3. Confidence sizing
-    size_conf_tbl = _load_size_conf_table()
-    conf_mult = _conf_multiplier(signal.confidence, size_conf_tbl)
+    conf_mult = policy.conf_multiplier(signal.confidence)
 
-    print(
-        f"[DEBUG] conf={signal.confidence}, conf_mult={conf_mult}, caller_mult={caller_mult}, base={base_size}"
+    logger.debug(
+        f"conf={signal.confidence}, conf_mult={conf_mult}, caller_mult={caller_mult}, base={base_size}"
     )
 
     size_native = base_size * caller_mult * conf_mult
     if not signal.contract:
         return False, "no_contract", 0.0, 0, 0
-    ok, reason, out_amt, impact_bps = can_enter_solana(signal.contract, size_native)
+    ok, reason, out_amt, impact_bps = (can_enter or can_enter_solana)(
+        signal.contract, size_native
+    )
 
     return ok, reason, size_native, out_amt, impact_bps
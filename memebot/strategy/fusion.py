@@ -1,9 +1,10 @@
 # Updated fusion.py
 # memebot/strategy/fusion.py
 
+from collections import deque
 from dataclasses import dataclass, field
 import time
-from typing import Optional, List
+from typing import Callable, Deque, Dict, Optional, List
 
 
 @dataclass
@@ -28,14 +29,56 @@ SocialSignal = Signal
 
 
 class SignalMemory:
-    """Rolling memory of signals, with decay support."""
-
-    def __init__(self, decay_seconds: float = 3600):
+    """Rolling memory of signals, with decay support.
+
+    Signals are kept in a ts-ordered deque with per-contract counters, so
+    pruning and fusing cost amortized O(1) instead of a scan of every stored
+    signal. ``max_signals`` caps memory by evicting the oldest entries.
+    ``clock`` supplies "now" (backtests pass simulated time).
+    """
+
+    def __init__(
+        self,
+        decay_seconds: float = 3600,
+        max_signals: int = 100_000,
+        clock: Optional[Callable[[], float]] = None,
+    ):
         self.decay_seconds = decay_seconds
-        self._signals: List[Signal] = []
+        self.max_signals = max_signals
+        self.clock = clock
+        self._signals: Deque[Signal] = deque()
+        self._by_contract: Dict[str, int] = {}
+        self._by_obj: Dict[int, int] = {}
+
+    def _now(self) -> float:
+        return self.clock() if self.clock is not None else time.time()
+
+    def _count(self, sig: Signal, delta: int):
+        if sig.contract:
+            n = self._by_contract.get(sig.contract, 0) + delta
+            if n > 0:
+                self._by_contract[sig.contract] = n
+            else:
+                self._by_contract.pop(sig.contract, None)
+        n = self._by_obj.get(id(sig), 0) + delta
+        if n > 0:
+            self._by_obj[id(sig)] = n
+        else:
+            self._by_obj.pop(id(sig), None)
 
     def add(self, sig: Signal):
-        self._signals.append(sig)
+        sigs = self._signals
+        if not sigs or sig.ts >= sigs[-1].ts:
+            sigs.append(sig)
+        else:
+            # Late arrival: walk back from the newest end to keep ts order
+            i = len(sigs) - 1
+            while i > 0 and sigs[i - 1].ts > sig.ts:
+                i -= 1
+            sigs.insert(i, sig)
+        self._count(sig, 1)
+        while len(sigs) > self.max_signals:
+            self._count(sigs.popleft(), -1)
         self._prune()
 
     def recent(self) -> List[Signal]:
@@ -43,24 +86,31 @@ class SignalMemory:
         return list(self._signals)
 
     def _prune(self):
-        cutoff = time.time() - self.decay_seconds
-        self._signals = [s for s in self._signals if s.ts >= cutoff]
+        cutoff = self._now() - self.decay_seconds
+        sigs = self._signals
+        while sigs and sigs[0].ts < cutoff:
+            self._count(sigs.popleft(), -1)
 
     def fuse(self, sig: Signal) -> Signal:
         """Fuse a new signal into memory, return enriched signal with .score"""
         self.add(sig)
-        now = time.time()
+        now = self._now()
 
         # Start score with confidence, or a baseline if unset
         score = sig.confidence if sig.confidence and sig.confidence > 0 else 0.5
 
         # Boost if multiple recent signals mention same contract
-        for s in self._signals:
-            if s is sig:
-                continue
-            if s.contract and s.contract == sig.contract:
+        if sig.contract:
+            others = self._by_contract.get(sig.contract, 0)
+            others -= self._by_obj.get(id(sig), 0)
+            # Entries that survived pruning but have aged past the window by
+            # `now` don't count; they sit at the old end of the deque.
+            for s in self._signals:
                 if now - s.ts < self.decay_seconds:
-                    score += 0.5
+                    break
+                if s is not sig and s.contract == sig.contract:
+                    others -= 1
+            score += 0.5 * others
 
         # Apply decay
         age = now - sig.ts
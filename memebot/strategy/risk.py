@@ -1,5 +1,6 @@
 from memebot.config import settings
 from memebot.solana.jupiter import estimate_price_impact_solana
+from memebot import metrics
 
 
 def can_enter_solana(token_mint: str, size_base: float):
@@ -7,16 +8,18 @@ def can_enter_solana(token_mint: str, size_base: float):
         return False, "no_wsol_configured", 0, 0
 
     # Check buy (SOL -> token)
-    buy_q = estimate_price_impact_solana(
-        settings.wsol_mint, token_mint, int(size_base * 1e9)
-    )
+    with metrics.span("quote"):
+        buy_q = estimate_price_impact_solana(
+            settings.wsol_mint, token_mint, int(size_base * 1e9)
+        )
     if not buy_q.get("ok"):
         return False, "no_buy_route", 0, 0
 
     # Check sell (token -> SOL)
-    sell_q = estimate_price_impact_solana(
-        token_mint, settings.wsol_mint, int(size_base * 1e9)
-    )
+    with metrics.span("quote"):
+        sell_q = estimate_price_impact_solana(
+            token_mint, settings.wsol_mint, int(size_base * 1e9)
+        )
     if not sell_q.get("ok"):
         return (
             False,
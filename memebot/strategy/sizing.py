@@ -0,0 +1,410 @@
+"""Compiled entry-sizing policy.
+
+``plan_entry`` used to re-read and re-parse ``SIZE_BY_CONF`` and
+``CALLER_ALLOWLIST`` on every signal. ``SizingPolicy`` parses them once:
+confidence thresholds become a sorted tuple searched with ``bisect`` and
+the allowlist a read-only dict. The process-wide policy is rebuilt only on
+``reload_policy()``, SIGHUP, or when ``SIZING_POLICY_FILE`` changes.
+
+``SIZING_POLICY_FILE`` is a dotenv-style file using the same keys as the
+environment (``POLICY_KEYS``); values there override the environment. A
+bad value raises ``ValueError`` from ``reload_policy()``. Reloads started
+by SIGHUP or a file change log the error and keep the previous policy.
+
+``ADAPTIVE_SIZING`` (``kelly`` | ``shrink``; default ``off``) sizes callers
+from their realized results in the attribution store instead. A
+``CallerSizer`` recomputes a caller -> multiplier table every
+``ADAPTIVE_SIZING_REFRESH_SEC`` on a background thread, so the signal path
+only does a dict lookup. Each caller's decayed hit rate and mean return
+are shrunk toward the all-caller average with ``ADAPTIVE_PRIOR_N``
+pseudo-trades. ``kelly`` then uses the Kelly fraction
+``p - (1 - p) / b`` as the edge, with ``b = TP_PCT / |SL_PCT|``.
+``shrink`` uses the shrunk mean return as the edge. The multiplier is
+``1 + ADAPTIVE_GAIN * edge``, clamped to
+``[ADAPTIVE_MIN_MULT, ADAPTIVE_MAX_MULT]``. Callers with fewer than
+``ADAPTIVE_MIN_N`` closes stay at 1.0. These settings are part of the
+policy (``AdaptiveConfig``), so they are validated when it loads.
+
+A caller with a ``CALLER_ALLOWLIST`` entry always gets its static
+multiplier. With ``CALLER_ALLOWLIST_ONLY`` on, callers without an entry
+are rejected. With it off, they are sized adaptively, or at 1.0 when
+adaptive sizing is off. The switch defaults to on when ``ADAPTIVE_SIZING``
+is off and off otherwise. That keeps the old meaning of a non-empty
+allowlist without shutting adaptive sizing off.
+"""
+
+import os
+import signal
+import logging
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from dotenv import dotenv_values
+
+from memebot.config import settings
+
+logger = logging.getLogger("memebot.sizing")
+
+ADAPTIVE_KEYS = (
+    "ADAPTIVE_SIZING",
+    "ADAPTIVE_SIZING_REFRESH_SEC",
+    "ADAPTIVE_PRIOR_N",
+    "ADAPTIVE_MIN_N",
+    "ADAPTIVE_GAIN",
+    "ADAPTIVE_MIN_MULT",
+    "ADAPTIVE_MAX_MULT",
+    "TP_PCT",
+    "SL_PCT",
+)
+
+POLICY_KEYS = (
+    "BASE_SIZE_SOL",
+    "DAILY_LOSS_CAP_SOL",
+    "SIZE_BY_CONF",
+    "CALLER_ALLOWLIST",
+    "CALLER_ALLOWLIST_ONLY",
+) + ADAPTIVE_KEYS
+
+ADAPTIVE_METHODS = ("off", "kelly", "shrink")
+
+
+def parse_conf_table(raw: str) -> Dict[float, float]:
+    """``"0.8:1.5,0.9:2"`` -> ``{0.8: 1.5, 0.9: 2.0}``."""
+    tbl = {}
+    for part in (raw or "").split(","):
+        if not part.strip():
+            continue
+        k, v = part.split(":")
+        tbl[float(k)] = float(v)
+    return tbl
+
+
+def parse_caller_table(raw: str) -> Dict[str, float]:
+    """``"Alpha:2,beta:1"`` -> ``{"alpha": 2.0, "beta": 1.0}``."""
+    tbl = {}
+    for part in (raw or "").split(","):
+        if not part.strip():
+            continue
+        k, v = part.split(":")
+        tbl[k.lower()] = float(v)
+    return tbl
+
+
+def _flag(raw: Optional[str], default: bool) -> bool:
+    if raw is None or not raw.strip():
+        return default
+    return raw.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class AdaptiveConfig:
+    """Validated ``ADAPTIVE_*`` settings for a ``CallerSizer``."""
+
+    method: str = "kelly"
+    refresh_sec: float = 60.0
+    prior_n: float = 10.0
+    min_n: int = 3
+    payoff: float = 2.0 / 3.0
+    gain: float = 1.0
+    min_mult: float = 0.25
+    max_mult: float = 2.0
+
+    @classmethod
+    def from_values(cls, values: Mapping[str, Optional[str]]) -> Optional["AdaptiveConfig"]:
+        """None when ``ADAPTIVE_SIZING`` is off; ValueError on bad settings."""
+        method = (values.get("ADAPTIVE_SIZING") or "off").strip().lower()
+        if method not in ADAPTIVE_METHODS:
+            raise ValueError(f"ADAPTIVE_SIZING must be one of {ADAPTIVE_METHODS}, got {method!r}")
+        if method == "off":
+            return None
+        tp = float(values.get("TP_PCT") or 20)
+        sl = abs(float(values.get("SL_PCT") or -30)) or 1.0
+        cfg = cls(
+            method=method,
+            refresh_sec=float(values.get("ADAPTIVE_SIZING_REFRESH_SEC") or 60),
+            prior_n=float(values.get("ADAPTIVE_PRIOR_N") or 10),
+            min_n=int(values.get("ADAPTIVE_MIN_N") or 3),
+            payoff=tp / sl,
+            gain=float(values.get("ADAPTIVE_GAIN") or 1),
+            min_mult=float(values.get("ADAPTIVE_MIN_MULT") or 0.25),
+            max_mult=float(values.get("ADAPTIVE_MAX_MULT") or 2),
+        )
+        if not 0 < cfg.min_mult <= cfg.max_mult:
+            raise ValueError(
+                f"need 0 < ADAPTIVE_MIN_MULT <= ADAPTIVE_MAX_MULT, got {cfg.min_mult}, {cfg.max_mult}"
+            )
+        if cfg.payoff <= 0:
+            raise ValueError(f"TP_PCT must be positive for kelly sizing, got {tp}")
+        return cfg
+
+    def params(self) -> Dict[str, Any]:
+        """Keyword arguments for ``caller_multipliers``."""
+        return {
+            "method": self.method,
+            "prior_n": self.prior_n,
+            "min_n": self.min_n,
+            "payoff": self.payoff,
+            "gain": self.gain,
+            "min_mult": self.min_mult,
+            "max_mult": self.max_mult,
+        }
+
+
+@dataclass(frozen=True)
+class SizingPolicy:
+    base_size: float = 0.05
+    daily_loss_cap: float = 0.0
+    conf_thresholds: Tuple[float, ...] = ()
+    conf_mults: Tuple[float, ...] = ()
+    callers: Mapping[str, float] = field(default_factory=lambda: MappingProxyType({}))
+    allowlist_only: bool = True
+    adaptive: Optional[AdaptiveConfig] = None
+
+    @classmethod
+    def from_values(cls, values: Mapping[str, Optional[str]]) -> "SizingPolicy":
+        conf = sorted(parse_conf_table(values.get("SIZE_BY_CONF") or "").items())
+        adaptive = AdaptiveConfig.from_values(values)
+        return cls(
+            base_size=float(values.get("BASE_SIZE_SOL") or settings.base_size_sol),
+            daily_loss_cap=float(values.get("DAILY_LOSS_CAP_SOL") or 0),
+            conf_thresholds=tuple(k for k, _ in conf),
+            conf_mults=tuple(v for _, v in conf),
+            callers=MappingProxyType(parse_caller_table(values.get("CALLER_ALLOWLIST") or "")),
+            allowlist_only=_flag(values.get("CALLER_ALLOWLIST_ONLY"), default=adaptive is None),
+            adaptive=adaptive,
+        )
+
+    @classmethod
+    def from_env(cls, path: Optional[str] = None) -> "SizingPolicy":
+        values: Dict[str, Optional[str]] = {k: os.getenv(k) for k in POLICY_KEYS}
+        if path and os.path.exists(path):
+            values.update({k: v for k, v in dotenv_values(path).items() if k in POLICY_KEYS})
+        return cls.from_values(values)
+
+    def conf_multiplier(self, conf: float) -> float:
+        """Multiplier of the highest threshold ``<= conf`` (1.0 below all)."""
+        i = bisect_right(self.conf_thresholds, conf)
+        return self.conf_mults[i - 1] if i else 1.0
+
+
+_policy: Optional[SizingPolicy] = None
+_policy_lock = threading.Lock()
+_file_mtime: Optional[float] = None
+_next_check = 0.0
+
+
+def _policy_file() -> str:
+    return os.getenv("SIZING_POLICY_FILE", "")
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def reload_policy() -> SizingPolicy:
+    """Re-read the environment and policy file and swap in a new policy."""
+    global _policy, _file_mtime
+    path = _policy_file()
+    policy = SizingPolicy.from_env(path)
+    with _policy_lock:
+        _policy, _file_mtime = policy, (_mtime(path) if path else None)
+    return policy
+
+
+def reset_policy() -> None:
+    """Drop the cached policy; the next ``get_policy()`` re-reads config."""
+    global _policy, _file_mtime
+    with _policy_lock:
+        _policy, _file_mtime = None, None
+
+
+def get_policy() -> SizingPolicy:
+    """Current policy; polls ``SIZING_POLICY_FILE`` at most every few seconds."""
+    global _next_check
+    policy = _policy
+    if policy is None:
+        return reload_policy()
+    path = _policy_file()
+    if path:
+        now = time.monotonic()
+        if now >= _next_check:
+            _next_check = now + float(os.getenv("SIZING_POLICY_CHECK_SEC", "2") or 2)
+            if _mtime(path) != _file_mtime:
+                logger.info(f"[sizing] {path} changed; reloading policy")
+                return _reload_or_keep(policy)
+    return policy
+
+
+def _reload_or_keep(policy: SizingPolicy) -> SizingPolicy:
+    """Reload, or keep ``policy`` (and stop retrying this file) if it is invalid."""
+    global _file_mtime
+    try:
+        return reload_policy()
+    except ValueError as e:
+        logger.error(f"[sizing] bad policy, keeping the previous one: {e}")
+        with _policy_lock:
+            _file_mtime = _mtime(_policy_file())
+        return policy
+
+
+def install_sighup_reload() -> bool:
+    """Reload the policy on SIGHUP. Returns False where unsupported."""
+    if not hasattr(signal, "SIGHUP") or threading.current_thread() is not threading.main_thread():
+        return False
+
+    def _on_hup(signum, frame):
+        logger.info("[sizing] SIGHUP; reloading policy")
+        if _policy is None:
+            reload_policy()
+        else:
+            _reload_or_keep(_policy)
+
+    signal.signal(signal.SIGHUP, _on_hup)
+    return True
+
+
+def caller_multipliers(
+    table: Mapping[str, Any],
+    now: float,
+    half_life_sec: float,
+    method: str = "kelly",
+    prior_n: float = 10.0,
+    min_n: int = 3,
+    payoff: float = 2.0 / 3.0,
+    gain: float = 1.0,
+    min_mult: float = 0.25,
+    max_mult: float = 2.0,
+) -> Dict[str, float]:
+    """Per-caller size multipliers from attribution ``PerfStats``.
+
+    Decay is applied up to ``now`` first, so a caller who has gone quiet
+    drifts back toward the all-caller prior.
+    """
+    decayed = {}
+    for caller, st in table.items():
+        if not st.weight:
+            continue
+        f = st.effective_n(now, half_life_sec) / st.weight
+        decayed[caller] = (st.n, st.weight * f, st.wins * f, st.ret_sum * f)
+    w_all = sum(d[1] for d in decayed.values())
+    if not w_all:
+        return {}
+    p0 = sum(d[2] for d in decayed.values()) / w_all
+    mu0 = sum(d[3] for d in decayed.values()) / w_all
+
+    out = {}
+    for caller, (n, w, wins, ret_sum) in decayed.items():
+        if n < min_n:
+            continue
+        if method == "shrink":
+            edge = (ret_sum + prior_n * mu0) / (w + prior_n)
+        else:
+            p = (wins + prior_n * p0) / (w + prior_n)
+            edge = p - (1.0 - p) / payoff
+        out[caller] = max(min_mult, min(max_mult, 1.0 + gain * edge))
+    return out
+
+
+class CallerSizer:
+    """Cached adaptive caller multipliers, rebuilt off the signal path."""
+
+    def __init__(
+        self,
+        table: Callable[[], Mapping[str, Any]],
+        half_life_sec: float,
+        refresh_sec: float = 60.0,
+        **params: Any,
+    ):
+        self._table = table
+        self.half_life_sec = float(half_life_sec)
+        self.refresh_sec = float(refresh_sec)
+        self.params = params
+        self._mults: Mapping[str, float] = MappingProxyType({})
+        self._built_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    @classmethod
+    def from_config(cls, cfg: AdaptiveConfig) -> "CallerSizer":
+        """Sizer over the process-wide attribution store's caller table."""
+        from memebot.exec.attribution import get_attribution
+
+        store = get_attribution()
+        return cls(
+            lambda: store.table("caller"),
+            store.half_life_sec,
+            refresh_sec=cfg.refresh_sec,
+            **cfg.params(),
+        )
+
+    def refresh(self) -> Mapping[str, float]:
+        """Recompute the multiplier table from the current stats."""
+        try:
+            mults = caller_multipliers(
+                self._table(), time.time(), self.half_life_sec, **self.params
+            )
+        except Exception as e:
+            logger.warning(f"[sizing] adaptive refresh failed: {e}")
+            mults = dict(self._mults)
+        with self._lock:
+            self._mults = MappingProxyType(mults)
+            self._built_at = time.monotonic()
+            self._refreshing = False
+        return self._mults
+
+    def multiplier(self, caller: str) -> float:
+        """O(1) lookup; a stale table is served while a rebuild runs."""
+        built = self._built_at
+        if built is None:
+            with self._lock:
+                first = self._built_at is None and not self._refreshing
+                self._refreshing = self._refreshing or first
+            if first:
+                self.refresh()
+        elif time.monotonic() - built >= self.refresh_sec and not self._refreshing:
+            with self._lock:
+                start = not self._refreshing
+                self._refreshing = True
+            if start:
+                threading.Thread(target=self.refresh, name="caller-sizer", daemon=True).start()
+        return self._mults.get(caller, 1.0)
+
+    def snapshot(self) -> Dict[str, float]:
+        return dict(self._mults)
+
+
+_sizer: Optional[CallerSizer] = None
+_sizer_cfg: Optional[AdaptiveConfig] = None
+_sizer_lock = threading.Lock()
+
+
+def get_caller_sizer(policy: Optional[SizingPolicy] = None) -> Optional[CallerSizer]:
+    """Adaptive sizer for ``policy`` (default: the current one), or None if off.
+
+    The sizer is rebuilt only when the policy's ``AdaptiveConfig`` changes,
+    so a signal pays for an equality check, not a config parse.
+    """
+    global _sizer, _sizer_cfg
+    cfg = (policy or get_policy()).adaptive
+    if cfg is None:
+        return None
+    sizer = _sizer
+    if sizer is not None and _sizer_cfg == cfg:
+        return sizer
+    with _sizer_lock:
+        if _sizer is None or _sizer_cfg != cfg:
+            _sizer, _sizer_cfg = CallerSizer.from_config(cfg), cfg
+        return _sizer
+
+
+def reset_caller_sizer() -> None:
+    global _sizer, _sizer_cfg
+    with _sizer_lock:
+        _sizer, _sizer_cfg = None, None
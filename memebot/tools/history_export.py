@@ -0,0 +1,27 @@
+import typer
+
+from memebot.exec import history
+from memebot.exec.paper import _trades_csv
+from memebot.exec.pnl import _closed_csv
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def main():
+    """
+    Bring the columnar history up to date with the CSV journals.
+
+    Only rows appended since the last export are written. Trades come from
+    the paper journal (``MEMEBOT_DATA_DIR`` or ``.``) and closed positions
+    from the position store's data dir.
+    """
+    closed_csv, trades_csv = _closed_csv(), _trades_csv()
+    hist = history.history_for(closed_csv)
+    closed = hist.sync_csv("closed", closed_csv)
+    trades = hist.sync_csv("trades", trades_csv)
+    typer.echo(f"exported closed={closed} trades={trades} to {hist.root}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    app()
@@ -1,10 +1,12 @@
 import csv
 import os
-import time
 from pathlib import Path
 from typing import Dict, Any
 import typer
 
+from memebot.exec.loss_ledger import get_loss_ledger
+from memebot.exec.pnl import parse_since, pnl_summary
+
 DATA_DIR = Path(os.getenv("MEMEBOT_DATA_DIR", "./data"))
 TRADES_FILE = DATA_DIR / "trades.csv"
 CLOSED_FILE = DATA_DIR / "positions_closed.csv"
@@ -45,35 +47,28 @@ def summarize_pnl_by_token(trades: list[Dict[str, Any]]) -> Dict[str, Any]:
 
 def daily_loss_exceeded(limit: float) -> bool:
     """Check if today's cumulative losses exceed the given cap (in base units)."""
-    positions = load_closed_positions()
-    today = time.strftime("%Y-%m-%d", time.gmtime())
-    losses = 0.0
-    for pos in positions:
-        ts = float(pos.get("ts_close", 0) or 0)
-        if ts == 0:
-            continue
-        day = time.strftime("%Y-%m-%d", time.gmtime(ts))
-        if day == today:
-            pnl = float(pos.get("pnl_base", 0.0))
-            if pnl < 0:
-                losses += abs(pnl)
-    return losses >= limit
-
-
-def main(since: str = typer.Option("today", help="Time filter: today|all")):
-    trades = load_closed_positions()
-    summary = summarize_pnl(trades)
+    return get_loss_ledger().exceeded(limit)
+
+
+def main(
+    since: str = typer.Option("all", help="Time filter: all|today|<N>d|YYYY-MM-DD|epoch"),
+):
+    try:
+        # Called inline (not via typer) the default is an OptionInfo
+        since_ts = parse_since(since if isinstance(since, str) else "all")
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--since")
+    summary = pnl_summary(since_ts, CLOSED_FILE)
     typer.echo(
         f"trades={summary['trades']} gross={summary['gross']:.4f} "
         f"winners={summary['winners']} losers={summary['losers']}"
     )
 
-    per_token = summarize_pnl_by_token(trades)
+    per_token = summary["tokens"]
     if per_token:
         typer.echo("Per-token summary:")
         for sym, stats in per_token.items():
             typer.echo(f" {sym}: {stats['trades']} trades gross={stats['gross']:.4f}")
 
-
 if __name__ == "__main__":
     typer.run(main)
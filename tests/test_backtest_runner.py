@@ -1,3 +1,4 @@
+import os
 import subprocess
 import sys
 import json
@@ -8,10 +9,17 @@ import typer
 from typer.testing import CliRunner
 
 import memebot.backtest.runner as runner
+from memebot.backtest.quotes import RecordedQuotes, SyntheticQuotes
 
 runner_runner = CliRunner()
 
 
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path / "data"))
+    return tmp_path / "data"
+
+
 def make_signal_file(tmp_path: Path, signals: list[dict]) -> Path:
     """Helper to create a JSONL file with signals."""
     f = tmp_path / "signals.jsonl"
@@ -86,7 +94,7 @@ def test_run_with_trade_and_exits(tmp_path, monkeypatch):
             self.__dict__.update(vars(self))
 
     monkeypatch.setattr(runner.SignalMemory, "fuse", lambda self, sig: FakeSig())
-    monkeypatch.setattr(runner, "plan_entry", lambda sig: (True, "ok", None, 100, 5))
+    monkeypatch.setattr(runner, "plan_entry", lambda sig, **kw: (True, "ok", None, 100, 5))
 
     class FakeDecision:
         action = "buy"
@@ -94,7 +102,6 @@ def test_run_with_trade_and_exits(tmp_path, monkeypatch):
         reason = "test"
 
     monkeypatch.setattr(runner, "decide", lambda sig, liq_ok, est_price_impact_bps: FakeDecision())
-    monkeypatch.setattr(runner.ExitManager, "tick_exits", lambda self, mode, debug=False: [])
 
     f = make_signal_file(tmp_path, [{"platform": "mock", "source": "tester"}])
     result = runner_runner.invoke(
@@ -109,7 +116,7 @@ def test_run_with_trade_and_exits(tmp_path, monkeypatch):
 def test_run_disable_exits(tmp_path, monkeypatch):
     """Ensure exits can be disabled."""
     monkeypatch.setattr(runner.SignalMemory, "fuse", lambda self, s: s)
-    monkeypatch.setattr(runner, "plan_entry", lambda sig: (True, "ok", None, 100, 5))
+    monkeypatch.setattr(runner, "plan_entry", lambda sig, **kw: (True, "ok", None, 100, 5))
 
     class NoDecision:
         action = "hold"
@@ -201,7 +208,7 @@ def test_run_skips_allowlist(tmp_path, monkeypatch):
         __dict__ = {}
 
     monkeypatch.setattr(runner.SignalMemory, "fuse", lambda self, sig: FakeSig)
-    monkeypatch.setattr(runner, "plan_entry", lambda sig: (False, "reject", None, 0, 0))
+    monkeypatch.setattr(runner, "plan_entry", lambda sig, **kw: (False, "reject", None, 0, 0))
 
     result = runner_runner.invoke(
         runner.app,
@@ -224,7 +231,7 @@ def test_run_triggers_exits(tmp_path, monkeypatch):
         __dict__ = {}
 
     monkeypatch.setattr(runner.SignalMemory, "fuse", lambda self, sig: FakeSig)
-    monkeypatch.setattr(runner, "plan_entry", lambda sig: (True, "ok", None, 1, 1))
+    monkeypatch.setattr(runner, "plan_entry", lambda sig, **kw: (True, "ok", None, 1, 1))
     monkeypatch.setattr(
         runner,
         "decide",
@@ -232,11 +239,10 @@ def test_run_triggers_exits(tmp_path, monkeypatch):
             "D", (), {"action": "buy", "max_slippage_bps": 1, "reason": "r"}
         )(),
     )
-    monkeypatch.setattr(runner.ExitManager, "tick_exits", lambda self, mode, debug=False: ["exit"])
-
+    # Steep synthetic uptrend: take-profit fires once min hold has passed
     result = runner_runner.invoke(
         runner.app,
-        [str(f), "--debug"],
+        [str(f), "--debug", "--drift-pct", "10", "--vol-pct", "0"],
         standalone_mode=False,
     )
     assert "Triggered" in result.stdout
@@ -264,4 +270,137 @@ def test_module_entrypoint_executes(monkeypatch, tmp_path):
     result = runner_runner.invoke(runner.app, [str(dummy_file)], standalone_mode=False)
 
     assert result.exit_code == 0
-    assert "Loaded 0 signals" in result.stdout
\ No newline at end of file
+    assert "Loaded 0 signals" in result.stdout
+
+def test_recorded_quotes_lookup(tmp_path):
+    f = tmp_path / "quotes.jsonl"
+    f.write_text(
+        "\n".join(
+            json.dumps(r)
+            for r in [
+                {"ts": 20, "mint": "m", "out_per_sol": 900},
+                {"ts": 10, "mint": "m", "out_per_sol": 1000, "impact_bps": 50},
+                {"ts": 30, "mint": "m", "out_per_sol": 800},
+            ]
+        )
+    )
+    q = RecordedQuotes.load(f)
+    assert q.at("m", 5) is None
+    assert q.at("m", 10) == (1000.0, 50)
+    assert q.at("m", 25) == (900.0, 0)
+    assert q.times("m", 10, 30) == [20.0, 30.0]
+    assert q.at("other", 10) is None
+    assert q.can_enter("m", 1.0, 10) == (True, "ok", 995, 50)
+    assert q.can_enter("m", 1.0, 5)[:2] == (False, "no_buy_route")
+
+
+def test_synthetic_quotes_deterministic():
+    a = SyntheticQuotes(seed=1, step_sec=5)
+    b = SyntheticQuotes(seed=1, step_sec=5)
+    a.prime("m", 100.0)
+    b.prime("m", 100.0)
+    assert a.at("m", 100.0)[0] == 1_000_000.0
+    assert a.at("m", 200.0) == b.at("m", 200.0)
+    assert a.times("m", 100.0, 117.0) == [105.0, 110.0, 115.0]
+    # Querying out of order returns the same path
+    assert b.at("m", 150.0) == a.at("m", 150.0)
+
+
+def _sig(ts, contract="m", conf=0.9):
+    return runner.Signal(platform="t", source="s", contract=contract, confidence=conf, ts=ts)
+
+
+def _rules(tp=20.0, sl=-30.0, trail=10.0, hold=0.0):
+    r = runner.ExitRules()
+    r.tp_pct, r.sl_pct, r.trail_pct, r.min_hold_sec = tp, sl, trail, hold
+    return r
+
+
+def test_backtester_exits_on_recorded_quotes(monkeypatch):
+    monkeypatch.delenv("CALLER_ALLOWLIST", raising=False)
+    monkeypatch.delenv("DAILY_LOSS_CAP_SOL", raising=False)
+    quotes = RecordedQuotes.from_rows(
+        {
+            # +25% at t=20 -> take profit
+            "up": [(0, 1000.0, 0), (10, 950.0, 0), (20, 800.0, 0)],
+            # -40% at t=10 -> stop loss
+            "down": [(0, 1000.0, 0), (10, 1700.0, 0)],
+            # +8% then -5% -> trailing exit
+            "trail": [(0, 1000.0, 0), (10, 925.0, 0), (20, 1050.0, 0)],
+        }
+    )
+    bt = runner.Backtester(quotes, rules=_rules(), decay_seconds=0, min_score=0.5, horizon_sec=60)
+    res = bt.run([_sig(0, "up"), _sig(0, "down"), _sig(0, "trail")])
+
+    exits = {e["quote"]: e for e in res.events if e["event"] == "exit"}
+    assert exits["up"]["reason"] == "take_profit" and exits["up"]["ts"] == 20
+    assert exits["down"]["reason"] == "stop_loss" and exits["down"]["ts"] == 10
+    assert exits["trail"]["reason"] == "trailing_exit" and exits["trail"]["ts"] == 20
+    assert res.summary["buys"] == 3 and res.summary["closed"] == 3
+    assert res.summary["wins"] == 1
+
+
+def test_backtester_daily_loss_cap_and_end_of_data(monkeypatch):
+    monkeypatch.delenv("CALLER_ALLOWLIST", raising=False)
+    monkeypatch.setenv("DAILY_LOSS_CAP_SOL", "0.01")
+    quotes = RecordedQuotes.from_rows(
+        {"a": [(0, 1000.0, 0), (10, 2000.0, 0)], "b": [(0, 1000.0, 0)]}
+    )
+    bt = runner.Backtester(quotes, rules=_rules(), decay_seconds=0, min_score=0.5, horizon_sec=5)
+    res = bt.run([_sig(0, "a"), _sig(20, "b")])
+    buys = [e["quote"] for e in res.events if e["event"] == "buy"]
+    assert buys == ["a"]  # the stop loss on "a" hit the cap before "b"
+
+    monkeypatch.setenv("DAILY_LOSS_CAP_SOL", "0")
+    bt = runner.Backtester(quotes, rules=_rules(), decay_seconds=0, min_score=0.5, horizon_sec=5)
+    res = bt.run([_sig(20, "b")])
+    assert res.events[-1]["reason"] == "end_of_data"
+
+
+def test_run_writes_results_file(tmp_path, data_dir, monkeypatch):
+    monkeypatch.delenv("CALLER_ALLOWLIST", raising=False)
+    monkeypatch.delenv("DAILY_LOSS_CAP_SOL", raising=False)
+    sample = Path(runner.__file__).with_name("sample.jsonl")
+    result = runner_runner.invoke(runner.app, [str(sample)], standalone_mode=False)
+    assert result.exit_code == 0
+    files = list((data_dir / "backtest").glob("backtest_*.jsonl"))
+    assert len(files) == 1
+    lines = [json.loads(x) for x in files[0].read_text().splitlines()]
+    assert lines[-1]["event"] == "summary"
+    assert lines[-1]["signals"] == 40
+    assert lines[-1]["buys"] > 0
+
+
+def test_backtester_ignores_live_sizing_state(monkeypatch, tmp_path):
+    for k in ("CALLER_ALLOWLIST", "DAILY_LOSS_CAP_SOL", "SIZE_BY_CONF"):
+        monkeypatch.delenv(k, raising=False)
+    monkeypatch.setenv("BASE_SIZE_SOL", "0.1")
+    monkeypatch.setenv("ADAPTIVE_SIZING", "kelly")
+    policy = tmp_path / "sizing.env"
+    policy.write_text("BASE_SIZE_SOL=5\n")
+    monkeypatch.setenv("SIZING_POLICY_FILE", str(policy))
+
+    class LiveSizer:
+        def multiplier(self, caller):
+            raise AssertionError("backtest consulted the live attribution store")
+
+    import memebot.strategy.entry as entry
+
+    monkeypatch.setattr(entry, "get_caller_sizer", lambda policy=None: LiveSizer())
+
+    quotes = RecordedQuotes.from_rows({"m": [(0, 1000.0, 0)]})
+    sig = runner.Signal(platform="t", source="s", contract="m", confidence=0.9, ts=0, caller="alpha")
+    with pytest.warns(RuntimeWarning, match="SIZING_POLICY_FILE"):
+        res = runner.Backtester(quotes, rules=_rules(), decay_seconds=0, min_score=0.5).run([sig])
+    buy = next(e for e in res.events if e["event"] == "buy")
+    assert buy["size_base"] == pytest.approx(0.1)  # env size, neutral caller multiplier
+    assert os.environ["SIZING_POLICY_FILE"] == str(policy)
+
+    # An offline sizer can be injected
+    bt = runner.Backtester(
+        quotes, rules=_rules(), decay_seconds=0, min_score=0.5,
+        caller_mult=lambda caller: 2.0 if caller == "alpha" else 1.0,
+    )
+    with pytest.warns(RuntimeWarning):
+        res = bt.run([sig])
+    assert next(e for e in res.events if e["event"] == "buy")["size_base"] == pytest.approx(0.2)
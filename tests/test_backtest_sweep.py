@@ -0,0 +1,81 @@
+import csv
+import os
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+import memebot.strategy.simple as simple
+from memebot.backtest import sweep
+from memebot.backtest.quotes import RecordedQuotes, SyntheticQuotes
+from memebot.strategy.fusion import Signal
+
+SAMPLE = Path(sweep.__file__).with_name("sample.jsonl")
+
+
+@pytest.fixture(autouse=True)
+def env(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path / "data"))
+    for k in ("CALLER_ALLOWLIST", "SIZE_BY_CONF", "DAILY_LOSS_CAP_SOL"):
+        monkeypatch.delenv(k, raising=False)
+    return tmp_path / "data"
+
+
+def test_param_grid_skips_empty_lists():
+    grid = sweep.param_grid(min_confidence=[0.6, 0.8], tp_pct=[10, 20], sl_pct=[])
+    assert len(grid) == 4
+    assert grid[0] == {"min_confidence": 0.6, "tp_pct": 10}
+    assert sweep.param_grid() == [{}]
+
+
+def test_run_combo_restores_globals(monkeypatch):
+    monkeypatch.setattr(sweep, "_SIGNALS", [])
+    monkeypatch.setattr(sweep, "_QUOTES", SyntheticQuotes())
+    before = (simple.MIN_CONFIDENCE, simple.MAX_SLIPPAGE_BPS)
+    row = sweep.run_combo(
+        {"min_confidence": 0.1, "max_slippage_bps": 5, "caller_allowlist": "a:1"}
+    )
+    assert row["buys"] == 0 and row["min_confidence"] == 0.1
+    assert (simple.MIN_CONFIDENCE, simple.MAX_SLIPPAGE_BPS) == before
+    assert "CALLER_ALLOWLIST" not in os.environ
+
+
+def test_params_change_outcome():
+    quotes = RecordedQuotes.from_rows({"m": [(0, 1000.0, 0), (10, 700.0, 0)]})
+    signals = [Signal(platform="t", source="s", contract="m", confidence=0.75, ts=0.0)]
+    grid = sweep.param_grid(min_confidence=[0.7, 0.8], tp_pct=[20, 60])
+    rows = sweep.sweep(signals, quotes, grid, workers=1, min_score=0.5, decay_seconds=0)
+
+    assert [r["rank"] for r in rows] == [1, 2, 3, 4]
+    best = rows[0]
+    assert best["min_confidence"] == 0.7 and best["tp_pct"] == 20
+    assert best["buys"] == 1 and best["pnl_base"] > 0
+    skipped = [r for r in rows if r["min_confidence"] == 0.8]
+    assert all(r["buys"] == 0 for r in skipped)
+
+
+def test_parallel_matches_inline():
+    signals = sweep.load_signals(SAMPLE)
+    grid = sweep.param_grid(tp_pct=[10, 40], sl_pct=[-10, -40], trail_pct=[5, 20])
+    inline = sweep.sweep(signals, SyntheticQuotes(seed=3), grid, workers=1)
+    forked = sweep.sweep(signals, SyntheticQuotes(seed=3), grid, workers=2)
+    assert inline == forked
+
+
+def test_cli_writes_ranked_table(env):
+    result = CliRunner().invoke(
+        sweep.app,
+        [str(SAMPLE), "--tp-pct", "10", "--tp-pct", "30", "--workers", "1", "--rank-by", "win_rate"],
+        standalone_mode=False,
+    )
+    assert result.exit_code == 0, result.output
+    assert "sweeping 2 combinations" in result.stdout
+    files = list((env / "backtest").glob("sweep_*.csv"))
+    rows = list(csv.DictReader(files[0].open()))
+    assert [r["rank"] for r in rows] == ["1", "2"]
+    assert float(rows[0]["win_rate"]) >= float(rows[1]["win_rate"])
+
+
+def test_cli_rejects_bad_rank_key():
+    result = CliRunner().invoke(sweep.app, [str(SAMPLE), "--rank-by", "nope"], standalone_mode=False)
+    assert result.exit_code != 0
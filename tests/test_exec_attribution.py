@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import pytest
+
+from memebot.exec import attribution as attr
+
+DAY = 86_400.0
+
+
+def _sig(caller="Alpha", source="chat", platform="telegram"):
+    return SimpleNamespace(platform=platform, source=source, caller=caller, timestamp=0.0)
+
+
+def _close(store, pos_id, ts, entry, pnl, peak_ts=None):
+    return store.record_close(
+        pos_id, {"ts_close": ts, "entry_base": entry, "pnl_base": pnl}, peak_ts
+    )
+
+
+def test_link_and_close_updates_every_dimension(tmp_path):
+    s = attr.AttributionStore(tmp_path / "a.db")
+    s.link(1, _sig(), ts_open=100.0, quote="M1")
+    s.link(2, _sig(source="other"), ts_open=100.0, quote="M2")
+    assert _close(s, 1, 200.0, 1.0, 0.5, peak_ts=130.0)
+    assert _close(s, 2, 200.0, 2.0, -1.0)
+
+    alpha = s.stats("caller", "ALPHA")
+    assert alpha.n == 2 and alpha.hit_rate == 0.5
+    assert alpha.avg_return == pytest.approx(0.0)  # +50% and -50%
+    assert alpha.avg_time_to_peak_sec == pytest.approx(30.0)
+    assert s.stats("source", "chat").n == 1
+    assert s.stats("platform", "telegram").n == 2
+    assert set(s.table("source")) == {"chat", "other"}
+    assert s.table("caller", min_n=3) == {}
+
+
+def test_unlinked_or_repeated_close_is_ignored(tmp_path):
+    s = attr.AttributionStore(tmp_path / "a.db")
+    assert not _close(s, 9, 10.0, 1.0, 1.0)
+    s.link(1, _sig(), 0.0, "M")
+    assert _close(s, 1, 10.0, 1.0, 1.0)
+    assert not _close(s, 1, 11.0, 1.0, 1.0)
+    assert s.stats("caller", "alpha").n == 1
+
+
+def test_old_results_decay(tmp_path):
+    s = attr.AttributionStore(tmp_path / "a.db", half_life_sec=DAY)
+    s.link(1, _sig(), 0.0, "M")
+    s.link(2, _sig(), 0.0, "M")
+    _close(s, 1, 0.0, 1.0, -1.0)
+    _close(s, 2, 2 * DAY, 1.0, 1.0)
+    st = s.stats("caller", "alpha")
+    assert st.weight == pytest.approx(1.25)
+    assert st.hit_rate == pytest.approx(0.8)
+    assert st.effective_n(3 * DAY, DAY) == pytest.approx(0.625)
+
+
+def test_stats_survive_reopen(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    attr.reset_attribution()
+    s = attr.get_attribution()
+    s.link(1, _sig(), 0.0, "M")
+    _close(s, 1, 5.0, 1.0, 0.2)
+    attr.reset_attribution()
+
+    again = attr.get_attribution()
+    assert again is not s
+    assert (tmp_path / "attribution.db").exists()
+    assert again.stats("caller", "alpha").avg_return == pytest.approx(0.2)
+    attr.reset_attribution()
@@ -0,0 +1,93 @@
+import random
+import numpy as np
+from memebot.exec.exit_engine import (
+    NO_EXIT,
+    REASONS,
+    STOP_LOSS,
+    TAKE_PROFIT,
+    TRAILING_EXIT,
+    ExitBook,
+    scan_exits,
+)
+from memebot.exec.positions import ExitRules
+
+
+def exit_decision(pnl_pct, peak_pnl_pct, rules):
+    """Reference per-position rule the vectorized scan must reproduce."""
+    if pnl_pct >= rules.tp_pct:
+        return "take_profit", pnl_pct
+    if pnl_pct <= rules.sl_pct:
+        return "stop_loss", pnl_pct
+    peak = pnl_pct if peak_pnl_pct is None else peak_pnl_pct
+    if peak - pnl_pct >= rules.trail_pct:
+        return "trailing_exit", peak
+    return "", max(peak, pnl_pct)
+
+
+def test_single_tick_matches_exit_decision():
+    rules = ExitRules()
+    rng = random.Random(7)
+    n = 500
+    entry = np.ones(n)
+    exit_base = np.array([rng.uniform(0.5, 1.5) for _ in range(n)])
+    peaks = np.array([rng.choice([np.nan, rng.uniform(-20, 40)]) for _ in range(n)])
+    res = scan_exits(entry, exit_base, 100.0, np.zeros(n), peaks, rules)
+    for i in range(n):
+        pnl = (exit_base[i] - 1.0) * 100.0
+        peak = None if np.isnan(peaks[i]) else peaks[i]
+        reason, new_peak = exit_decision(pnl, peak, rules)
+        assert REASONS[res.reason[i]] == reason
+        assert res.peak_pnl_pct[i] == new_peak
+
+
+def test_min_hold_and_missing_quotes_skip_evaluation():
+    rules = ExitRules()
+    res = scan_exits(
+        np.array([1.0, 1.0, 1.0]),
+        np.array([2.0, np.nan, 2.0]),
+        100.0,
+        np.array([95.0, 0.0, 0.0]),
+        np.full(3, np.nan),
+        rules,
+    )
+    assert list(res.reason) == [NO_EXIT, NO_EXIT, TAKE_PROFIT]
+    assert list(res.evaluated) == [False, False, True]
+    assert np.isnan(res.peak_pnl_pct[0]) and np.isnan(res.peak_pnl_pct[1])
+
+
+def test_window_scan_takes_first_hit_and_tracks_peak():
+    rules = ExitRules()
+    ticks = np.array([20.0, 25.0, 30.0, 35.0])
+    # columns: trailing after a +15% peak, stop loss, take profit, never exits
+    path = np.array(
+        [
+            [1.10, 0.90, 1.05, 1.02],
+            [1.15, 0.60, 1.25, 1.05],
+            [1.04, 0.50, 0.60, 1.03],
+            [1.30, 1.00, 1.00, 1.04],
+        ]
+    )
+    res = scan_exits(np.ones(4), path, ticks, np.zeros(4), np.full(4, np.nan), rules)
+    assert list(res.reason) == [TRAILING_EXIT, STOP_LOSS, TAKE_PROFIT, NO_EXIT]
+    assert list(res.row[:3]) == [2, 1, 1]
+    assert list(res.exit_base[:3]) == [1.04, 0.60, 1.25]
+    assert abs(res.peak_pnl_pct[0] - 15.0) < 1e-9
+    assert abs(res.peak_pnl_pct[3] - 5.0) < 1e-9
+
+
+def test_exit_book_add_scan_remove():
+    book = ExitBook.from_rows(
+        [
+            {"id": 1, "quote": "A", "entry_base": 1.0, "entry_out_raw": 100, "ts_open": 0},
+            {"id": 2, "quote": "B", "entry_base": 1.0, "entry_out_raw": 200, "ts_open": 0,
+             "peak_pnl_pct": 12.0},
+        ]
+    )
+    book.add(3, "C", 2.0, 300, 50.0)
+    assert len(book) == 3
+    book.exit_base[:] = [1.5, 1.0, 2.0]
+    res = book.evaluate(100.0, ExitRules())
+    assert list(res.close) == [True, True, False]
+    book.remove(res.close)
+    assert book.keys == [3] and book.mints == ["C"]
+    assert list(book.peak_pnl_pct) == [0.0]
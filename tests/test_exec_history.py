@@ -0,0 +1,106 @@
+import csv
+
+import pytest
+
+from memebot.exec import history
+from memebot.exec.history import HistoryStore, columns_from_rows
+from memebot.exec.store import CLOSED_FIELDS
+
+DAY = 86_400
+
+
+def _closed(ts_close, pnl, quote="MintA"):
+    return {
+        "ts_open": ts_close - 60, "ts_close": ts_close, "chain": "solana", "base": "SOL",
+        "quote": quote, "entry_base": 1.0, "entry_out_raw": 100.0,
+        "exit_base": 1.0 + pnl, "pnl_base": pnl, "reason": "take_profit",
+    }
+
+
+def _column(h, table, col):
+    """All values of ``col`` in day/part order, read back from the files."""
+    return [
+        v
+        for day in h.days(table)
+        for part in h._parts(table, day)
+        for v in h._read_part(part, [col])[col].tolist()
+    ]
+
+
+def _write_csv(path, rows, mode="w"):
+    with open(path, mode, newline="") as f:
+        w = csv.DictWriter(f, fieldnames=CLOSED_FIELDS)
+        if mode == "w":
+            w.writeheader()
+        w.writerows(rows)
+
+
+def test_append_partitions_by_day(tmp_path):
+    h = HistoryStore(tmp_path)
+    rows = [_closed(10 * DAY + 5, 1.0), _closed(11 * DAY + 5, -0.5), _closed(12 * DAY + 5, 2.0)]
+    assert h.append("closed", columns_from_rows("closed", rows)) == 3
+    assert h.days("closed") == ["1970-01-11", "1970-01-12", "1970-01-13"]
+    part = h._parts("closed", "1970-01-12")[0]
+    assert h._read_part(part, ["pnl_base"])["pnl_base"].tolist() == [-0.5]
+    assert _column(h, "closed", "quote") == ["MintA"] * 3
+
+
+def test_sync_csv_is_incremental(tmp_path):
+    path = tmp_path / "positions_closed.csv"
+    _write_csv(path, [_closed(DAY, 1.0)])
+    h = history.history_for(path)
+    assert h.sync_csv("closed", path) == 1
+    assert h.sync_csv("closed", path) == 0
+    _write_csv(path, [_closed(DAY + 10, -2.0, "MintB")], mode="a")
+    assert h.sync_csv("closed", path) == 1
+    assert _column(h, "closed", "pnl_base") == [1.0, -2.0]
+
+
+def test_sync_csv_rebuilds_when_file_rewritten(tmp_path):
+    path = tmp_path / "positions_closed.csv"
+    _write_csv(path, [_closed(DAY, 1.0), _closed(DAY, 2.0)])
+    h = history.history_for(path)
+    h.sync_csv("closed", path)
+    _write_csv(path, [_closed(DAY, 7.0)])  # smaller snapshot
+    h.sync_csv("closed", path)
+    assert _column(h, "closed", "pnl_base") == [7.0]
+    _write_csv(path, [_closed(DAY, 8.0), _closed(DAY, 9.0)])  # same size class, new content
+    h.sync_csv("closed", path)
+    assert _column(h, "closed", "pnl_base") == [8.0, 9.0]
+
+
+def test_sync_csv_waits_for_complete_lines(tmp_path):
+    path = tmp_path / "positions_closed.csv"
+    _write_csv(path, [_closed(DAY, 1.0)])
+    with open(path, "a") as f:
+        f.write("1,2,solana")  # half-written row
+    h = history.history_for(path)
+    assert h.sync_csv("closed", path) == 1
+    with open(path, "a") as f:
+        f.write(",SOL,MintC,1,1,3,2,tp\n")
+    assert h.sync_csv("closed", path) == 1
+    assert sorted(_column(h, "closed", "quote")) == ["MintA", "MintC"]
+
+
+def test_compact_merges_parts(tmp_path):
+    h = HistoryStore(tmp_path)
+    for i in range(5):
+        h.append("closed", columns_from_rows("closed", [_closed(DAY + i, float(i))]))
+    assert len(h._parts("closed", "1970-01-02")) == 5
+    assert h.compact("closed", max_parts=2) == 1
+    assert len(h._parts("closed", "1970-01-02")) == 1
+    assert _column(h, "closed", "pnl_base") == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+@pytest.mark.skipif(not history.HAVE_PYARROW, reason="pyarrow not installed")
+def test_parquet_round_trip(tmp_path):
+    h = HistoryStore(tmp_path, fmt="parquet")
+    h.append("closed", columns_from_rows("closed", [_closed(DAY, 1.5, "MintP")]))
+    assert _column(h, "closed", "quote") == ["MintP"]
+    assert _column(h, "closed", "pnl_base") == [1.5]
+
+
+def test_parquet_requires_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setattr(history, "HAVE_PYARROW", False)
+    with pytest.raises(RuntimeError):
+        HistoryStore(tmp_path, fmt="parquet")
@@ -0,0 +1,103 @@
+import importlib
+import time
+import pytest
+from memebot.exec import loss_ledger, store
+from memebot.exec import positions as pos
+from memebot.exec.loss_ledger import DAY_SEC, DailyLossLedger
+
+
+@pytest.fixture(autouse=True)
+def fresh_ledger():
+    loss_ledger.reset_loss_ledger()
+    yield
+    loss_ledger.reset_loss_ledger()
+    store.reset_stores()
+
+
+def test_record_accumulates_losses_and_rolls_over():
+    now = [10 * DAY_SEC + 100.0]
+    ledger = DailyLossLedger(clock=lambda: now[0])
+    ledger.record(now[0], -0.4)
+    ledger.record(now[0], 0.9)  # gains don't offset the cap
+    ledger.record(now[0] - DAY_SEC, -5.0)  # yesterday
+    assert ledger.loss_today() == pytest.approx(0.4)
+    assert not ledger.exceeded(0.5)
+    ledger.record(now[0], -0.1)
+    assert ledger.exceeded(0.5)
+
+    now[0] += DAY_SEC
+    assert ledger.loss_today() == 0.0
+
+
+def test_reset_hour_moves_day_boundary():
+    ledger = DailyLossLedger(reset_hour_utc=6, clock=lambda: 10 * DAY_SEC + 7 * 3600)
+    assert ledger.day_start() == 10 * DAY_SEC + 6 * 3600
+    ledger.rebuild(
+        [
+            {"ts_close": 10 * DAY_SEC + 5 * 3600, "pnl_base": -1.0},  # before 06:00
+            {"ts_close": 10 * DAY_SEC + 6 * 3600, "pnl_base": -0.25},
+        ]
+    )
+    assert ledger.loss_today() == pytest.approx(0.25)
+
+
+def test_global_ledger_rebuilds_from_store_and_tracks_closes(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    importlib.reload(pos)
+    pos.open_position("solana", "SOL", "Mint", 1.0, 1000.0)
+    assert loss_ledger.get_loss_ledger().loss_today() == 0.0
+
+    quote = {"ok": True, "out_amount": 600_000_000}  # exit_base 0.6
+    monkeypatch.setattr(pos, "estimate_price_impact_solana", lambda *a, **k: quote)
+    rules = pos.ExitRules()
+    rules.min_hold_sec = 0
+    assert pos.tick_exits(rules=rules)["closed"] == 1
+    assert loss_ledger.get_loss_ledger().loss_today() == pytest.approx(0.4)
+
+    # A restart rebuilds the same total from the store
+    loss_ledger.reset_loss_ledger()
+    assert loss_ledger.get_loss_ledger().loss_today() == pytest.approx(0.4)
+
+
+def test_ledger_picks_up_closes_from_other_processes(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("LOSS_LEDGER_SYNC_SEC", "0")
+    ledger = loss_ledger.get_loss_ledger()
+    assert ledger.loss_today() == 0.0
+
+    # Another process closes a losing position straight into the store
+    s = store.get_store(tmp_path)
+    pid = s.add_open({"ts_open": 1.0, "chain": "solana", "base": "SOL", "quote": "M",
+                      "entry_base": 1.0, "entry_out_raw": 1.0})
+    now = time.time()
+    s.close(pid, {"ts_open": 1.0, "ts_close": now, "chain": "solana", "base": "SOL",
+                  "quote": "M", "entry_base": 1.0, "entry_out_raw": 1.0,
+                  "exit_base": 0.7, "pnl_base": -0.3, "reason": "stop_loss"})
+    assert ledger.loss_today() == pytest.approx(0.3)
+    assert ledger.exceeded(0.3)
+    store.reset_stores()
+
+
+def test_sync_racing_a_close_neither_doubles_nor_drops_it():
+    now = 10 * DAY_SEC + 100
+    rows = []
+    ledger = DailyLossLedger(clock=lambda: now, source=lambda since: list(rows), sync_sec=3600)
+
+    # The sync sees the store row before tick_exits records the close
+    rows.append({"ts_close": now - 5, "pnl_base": -0.4})
+    ledger.sync()
+    ledger.record(now - 5, -0.4)
+    assert ledger.loss_today() == pytest.approx(0.4)
+
+    # The sync query ran before a close, and its swap lands after the record
+    stale = list(rows)
+    rows.append({"ts_close": now - 1, "pnl_base": -0.1})
+    ledger.record(now - 1, -0.1)
+    ledger.rebuild(stale)
+    assert ledger.loss_today() == pytest.approx(0.5)
+
+    # Two distinct closes with the same time and PnL still count twice
+    ledger.record(now, -0.2)
+    ledger.record(now, -0.2)
+    ledger.rebuild(rows + [{"ts_close": now, "pnl_base": -0.2}])
+    assert ledger.loss_today() == pytest.approx(0.9)
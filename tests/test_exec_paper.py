@@ -1,4 +1,5 @@
-import os, csv, importlib
+import csv, json, time, importlib
+import pytest
 from memebot.exec import paper as pt
 
 
@@ -18,6 +19,7 @@ def test_append_paper_trade(tmp_path, monkeypatch):
         reason="test",
     )
     pt.append_trade(t)
+    assert pt.flush_trades()
     path = pt._trades_csv()
     assert path.exists()
     rows = list(csv.DictReader(open(path)))
@@ -43,4 +45,79 @@ def test_papertrade_action_property(monkeypatch, tmp_path):
     )
 
     # Directly check the property to execute line 25
-    assert t.action == "buy"
\ No newline at end of file
+    assert t.action == "buy"
+
+
+def _trade(i=0):
+    return pt.PaperTrade(
+        ts=float(i), chain="solana", side="buy", base="SOL", quote=f"Mint{i}",
+        size_base=0.1, out_amount=100.0, price_impact_bps=0, slippage_bps=0, reason="t",
+    )
+
+
+def _lines(path):
+    return path.read_text().splitlines() if path.exists() else []
+
+
+def test_journal_batches_by_size(tmp_path):
+    j = pt.TradeJournal(tmp_path / "t.csv", tmp_path / "t.jsonl", batch_size=3, flush_sec=60)
+    for i in range(2):
+        j.append(pt.asdict(_trade(i)))
+    time.sleep(0.05)
+    assert _lines(tmp_path / "t.csv") == []  # below batch size, timer far away
+    j.append(pt.asdict(_trade(2)))
+    deadline = time.time() + 2
+    while j.written < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(_lines(tmp_path / "t.csv")) == 4  # header + 3
+    assert [json.loads(l)["quote"] for l in _lines(tmp_path / "t.jsonl")] == ["Mint0", "Mint1", "Mint2"]
+    j.close()
+
+
+def test_journal_flushes_on_timer_and_close(tmp_path):
+    j = pt.TradeJournal(tmp_path / "t.csv", tmp_path / "t.jsonl", batch_size=100, flush_sec=0.02)
+    j.append(pt.asdict(_trade()))
+    deadline = time.time() + 2
+    while j.written < 1 and time.time() < deadline:
+        time.sleep(0.01)
+    assert j.written == 1
+    j.append(pt.asdict(_trade(1)))
+    j.close()
+    assert len(_lines(tmp_path / "t.csv")) == 3
+
+
+def test_journal_header_written_once_across_reopen(tmp_path):
+    for i in range(2):
+        j = pt.TradeJournal(tmp_path / "t.csv", tmp_path / "t.jsonl", fsync="batch")
+        j.append(pt.asdict(_trade(i)))
+        j.close()
+    rows = list(csv.DictReader(open(tmp_path / "t.csv")))
+    assert [r["quote"] for r in rows] == ["Mint0", "Mint1"]
+
+
+def test_journal_rejects_unknown_fsync_policy(tmp_path):
+    with pytest.raises(ValueError):
+        pt.TradeJournal(tmp_path / "t.csv", tmp_path / "t.jsonl", fsync="sometimes")
+
+
+def test_history_is_a_bounded_ring(monkeypatch, tmp_path):
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("TRADE_HISTORY_MAX", "3")
+    pt.reset_trades()
+    for i in range(5):
+        pt.append_trade(_trade(i))
+    assert [t.quote for t in pt.get_all_trades()] == ["Mint2", "Mint3", "Mint4"]
+    assert pt.flush_trades()
+    assert len(list(csv.DictReader(open(tmp_path / "trades.csv")))) == 5
+    pt.close_journal()
+    pt.reset_trades()
+
+
+def test_journal_follows_data_dir(monkeypatch, tmp_path):
+    a, b = tmp_path / "a", tmp_path / "b"
+    for d in (a, b):
+        monkeypatch.setenv("MEMEBOT_DATA_DIR", str(d))
+        pt.append_trade(_trade())
+    assert pt.flush_trades()
+    assert (a / "trades.csv").exists() and (b / "trades.csv").exists()
+    pt.close_journal()
@@ -2,6 +2,7 @@ import importlib
 import os
 import tempfile
 import csv
+import pytest
 from memebot.exec import pnl
 
 
@@ -39,4 +40,99 @@ def test_report_with_data(monkeypatch, tmp_path):
     assert res.gross_base == 5.0
     assert res.net_base == -0.5
     assert res.winners == 1
-    assert res.losers == 1
\ No newline at end of file
+    assert res.losers == 1
+
+
+DAY = 86_400
+
+
+def _write_closed(path, rows, mode="w"):
+    with open(path, mode, newline="") as f:
+        w = csv.DictWriter(f, fieldnames=["ts_close", "quote", "exit_base", "pnl_base"])
+        if mode == "w":
+            w.writeheader()
+        w.writerows(rows)
+
+
+def test_aggregates_fold_only_new_rows(tmp_path):
+    path = tmp_path / "positions_closed.csv"
+    _write_closed(path, [{"ts_close": DAY, "quote": "A", "exit_base": 2, "pnl_base": 1}])
+    agg = pnl.PnLAggregates()
+    assert agg.catch_up(path)
+    assert not agg.catch_up(path)
+
+    _write_closed(path, [{"ts_close": 3 * DAY, "quote": "B", "exit_base": 1, "pnl_base": -2}], "a")
+    assert agg.catch_up(path)
+    s = agg.summary()
+    assert (s["trades"], s["gross"], s["winners"], s["losers"]) == (2, -1.0, 1, 1)
+    assert s["tokens"] == {"A": {"trades": 1, "gross": 1.0}, "B": {"trades": 1, "gross": -2.0}}
+    assert agg.summary(since_ts=2 * DAY)["trades"] == 1
+    assert list(agg.daily()) == ["1970-01-02", "1970-01-04"]
+
+
+def test_aggregates_rebuild_when_file_rewritten(tmp_path):
+    path = tmp_path / "positions_closed.csv"
+    _write_closed(path, [{"ts_close": DAY, "quote": "A", "exit_base": 2, "pnl_base": 1}] * 3)
+    agg = pnl.PnLAggregates()
+    agg.catch_up(path)
+    _write_closed(path, [{"ts_close": DAY, "quote": "C", "exit_base": 1, "pnl_base": 5}])
+    agg.catch_up(path)
+    assert agg.summary()["tokens"] == {"C": {"trades": 1, "gross": 5.0}}
+
+
+def test_aggregates_persist_next_to_store(tmp_path):
+    path = tmp_path / "positions_closed.csv"
+    _write_closed(path, [{"ts_close": DAY, "quote": "A", "exit_base": 2, "pnl_base": 1}])
+    pnl.reset_pnl_aggregates()
+    assert pnl.pnl_summary(closed_csv=path)["trades"] == 1
+    assert (tmp_path / pnl.AGG_FILE).exists()
+
+    pnl.reset_pnl_aggregates()
+    loaded = pnl.PnLAggregates.load(tmp_path / pnl.AGG_FILE)
+    assert loaded.summary()["trades"] == 1
+    assert not loaded.catch_up(path)  # watermark survived the restart
+    pnl.reset_pnl_aggregates()
+
+
+def test_parse_since():
+    now = 10 * DAY + 5
+    assert pnl.parse_since("all", now) is None
+    assert pnl.parse_since("today", now) == 10 * DAY
+    assert pnl.parse_since("7d", now) == now - 7 * DAY
+    assert pnl.parse_since("1970-01-03", now) == 2 * DAY
+    assert pnl.parse_since("12345", now) == 12345.0
+    with pytest.raises(ValueError):
+        pnl.parse_since("last tuesday", now)
+
+
+def test_mid_day_cutoff_is_exact(tmp_path):
+    path = tmp_path / "positions_closed.csv"
+    _write_closed(
+        path,
+        [
+            {"ts_close": DAY + 100, "quote": "A", "exit_base": 1, "pnl_base": 1},
+            {"ts_close": DAY + 500, "quote": "B", "exit_base": 2, "pnl_base": -2},
+            {"ts_close": 2 * DAY + 10, "quote": "C", "exit_base": 3, "pnl_base": 4},
+        ],
+    )
+    _write_closed(path, [{"ts_close": DAY + 900, "quote": "A", "exit_base": 1, "pnl_base": 8}], "a")
+    agg = pnl.PnLAggregates()
+    agg.catch_up(path)
+
+    s = agg.summary(since_ts=DAY + 300)
+    assert (s["trades"], s["gross"], s["winners"], s["losers"]) == (3, 10.0, 2, 1)
+    assert s["tokens"] == {
+        "A": {"trades": 1, "gross": 8.0},
+        "B": {"trades": 1, "gross": -2.0},
+        "C": {"trades": 1, "gross": 4.0},
+    }
+    assert agg.daily(since_ts=DAY + 300) == {
+        "1970-01-02": {"trades": 2, "gross": 6.0},
+        "1970-01-03": {"trades": 1, "gross": 4.0},
+    }
+    # A cutoff on the boundary still uses the whole bucket
+    assert agg.summary(since_ts=DAY)["trades"] == 4
+
+    # The exact filter survives a save/load round trip
+    saved = pnl.PnLAggregates.from_dict(agg.to_dict())
+    assert saved.summary(since_ts=DAY + 950)["trades"] == 1
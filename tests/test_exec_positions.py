@@ -125,10 +125,13 @@ def test_read_csv_and_list_open_positions(tmp_path, monkeypatch):
     rows = pos._read_csv(f)
     assert rows and rows[0]["chain"] == "solana"
 
-    # patch _open_csv to point here and hit list_open_positions
-    monkeypatch.setattr(pos, "_open_csv", lambda: f)
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    importlib.reload(pos)
+    pos.open_position("solana", "SOL", "XYZ", 1.0, 100.0)
     listed = pos.list_open_positions()
-    assert listed == rows
+    assert len(listed) == 1
+    assert listed[0]["quote"] == "XYZ"
+    assert listed[0]["entry_out_raw"] == 100.0
 
 def test_tick_exits_remaining_open(tmp_path, monkeypatch):
     monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
@@ -213,3 +216,85 @@ def test_tick_exits_no_closures(monkeypatch, tmp_path):
 
     res = pos.tick_exits()
     assert res == {"closed": 0}  # ✅ hits the final return
+
+
+def test_tick_exits_merges_positions_by_mint(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    importlib.reload(pos)
+    pos.open_position("solana", "SOL", "Shared", 1.0, 1000.0)
+    pos.open_position("solana", "SOL", "Shared", 1.0, 3000.0)
+
+    calls = []
+
+    def fake_quote(input_mint, output_mint, amount):
+        calls.append((input_mint, amount))
+        return {"ok": True, "out_amount": int(8.0 * 1_000_000_000)}
+
+    monkeypatch.setattr(pos, "estimate_price_impact_solana", fake_quote)
+    rules = pos.ExitRules()
+    rules.min_hold_sec = 0
+    rules.tp_pct = 150  # only the larger share (6.0 SOL) clears +150%
+
+    res = pos.tick_exits(rules=rules)
+    assert calls == [("Shared", 4000)]
+    assert res["closed"] == 1
+    assert pos.list_open_positions()[0]["entry_out_raw"] == 1000.0
+    stats = pos.last_tick_stats()
+    assert stats.positions == 2 and stats.mints == 1 and stats.quoted == 1
+
+
+def test_tick_exits_records_exit_state(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    importlib.reload(pos)
+    pos.open_position("solana", "SOL", "Up", 1.0, 1000.0, note="caller=alpha")
+    pos.open_position("solana", "SOL", "Down", 1.0, 1000.0)
+
+    def fake_quote(input_mint, output_mint, amount):
+        if input_mint == "Down":
+            return {"ok": False, "error": "no route"}
+        return {"ok": True, "out_amount": int(1.1 * 1_000_000_000)}
+
+    monkeypatch.setattr(pos, "estimate_price_impact_solana", fake_quote)
+    rules = pos.ExitRules()
+    rules.min_hold_sec = 0
+    pos.tick_exits(rules=rules)
+    pos.tick_exits(rules=rules)
+
+    up, down = pos.list_open_positions()
+    assert up["note"] == "caller=alpha"
+    assert abs(up["peak_pnl_pct"] - 10.0) < 1e-9
+    assert abs(up["last_exit_base"] - 1.1) < 1e-9 and up["last_quote_ts"] > 0
+    assert up["quote_failures"] == 0
+    assert down["quote_failures"] == 2 and down["peak_pnl_pct"] is None
+
+
+def test_tick_exits_attributes_close_to_signal(tmp_path, monkeypatch):
+    from types import SimpleNamespace
+    from memebot.exec.attribution import get_attribution, reset_attribution
+
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    importlib.reload(pos)
+    reset_attribution()
+    sig = SimpleNamespace(platform="telegram", source="alpha_chat", caller="Whale", timestamp=1.0)
+    pos.open_position("solana", "SOL", "Mint", 1.0, 1000.0, signal=sig)
+
+    out = {"v": 1.1}
+    monkeypatch.setattr(
+        pos,
+        "estimate_price_impact_solana",
+        lambda *a, **k: {"ok": True, "out_amount": int(out["v"] * 1_000_000_000)},
+    )
+    rules = pos.ExitRules()
+    rules.min_hold_sec = 0
+    pos.tick_exits(rules=rules)
+    (row,) = pos.list_open_positions()
+    assert row["peak_ts"] >= row["ts_open"]
+
+    out["v"] = 0.5  # stop loss
+    assert pos.tick_exits(rules=rules)["closed"] == 1
+    st = get_attribution().stats("caller", "whale")
+    assert st.n == 1 and st.hit_rate == 0.0
+    assert abs(st.avg_return + 0.5) < 1e-9
+    assert st.avg_time_to_peak_sec == pytest.approx(row["peak_ts"] - row["ts_open"])
+    assert get_attribution().stats("source", "alpha_chat").n == 1
+    reset_attribution()
@@ -0,0 +1,50 @@
+import time
+import threading
+from memebot.exec.quote_engine import QuoteEngine
+
+
+def test_quote_all_runs_concurrently():
+    engine = QuoteEngine(max_concurrency=8, deadline_sec=5)
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def slow_quote(mint, amount):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.05)
+        with lock:
+            active["now"] -= 1
+        return {"ok": True, "out_amount": amount * 2}
+
+    amounts = {f"Mint{i}": 10 + i for i in range(8)}
+    start = time.perf_counter()
+    res, stats = engine.quote_all(amounts, slow_quote)
+    assert time.perf_counter() - start < 0.3  # not 8 * 50ms
+    assert active["peak"] > 1
+    assert res["Mint3"]["out_amount"] == 26
+    assert stats.quoted == 8 and stats.mints == 8
+    assert stats.p95_ms >= stats.p50_ms > 0
+    engine.shutdown()
+
+
+def test_quote_all_deadline_and_errors():
+    engine = QuoteEngine(max_concurrency=2, deadline_sec=0.1)
+
+    def quote(mint, amount):
+        if mint == "Slow":
+            time.sleep(0.5)
+        if mint == "Boom":
+            raise RuntimeError("rpc down")
+        return {"ok": True, "out_amount": 1}
+
+    res, stats = engine.quote_all({"Fast": 1, "Boom": 1, "Slow": 1}, quote)
+    assert "Slow" not in res
+    assert res["Boom"]["ok"] is False
+    assert stats.timed_out == 1 and stats.failed == 1 and stats.quoted == 1
+    engine.shutdown()
+
+
+def test_quote_all_empty():
+    res, stats = QuoteEngine().quote_all({}, lambda m, a: {})
+    assert res == {} and stats.mints == 0
@@ -0,0 +1,168 @@
+import csv
+import sqlite3
+import pytest
+from memebot.exec import store as st
+
+
+def _closed_row(ts_close=100.0, pnl=-0.5, quote="MintA"):
+    return {
+        "ts_open": 1.0,
+        "ts_close": ts_close,
+        "chain": "solana",
+        "base": "SOL",
+        "quote": quote,
+        "entry_base": 1.0,
+        "entry_out_raw": 1000.0,
+        "exit_base": 1.0 + pnl,
+        "pnl_base": pnl,
+        "reason": "stop_loss",
+    }
+
+
+def _open_row(quote="MintA"):
+    return {
+        "ts_open": 1.0,
+        "chain": "solana",
+        "base": "SOL",
+        "quote": quote,
+        "entry_base": 1.0,
+        "entry_out_raw": 1000.0,
+        "note": "",
+    }
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "csv"])
+def test_open_update_close_roundtrip(tmp_path, monkeypatch, backend):
+    monkeypatch.setenv("POSITION_STORE", backend)
+    s = st.get_store(tmp_path)
+    a = s.add_open(_open_row("MintA"))
+    b = s.add_open(_open_row("MintB"))
+    assert [r["quote"] for r in s.list_open()] == ["MintA", "MintB"]
+
+    s.update_open(a, note="peak=1.5")
+    assert s.list_open()[0]["note"] == "peak=1.5"
+
+    s.close(a, _closed_row(quote="MintA"))
+    assert [r["id"] for r in s.list_open()] == [b]
+    closed = s.list_closed()
+    assert len(closed) == 1 and closed[0]["pnl_base"] == -0.5
+    assert s.list_closed(since_ts=200.0) == []
+
+    # Closed rows are always mirrored to the CSV export
+    rows = list(csv.DictReader(open(tmp_path / "positions_closed.csv")))
+    assert rows[0]["quote"] == "MintA"
+    st.reset_stores()
+
+
+def test_sqlite_uses_wal_and_indexes(tmp_path, monkeypatch):
+    monkeypatch.setenv("POSITION_STORE", "sqlite")
+    st.get_store(tmp_path)
+    conn = sqlite3.connect(str(tmp_path / "positions.db"))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert {"ix_open_quote", "ix_open_ts_open", "ix_closed_ts_close"} <= names
+    conn.close()
+    st.reset_stores()
+
+
+def test_sqlite_imports_legacy_csv_once(tmp_path, monkeypatch):
+    monkeypatch.setenv("POSITION_STORE", "sqlite")
+    st._write_csv(tmp_path / "positions_open.csv", [_open_row("Legacy")])
+    st._write_csv(tmp_path / "positions_closed.csv", [_closed_row()])
+    s = st.get_store(tmp_path)
+    assert [r["quote"] for r in s.list_open()] == ["Legacy"]
+    assert len(s.list_closed()) == 1
+    st.reset_stores()
+
+    # Reopening an existing database must not import again
+    s = st.get_store(tmp_path)
+    assert len(s.list_open()) == 1
+    st.reset_stores()
+
+
+def test_export_rewrites_mismatched_header(tmp_path, monkeypatch):
+    monkeypatch.setenv("POSITION_STORE", "sqlite")
+    s = st.get_store(tmp_path)
+    st._write_csv(tmp_path / "positions_closed.csv", [])  # legacy mixed header
+    pid = s.add_open(_open_row())
+    s.close(pid, _closed_row())
+    with open(tmp_path / "positions_closed.csv") as f:
+        assert next(csv.reader(f)) == st.CLOSED_FIELDS
+
+    s.export_csv(tmp_path / "open.csv", tmp_path / "closed.csv")
+    assert len(list(csv.DictReader(open(tmp_path / "closed.csv")))) == 1
+    st.reset_stores()
+
+
+def test_unknown_backend(tmp_path, monkeypatch):
+    monkeypatch.setenv("POSITION_STORE", "bogus")
+    with pytest.raises(ValueError):
+        st.get_store(tmp_path)
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "csv"])
+def test_exit_state_fields_roundtrip(tmp_path, monkeypatch, backend):
+    monkeypatch.setenv("POSITION_STORE", backend)
+    s = st.get_store(tmp_path)
+    a = s.add_open(dict(_open_row(), note="from alpha_calls"))
+    assert s.list_open()[0]["peak_pnl_pct"] is None
+    assert s.list_open()[0]["quote_failures"] == 0
+
+    state = {"peak_pnl_pct": 12.5, "last_quote_ts": 50.0, "last_exit_base": 1.1}
+    s.update_open_many({a: dict(state, quote_failures=2)})
+    st.reset_stores()
+    row = st.get_store(tmp_path).list_open()[0]
+    assert row["peak_pnl_pct"] == 12.5 and row["last_quote_ts"] == 50.0
+    assert row["last_exit_base"] == 1.1 and row["quote_failures"] == 2
+    assert row["note"] == "from alpha_calls"
+    st.reset_stores()
+
+
+def test_sqlite_migrates_note_peak_to_column(tmp_path, monkeypatch):
+    monkeypatch.setenv("POSITION_STORE", "sqlite")
+    conn = sqlite3.connect(str(tmp_path / "positions.db"))
+    conn.execute(
+        "CREATE TABLE positions_open (id INTEGER PRIMARY KEY AUTOINCREMENT, ts_open REAL NOT NULL, "
+        "chain TEXT NOT NULL, base TEXT NOT NULL, quote TEXT NOT NULL, entry_base REAL NOT NULL, "
+        "entry_out_raw REAL NOT NULL, note TEXT NOT NULL DEFAULT '')"
+    )
+    conn.execute(
+        "INSERT INTO positions_open (ts_open, chain, base, quote, entry_base, entry_out_raw, note) "
+        "VALUES (1, 'solana', 'SOL', 'Old', 1.0, 1000.0, 'peak=7.5')"
+    )
+    conn.commit()
+    conn.close()
+    row = st.get_store(tmp_path).list_open()[0]
+    assert row["peak_pnl_pct"] == 7.5 and row["note"] == ""
+    assert row["quote_failures"] == 0
+    st.reset_stores()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "csv"])
+def test_ids_not_reused_and_double_close_is_noop(tmp_path, monkeypatch, backend):
+    monkeypatch.setenv("POSITION_STORE", backend)
+    s = st.get_store(tmp_path)
+    s.add_open(_open_row("MintA"))
+    b = s.add_open(_open_row("MintB"))
+    assert s.close(b, _closed_row(quote="MintB"))
+    assert not s.close(b, _closed_row(quote="MintB"))
+    assert not s.close(999, _closed_row(quote="Nope"))
+    assert len(s.list_closed()) == 1
+
+    st.reset_stores()  # ids survive a restart too
+    c = st.get_store(tmp_path).add_open(_open_row("MintC"))
+    assert c > b
+    st.reset_stores()
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "csv"])
+def test_count_open_tracks_adds_and_closes(tmp_path, monkeypatch, backend):
+    monkeypatch.setenv("POSITION_STORE", backend)
+    s = st.get_store(tmp_path)
+    assert s.count_open() == 0
+    a = s.add_open(_open_row("MintA"))
+    s.add_open(_open_row("MintB"))
+    assert s.count_open() == 2
+    s.close(a, _closed_row())
+    assert s.count_open() == 1 == len(s.list_open())
+    st.reset_stores()
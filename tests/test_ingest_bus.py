@@ -0,0 +1,78 @@
+import time
+import asyncio
+import threading
+import pytest
+from memebot.ingest.bus import SignalBus
+
+
+@pytest.mark.asyncio
+async def test_consumers_run_sync_handlers_in_parallel():
+    bus = SignalBus(maxsize=10, consumers=4)
+    seen, lock = [], threading.Lock()
+
+    def handler(sig):
+        time.sleep(0.05)
+        with lock:
+            seen.append(sig)
+
+    bus.start(handler)
+    start = time.perf_counter()
+    for i in range(4):
+        await bus.publish(i)
+    await bus.join()
+    assert sorted(seen) == [0, 1, 2, 3]
+    assert time.perf_counter() - start < 0.15
+    assert bus.stats.handled == 4 and bus.stats.published == 4
+    await bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_drop_new_and_drop_oldest_policies():
+    bus = SignalBus(maxsize=2, policy="drop_new")
+    assert await bus.publish(1) and await bus.publish(2)
+    assert await bus.publish(3) is False
+    assert bus.stats.dropped_new == 1 and bus.depth() == 2
+
+    bus = SignalBus(maxsize=2, policy="drop_oldest")
+    for i in (1, 2, 3):
+        await bus.publish(i)
+    assert bus.stats.dropped_oldest == 1
+    assert [bus.queue.get_nowait(), bus.queue.get_nowait()] == [2, 3]
+    assert bus.stats.max_depth == 2
+
+
+@pytest.mark.asyncio
+async def test_block_policy_applies_backpressure():
+    bus = SignalBus(maxsize=1, policy="block", consumers=1)
+    await bus.publish("a")
+    pending = asyncio.create_task(bus.publish("b"))
+    await asyncio.sleep(0.01)
+    assert not pending.done()  # source is held until a consumer frees a slot
+
+    async def handler(sig):
+        pass
+
+    bus.start(handler)
+    await asyncio.wait_for(pending, 1)
+    await bus.join()
+    assert bus.stats.handled == 2
+    await bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_handler_errors_are_counted():
+    bus = SignalBus(consumers=1)
+
+    def boom(sig):
+        raise RuntimeError("quote timeout")
+
+    bus.start(boom)
+    await bus.publish(1)
+    await bus.join()
+    assert bus.stats.failed == 1
+    await bus.stop()
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        SignalBus(policy="lifo")
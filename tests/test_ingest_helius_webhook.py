@@ -8,6 +8,15 @@ import runpy
 from memebot.ingest import helius_webhook
 
 
+@pytest.fixture(autouse=True)
+def fresh_webhook_queue(monkeypatch):
+    monkeypatch.setattr(
+        helius_webhook,
+        "webhook_queue",
+        helius_webhook.WebhookQueue(helius_webhook.process_signals, name="helius"),
+    )
+
+
 def make_sig(secret: str, body: bytes) -> str:
     return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
 
@@ -27,7 +36,10 @@ async def test_helius_webhook_valid(monkeypatch):
     async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
         resp = await ac.post("/helius", content=body, headers={"x-helius-signature": sig})
     assert resp.status_code == 200
-    assert resp.json() == {"ok": True}
+    data = resp.json()
+    assert data["ok"] is True
+    assert data["delivery_id"] == helius_webhook.delivery_id(body)
+    assert data["queued"] == 1
 
 
 @pytest.mark.asyncio
@@ -55,7 +67,39 @@ async def test_helius_webhook_no_token_transfers(monkeypatch):
         resp = await ac.post("/helius", content=body, headers={"x-helius-signature": sig})
     # Should succeed but enqueue nothing
     assert resp.status_code == 200
-    assert resp.json() == {"ok": True}
+    assert resp.json()["ok"] is True
+    assert resp.json()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_helius_webhook_processes_in_background(monkeypatch):
+    monkeypatch.setattr(helius_webhook.settings, "helius_webhook_secret", "s")
+    enqueued = []
+    monkeypatch.setattr(helius_webhook, "enqueue_signal", enqueued.append)
+
+    async def fake_llm(sig):
+        return {"valuable": sig.contract != "mintB", "token": "TOK", "confidence": 0.7}
+
+    monkeypatch.setattr(helius_webhook, "filter_signal_with_llm", fake_llm)
+    body = json.dumps({
+        "transactions": [
+            {"account": "a", "description": "swap", "tokenTransfers": [{"mint": "mintA"}]},
+            {"account": "b", "description": "swap", "tokenTransfers": [{"mint": "mintB"}]},
+        ]
+    }).encode()
+
+    transport = httpx.ASGITransport(app=helius_webhook.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        headers = {"x-helius-signature": make_sig("s", body)}
+        first = await ac.post("/helius", content=body, headers=headers)
+        retry = await ac.post("/helius", content=body, headers=headers)
+        await helius_webhook.webhook_queue.join()
+
+    assert first.json()["queued"] == 2
+    assert retry.json()["duplicate"] is True and retry.json()["queued"] == 0
+    assert [s.contract for s in enqueued] == ["mintA"]
+    assert enqueued[0].confidence == 0.7
+    assert helius_webhook.webhook_queue.stats.processed == 1
 
 
 def test_verify_signature_ed25519(monkeypatch):
@@ -0,0 +1,129 @@
+import json
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from memebot.ingest import llm_filter
+from memebot.types import SocialSignal
+
+
+def make_stub_llm():
+    """Local stand-in for the chat completions API."""
+    app = FastAPI()
+    app.state.requests = []
+    app.state.in_flight = 0
+    app.state.max_in_flight = 0
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        prompt = body["messages"][0]["content"]
+        app.state.requests.append(prompt)
+        app.state.in_flight += 1
+        app.state.max_in_flight = max(app.state.max_in_flight, app.state.in_flight)
+        await asyncio.sleep(0.01)  # hold the request open so overlapping calls show
+        app.state.in_flight -= 1
+        n = prompt.count("Message:")
+        results = [
+            {"valuable": "BUY" in line, "reason": "stub", "token": "BONK", "confidence": 0.9}
+            for line in prompt.splitlines()
+            if "Message:" in line
+        ]
+        return {
+            "id": "x",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": json.dumps({"results": results})},
+                }
+            ],
+            "usage": {"prompt_tokens": 10 * n, "completion_tokens": 5 * n, "total_tokens": 15 * n},
+        }
+
+    return app
+
+
+def make_classifier(app, **kw):
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://stub")
+    return llm_filter.LLMClassifier(
+        api_key="test", base_url="http://stub/v1", http_client=client, **kw
+    )
+
+
+def sig(text):
+    return SocialSignal(platform="telegram", source="g", text=text)
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(llm_filter, "stats", llm_filter.LLMStats())
+    llm_filter.result_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_no_key_marks_noise(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    res = await llm_filter.filter_signal_with_llm(sig("BUY $BONK"))
+    assert res["valuable"] is False and "No LLM API key" in res["reason"]
+
+
+@pytest.mark.asyncio
+async def test_messages_in_window_share_one_call():
+    app = make_stub_llm()
+    clf = make_classifier(app, window_ms=20, max_batch=8)
+    res = await asyncio.gather(
+        *[llm_filter.filter_signal_with_llm(sig(t), clf) for t in ("BUY a", "noise b", "BUY c")]
+    )
+    assert [r["valuable"] for r in res] == [True, False, True]
+    assert len(app.state.requests) == 1
+    s = llm_filter.llm_stats()
+    assert s["calls"] == 1 and s["messages"] == 3 and s["avg_batch"] == 3
+    assert s["prompt_tokens"] == 30 and s["completion_tokens"] == 15
+
+
+@pytest.mark.asyncio
+async def test_repeated_text_hits_cache_and_coalesces():
+    app = make_stub_llm()
+    clf = make_classifier(app, window_ms=20)
+    # Same shill pasted twice in one window -> one message sent
+    await asyncio.gather(
+        llm_filter.filter_signal_with_llm(sig("BUY  $BONK now"), clf),
+        llm_filter.filter_signal_with_llm(sig("buy $bonk NOW"), clf),
+    )
+    assert app.state.requests[0].count("Message:") == 1
+    # Later repeat is served from the content-hash cache
+    res = await llm_filter.filter_signal_with_llm(sig("BUY $BONK now"), clf)
+    assert res["valuable"] is True
+    assert len(app.state.requests) == 1
+    s = llm_filter.llm_stats()
+    assert s["cache_hits"] == 1 and s["coalesced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_max_batch_flushes_and_concurrency_limit():
+    app = make_stub_llm()
+    clf = make_classifier(app, window_ms=1000, max_batch=2, max_concurrency=2)
+    await asyncio.gather(
+        *[llm_filter.filter_signal_with_llm(sig(f"BUY {i}"), clf) for i in range(8)]
+    )
+    assert len(app.state.requests) == 4
+    assert app.state.max_in_flight <= 2
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached():
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def broken():
+        return {"choices": []}
+
+    clf = make_classifier(app, window_ms=0)
+    res = await llm_filter.filter_signal_with_llm(sig("BUY x"), clf)
+    assert res["valuable"] is False and "LLM error" in res["reason"]
+    assert llm_filter.result_cache.get(llm_filter.content_key(sig("BUY x"))) is None
+    assert llm_filter.llm_stats()["errors"] == 1
@@ -0,0 +1,79 @@
+from memebot.ingest import prefilter as pf
+from memebot.types import SocialSignal
+
+SOL_MINT = "DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263"
+EVM_ADDR = "0x" + "ab" * 20
+
+
+def sig(text, source="chan", **kw):
+    return SocialSignal(platform="telegram", source=source, text=text, **kw)
+
+
+def test_extract_contracts_solana_and_evm():
+    found = pf.extract_contracts(f"CA {SOL_MINT} also {EVM_ADDR} and {SOL_MINT}")
+    assert found == [EVM_ADDR, SOL_MINT]
+    assert pf.extract_contracts("hello world") == []
+
+
+def test_spam_score_weights():
+    assert pf.spam_score("GIVEAWAY! dm me") == 4.0
+    assert pf.spam_score("buy $BONK") == 0.0
+
+
+def test_keeps_signal_and_fills_contract_and_symbol():
+    p = pf.Prefilter()
+    s = sig(f"aping $bonk {SOL_MINT}")
+    res = p.check(s)
+    assert res.keep and res.reason == "ok"
+    assert s.contract == SOL_MINT
+    assert s.symbol == "BONK"
+
+
+def test_existing_contract_not_overwritten():
+    p = pf.Prefilter()
+    s = sig(f"CA {SOL_MINT}", contract="Keep")
+    assert p.check(s).keep
+    assert s.contract == "Keep"
+
+
+def test_drops_spam_and_noise():
+    p = pf.Prefilter()
+    assert p.check(sig("huge giveaway, dm me to claim")).reason == "spam"
+    assert p.check(sig("good morning everyone")).reason == "no_signal"
+    assert p.check(sig("")).reason == "no_signal"
+    assert p.stats()["dropped"] == {"spam": 1, "no_signal": 2}
+
+
+def test_dedupe_same_source_only():
+    p = pf.Prefilter()
+    assert p.check(sig("buy $WIF now")).keep
+    dup = p.check(sig("  BUY  $wif now "))
+    assert not dup.keep and dup.reason == "duplicate"
+    # Same text from another channel still reaches fusion
+    assert p.check(sig("buy $WIF now", source="other")).keep
+    # Dedupe can be skipped per call
+    assert p.check(sig("buy $WIF now"), dedupe=False).keep
+
+
+def test_dedupe_ttl_and_cap(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(pf.time, "monotonic", lambda: now[0])
+    p = pf.Prefilter(dedupe_ttl_sec=10, dedupe_max=2)
+    assert p.check(sig("buy $A")).keep
+    assert not p.check(sig("buy $A")).keep
+    now[0] += 11
+    assert p.check(sig("buy $A")).keep
+    p.check(sig("buy $B"))
+    p.check(sig("buy $C"))
+    assert len(p._seen) == 2
+    assert p.check(sig("buy $A")).keep  # evicted by the cap
+
+    p = pf.Prefilter(dedupe_ttl_sec=0)
+    assert p.check(sig("buy $A")).keep and p.check(sig("buy $A")).keep
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("PREFILTER_SPAM_THRESHOLD", "5")
+    monkeypatch.setenv("PREFILTER_DEDUPE_TTL_SEC", "0")
+    p = pf.Prefilter.from_env()
+    assert p.spam_threshold == 5.0 and p.dedupe_ttl_sec == 0.0
@@ -0,0 +1,120 @@
+import json
+import httpx
+import pytest
+from memebot import server
+from memebot.ingest import helius_webhook, seen
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    seen.reset_seen_txs()
+    monkeypatch.delenv("WEBHOOK_SEEN_DB", raising=False)
+    monkeypatch.setattr(server, "webhook_queue", server.WebhookQueue(lambda sigs: None))
+    monkeypatch.setattr(
+        helius_webhook, "webhook_queue", helius_webhook.WebhookQueue(lambda sigs: None)
+    )
+    yield
+    seen.reset_seen_txs()
+
+
+def test_first_seen_ttl_and_cap(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(seen.time, "time", lambda: now[0])
+    s = seen.SeenSet(ttl_sec=10, max_entries=2)
+    assert s.first_seen("a")
+    assert not s.first_seen("a")
+    now[0] += 11
+    assert "a" not in s
+    assert s.first_seen("a")
+    s.first_seen("b")
+    s.first_seen("c")
+    assert len(s) == 2 and "a" not in s
+    assert s.stats() == {"entries": 2, "added": 4, "duplicates": 1, "evictions": 1}
+
+
+def test_claim_new_and_forget():
+    s = seen.SeenSet()
+    fresh, claimed = s.claim_new([("k1", 1), (None, 2), ("k1", 3), ("k2", 4)])
+    assert fresh == [1, 2, 4]
+    assert claimed == ["k1", "k2"]
+    s.forget("k1")
+    assert s.first_seen("k1")
+
+
+def test_persists_across_restarts(tmp_path):
+    db = tmp_path / "seen.db"
+    s = seen.SeenSet(db_path=db)
+    assert s.first_seen(seen.tx_key("sig1", "mintA"))
+    s.first_seen("gone")
+    s.forget("gone")
+    s.close()
+
+    s2 = seen.SeenSet(db_path=db)
+    assert not s2.first_seen(seen.tx_key("sig1", "mintA"))
+    assert s2.first_seen("gone")
+    s2.close()
+
+    # Expired rows are not reloaded
+    s3 = seen.SeenSet(ttl_sec=1e-9, db_path=db)
+    assert len(s3) == 0
+    s3.close()
+
+
+@pytest.mark.asyncio
+async def test_same_tx_rejected_across_webhook_paths(monkeypatch):
+    monkeypatch.setattr(server.settings, "helius_webhook_secret", "")
+    monkeypatch.setattr(helius_webhook, "verify_signature", lambda *a: True)
+
+    enhanced = {
+        "signature": "SIG1",
+        "events": {"token": [{"mint": "mintA", "rawTokenAmount": {"tokenAmount": "5"}}]},
+    }
+    helius_body = {
+        "transactions": [
+            {"signature": "SIG1", "account": "w", "tokenTransfers": [{"mint": "mintA"}]},
+            {"signature": "SIG1", "account": "w", "tokenTransfers": [{"mint": "mintB"}]},
+        ]
+    }
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=server.app), base_url="http://test"
+    ) as ac:
+        first = (await ac.post("/webhooks/helius", json=enhanced)).json()
+        # Overlapping notification for the same tx with a different body
+        overlap = (await ac.post("/webhooks/helius", json={**enhanced, "type": "SWAP"})).json()
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=helius_webhook.app), base_url="http://test"
+    ) as ac:
+        other = (
+            await ac.post("/helius", content=json.dumps(helius_body).encode())
+        ).json()
+
+    assert first["accepted"] == 1 and first["duplicate_txs"] == 0
+    assert overlap["accepted"] == 0 and overlap["duplicate_txs"] == 1
+    assert other["queued"] == 1 and other["duplicate_txs"] == 1
+    assert server.webhook_queue.stats.tx_duplicates == 1
+    assert helius_webhook.webhook_queue.stats.tx_duplicates == 1
+    assert seen.get_seen_txs().stats()["duplicates"] == 2
+
+
+@pytest.mark.asyncio
+async def test_rejected_delivery_releases_tx_claims(monkeypatch):
+    monkeypatch.setattr(server.settings, "helius_webhook_secret", "")
+    monkeypatch.setattr(server.webhook_queue, "submit", lambda did, payload: "rejected")
+    payload = {
+        "signature": "SIG2",
+        "events": {"token": [{"mint": "mintA", "rawTokenAmount": {"tokenAmount": "5"}}]},
+    }
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=server.app), base_url="http://test"
+    ) as ac:
+        resp = await ac.post("/webhooks/helius", json=payload)
+    assert resp.status_code == 503
+    assert seen.tx_key("SIG2", "mintA") not in seen.get_seen_txs()
+
+
+def test_tx_signature_variants():
+    assert server._tx_signature({"signature": "a"}) == "a"
+    assert server._tx_signature({"signatureInfo": {"signature": "b"}}) == "b"
+    assert server._tx_signature({"transaction": {"signatures": ["c", "d"]}}) == "c"
+    assert server._tx_signature({}) is None
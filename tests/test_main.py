@@ -5,11 +5,24 @@ import time
 from typer.testing import CliRunner
 from memebot import main
 from memebot.types import SocialSignal
+from memebot.exec import store
+from memebot.exec.attribution import get_attribution, reset_attribution
 
 runner = CliRunner()
 app = main.app
 
 
+@pytest.fixture(autouse=True)
+def isolated_data_dir(monkeypatch, tmp_path):
+    """Positions opened by handle_signal go to a throwaway data dir."""
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    store.reset_stores()
+    reset_attribution()
+    yield
+    store.reset_stores()
+    reset_attribution()
+
+
 @pytest.fixture(autouse=True)
 def patch_jupiter(monkeypatch):
     """Patch Jupiter API so tests don’t hit the network."""
@@ -51,7 +64,7 @@ def test_handle_signal_live_trade(monkeypatch):
     monkeypatch.setattr(main.settings, "network", "solana")
     monkeypatch.setattr(main.settings, "wsol_mint", "So11111111111111111111111111111111111111112")
     monkeypatch.setattr(main, "get_quote", lambda *a, **k: {"ok": True, "out_amount": 1000})
-    monkeypatch.setattr(main, "trade_live", lambda q: {"ok": True, "tx": "sig"})
+    monkeypatch.setattr(main, "trade_live", lambda q, **k: {"ok": True, "tx": "sig"})
 
     result = main.handle_signal(sig, debug=True, mode="live")
     assert result is not None  # should return a decision
@@ -69,16 +82,15 @@ def test_run_with_telegram_and_discord(monkeypatch):
     monkeypatch.setattr(main.settings, "enable_discord", True)
     monkeypatch.setattr(main.settings, "enable_mock", False)
 
-    # ✅ async replacement (since main uses asyncio.run)
+    # ✅ both sources run on the bus loop and publish via an async callback
     async def fake_run_telegram_ingest(cb, debug=False):
-        cb(sig)
+        await cb(sig)
 
-    # ✅ sync replacement (since main calls directly in thread)
-    def fake_run_discord_ingest(cb, debug=False):
-        cb(sig)
+    async def fake_run_discord_ingest(cb, debug=False):
+        await cb(sig)
 
     monkeypatch.setattr(main, "run_telegram_ingest", fake_run_telegram_ingest)
-    monkeypatch.setattr(main, "run_discord_ingest", fake_run_discord_ingest)
+    monkeypatch.setattr(main, "run_discord_ingest_async", fake_run_discord_ingest)
 
     result = runner.invoke(app, ["--mode", "simulate", "--max-signals", "1"])
     assert result.exit_code == 0
@@ -162,7 +174,7 @@ def test_handle_signal_live_trade_with_result(monkeypatch, caplog):
 
     # Patch get_quote and trade_live
     monkeypatch.setattr(main, "get_quote", lambda *a, **k: {"ok": True, "out_amount": 1000})
-    monkeypatch.setattr(main, "trade_live", lambda q: {"ok": True, "tx": "signature123"})
+    monkeypatch.setattr(main, "trade_live", lambda q, **k: {"ok": True, "tx": "signature123"})
 
     with caplog.at_level("INFO"):
         result = main.handle_signal(sig, debug=True, mode="live")
@@ -222,4 +234,41 @@ def test_main_entrypoint_runs_app(monkeypatch):
         assert e.code == 0
 
     # Ensure our DummyApp was called
-    assert "ok" in called
\ No newline at end of file
+    assert "ok" in called
+
+def test_handle_signal_paper_links_position_to_caller(monkeypatch, tmp_path):
+    from memebot.types import TradeDecision
+
+    monkeypatch.setattr(main, "plan_entry", lambda s: (True, "ok", 0.1, 1000, 10))
+    monkeypatch.setattr(main, "decide", lambda *a, **k: TradeDecision(action="buy", reason="t"))
+    sig = make_signal()
+    main.handle_signal(sig, mode="paper")
+
+    (pos,) = store.get_store(tmp_path).list_open()
+    assert get_attribution().record_close(
+        pos["id"], {"ts_close": pos["ts_open"] + 5, "entry_base": 0.1, "pnl_base": 0.05}
+    )
+    assert get_attribution().stats("caller", "Tester").n == 1
+
+
+def test_pipeline_stops_at_max_signals_with_parallel_consumers(monkeypatch):
+    import asyncio
+    import itertools
+    from memebot.ingest.bus import SignalBus
+
+    handled = []
+    monkeypatch.setattr(main.settings, "enable_mock", True)
+    monkeypatch.setattr(main.settings, "enable_telegram", False)
+    monkeypatch.setattr(main.settings, "enable_discord", False)
+    monkeypatch.setattr(main, "stream_mock_signals", lambda: (make_signal() for _ in itertools.count()))
+    monkeypatch.setattr(main, "handle_signal", lambda sig, debug, mode: handled.append(sig))
+
+    async def fast(stream, bus, pace_sec=0.2):
+        for sig in stream:
+            await bus.publish(sig)
+            await asyncio.sleep(0)
+
+    monkeypatch.setattr(main, "_iter_sync_stream", fast)
+    bus = SignalBus(maxsize=8, consumers=4)
+    asyncio.run(asyncio.wait_for(main._run_pipeline("simulate", False, 25, bus=bus), 10))
+    assert len(handled) >= 25
@@ -0,0 +1,92 @@
+import time
+import pytest
+from memebot import metrics
+from memebot.types import SocialSignal
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(monkeypatch, tmp_path):
+    # Gauges registered by other modules (open positions) sample the data dir
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    was = metrics.enabled()
+    metrics.set_enabled(True)
+    metrics.reset()
+    yield
+    metrics.set_enabled(was)
+    metrics.reset()
+
+
+def test_histogram_quantiles_within_bucket_resolution():
+    h = metrics.Histogram()
+    for ms in range(1, 101):
+        h.observe(float(ms))
+    s = h.summary()
+    assert s["count"] == 100 and s["max_ms"] == 100.0
+    assert s["mean_ms"] == pytest.approx(50.5)
+    # Buckets are 2**(1/4) apart, so quantiles are within ~19% above the true value
+    for key, true in (("p50_ms", 50), ("p95_ms", 95), ("p99_ms", 99)):
+        assert true <= s[key] <= true * 1.2
+
+
+def test_span_and_receipt_timing():
+    sig = SocialSignal(platform="telegram", source="g")
+    metrics.mark_received(sig)
+    with metrics.span("decide"):
+        time.sleep(0.002)
+    metrics.observe_since("receipt_to_submit", sig)
+    snap = metrics.snapshot()
+    assert snap["decide"]["count"] == 1 and snap["decide"]["max_ms"] >= 2.0
+    assert snap["receipt_to_submit"]["max_ms"] >= snap["decide"]["max_ms"]
+
+
+def test_disabled_records_nothing():
+    metrics.set_enabled(False)
+    sig = SocialSignal(platform="telegram", source="g")
+    metrics.mark_received(sig)
+    with metrics.span("decide"):
+        pass
+    metrics.observe("quote", 1.0)
+    metrics.observe_since("receipt_to_submit", sig)
+    assert metrics.snapshot() == {}
+
+
+def test_prometheus_text():
+    metrics.observe("quote", 3.0)
+    text = metrics.prometheus_text()
+    assert 'memebot_stage_latency_ms{stage="quote",quantile="0.99"}' in text
+    assert 'memebot_stage_latency_ms_count{stage="quote"} 1' in text
+
+
+def test_counter_sums_per_thread_cells():
+    import threading
+
+    c = metrics.counter("memebot_test_total", "test", ("platform",))
+
+    def work():
+        for _ in range(1000):
+            c.inc("telegram")
+        c.inc("discord", n=2)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert c.values() == {("telegram",): 4000, ("discord",): 8}
+    assert 'memebot_test_total{platform="telegram"} 4000' in metrics.prometheus_text()
+
+
+def test_gauges_sampled_at_scrape_and_errors_skipped():
+    depth = [3]
+    metrics.gauge("memebot_test_depth", "test", lambda: depth[0], queue="a")
+    metrics.gauge("memebot_test_depth", "test", lambda: 1 / 0, queue="broken")
+    depth[0] = 5
+    text = metrics.prometheus_text()
+    assert 'memebot_test_depth{queue="a"} 5' in text
+    assert 'queue="broken"' not in text
+    assert metrics.gauges_snapshot()["memebot_test_depth"] == {"a": 5.0, "broken": None}
+
+
+def test_mark_received_counts_platform():
+    metrics.mark_received(SocialSignal(platform="discord", source="c"))
+    assert metrics.SIGNALS_RECEIVED.values() == {("discord",): 1}
@@ -4,6 +4,11 @@ import time
 from memebot import server
 
 
+@pytest.fixture(autouse=True)
+def fresh_webhook_queue(monkeypatch):
+    monkeypatch.setattr(server, "webhook_queue", server.WebhookQueue(server.process_signals))
+
+
 def test_auth_ok_with_and_without_secret(monkeypatch):
     # No secret set → always True
     monkeypatch.setattr(server.settings, "helius_webhook_secret", "")
@@ -70,6 +75,7 @@ async def test_helius_webhook_authorized_and_accepts(monkeypatch):
             headers={"x-helius-signature": "secret123"},
             json=payload,
         )
+        await server.webhook_queue.join()
 
     assert resp.status_code == 200
     body = resp.json()
@@ -99,6 +105,7 @@ async def test_helius_webhook_with_list_payload(monkeypatch):
     transport = httpx.ASGITransport(app=server.app)
     async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
         resp = await ac.post("/webhooks/helius", json=payload)
+        await server.webhook_queue.join()
 
     assert resp.status_code == 200
     body = resp.json()
@@ -127,7 +134,137 @@ async def test_helius_webhook_with_non_dict_note(monkeypatch):
     transport = httpx.ASGITransport(app=server.app)
     async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
         resp = await ac.post("/webhooks/helius", json=payload)
+        await server.webhook_queue.join()
 
     assert resp.status_code == 200
     assert resp.json()["accepted"] == 1
-    assert called["count"] == 1
\ No newline at end of file
+    assert called["count"] == 1
+
+@pytest.mark.asyncio
+async def test_helius_webhook_returns_before_processing_and_dedupes(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(server.settings, "helius_webhook_secret", "")
+    release = threading.Event()
+    called = {"count": 0}
+
+    def slow_handle_signal(sig, debug=False):
+        release.wait(5)
+        called["count"] += 1
+
+    monkeypatch.setattr(server, "handle_signal", slow_handle_signal)
+    payload = {"events": {"token": [{"mint": "mintA", "rawTokenAmount": {"tokenAmount": "5"}}]}}
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        first = await ac.post("/webhooks/helius", json=payload)
+        again = await ac.post("/webhooks/helius", json=payload)
+        assert called["count"] == 0  # acked while the worker is still busy
+        release.set()
+        await server.webhook_queue.join()
+
+    assert first.json()["duplicate"] is False
+    assert again.json()["duplicate"] is True
+    assert again.json()["delivery_id"] == first.json()["delivery_id"]
+    assert called["count"] == 1
+    assert server.webhook_queue.stats_dict()["duplicates"] == 1
+
+
+@pytest.mark.asyncio
+async def test_helius_webhook_queue_full_returns_503(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(server.settings, "helius_webhook_secret", "")
+    release = threading.Event()
+    monkeypatch.setattr(
+        server,
+        "webhook_queue",
+        server.WebhookQueue(lambda sigs: release.wait(5), maxsize=1, workers=1),
+    )
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        codes = [
+            (await ac.post("/webhooks/helius", json={"n": i})).status_code for i in range(3)
+        ]
+        release.set()
+        await server.webhook_queue.join()
+    assert codes == [200, 503, 503] or codes == [200, 200, 503]
+    assert server.webhook_queue.stats.rejected >= 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_stage_latency(tmp_path, monkeypatch):
+    from memebot import metrics
+
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    metrics.set_enabled(True)
+    metrics.reset()
+    metrics.observe("decide", 1.5)
+    metrics.SIGNALS_DROPPED.inc("low_confidence")
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        text = await ac.get("/metrics")
+        data = (await ac.get("/metrics", params={"format": "json"})).json()
+    assert text.status_code == 200
+    assert 'stage="decide"' in text.text
+    assert data["stages"]["decide"]["count"] == 1
+    assert 'memebot_signals_dropped_total{reason="low_confidence"} 1' in text.text
+    assert data["counters"]["memebot_signals_dropped_total"] == {"low_confidence": 1}
+    assert "webhook_server" in data["gauges"]["memebot_queue_depth"]
+    assert "memebot_open_positions" in data["gauges"]
+    assert "depth" in data["webhook"]
+    metrics.reset()
+
+
+@pytest.mark.asyncio
+async def test_pnl_endpoint(tmp_path, monkeypatch):
+    from memebot.exec import pnl
+
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    now = time.time()
+    (tmp_path / "positions_closed.csv").write_text(
+        "ts_close,quote,exit_base,pnl_base\n"
+        f"{now},MintA,1.5,0.5\n"
+        f"{now - 10 * 86400},MintB,0.2,-0.8\n"
+    )
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        all_ = (await ac.get("/pnl")).json()
+        today = (await ac.get("/pnl", params={"since": "today", "days": "true"})).json()
+        bad = await ac.get("/pnl", params={"since": "yesterday-ish"})
+    assert all_["trades"] == 2 and all_["gross"] == pytest.approx(-0.3)
+    assert today["trades"] == 1 and today["tokens"] == {"MintA": {"trades": 1, "gross": 0.5}}
+    assert len(today["days"]) == 1
+    assert bad.status_code == 400
+    pnl.reset_pnl_aggregates()
+
+
+@pytest.mark.asyncio
+async def test_webhook_duplicates_counted_and_not_received(tmp_path, monkeypatch):
+    from memebot import metrics
+    from memebot.ingest import seen
+
+    # Scraping samples the open-positions gauge, which opens the store
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(server.settings, "helius_webhook_secret", "")
+    monkeypatch.delenv("WEBHOOK_SEEN_DB", raising=False)
+    monkeypatch.setattr(server, "handle_signal", lambda sig, debug=False: None)
+    seen.reset_seen_txs()
+    metrics.reset()
+    token = {"events": {"token": [{"mint": "mintD", "rawTokenAmount": {"tokenAmount": "5"}}]}}
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        await ac.post("/webhooks/helius", json={"signature": "tx1", **token})
+        await ac.post("/webhooks/helius", json={"signature": "tx1", **token})  # same delivery
+        await ac.post("/webhooks/helius", json={"signature": "tx1", "retry": 1, **token})
+        await server.webhook_queue.join()
+
+    dup = metrics.counters_snapshot()["memebot_webhook_duplicates_total"]
+    assert dup == {"delivery": 1, "tx": 1}
+    assert sum(metrics.SIGNALS_RECEIVED.values().values()) == 1
+    assert 'memebot_webhook_duplicates_total{kind="tx"} 1' in metrics.prometheus_text()
+    seen.reset_seen_txs()
+    metrics.reset()
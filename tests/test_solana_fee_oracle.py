@@ -0,0 +1,135 @@
+import threading
+
+import pytest
+
+from memebot.solana import fee_oracle
+from memebot.solana.fee_oracle import FeeOracle, rpc_fetch, urgency_for_exit
+
+
+def _fees(n=100):
+    # micro-lamports per CU: 1000, 2000, ... per slot
+    return [(slot, slot * 1000) for slot in range(1, n + 1)]
+
+
+def test_percentiles_over_window():
+    o = FeeOracle(lambda: _fees(), compute_units=1_000_000)
+    assert o.percentile(0) == 1000
+    assert o.percentile(50) == 51_000
+    assert o.percentile(100) == 100_000
+    # micro-lamports/CU * CU / 1e6 -> lamports
+    assert o.fee_lamports("exit") == 75_000
+
+
+def test_urgency_and_confidence_ordering():
+    o = FeeOracle(lambda: _fees(), compute_units=1_000_000)
+    low = o.fee_lamports("entry", confidence=0.5)
+    high = o.fee_lamports("entry", confidence=1.0)
+    stop = o.fee_lamports("stop_loss")
+    assert low == o.fee_lamports("entry") == 51_000
+    assert high == 90_000
+    assert stop == int(95_000 * 1.5)
+    assert low < high < stop
+
+
+def test_fee_is_clamped():
+    o = FeeOracle(lambda: _fees(), compute_units=1_000_000, min_lamports=60_000, max_lamports=80_000)
+    assert o.fee_lamports("entry", 0.5) == 60_000
+    assert o.fee_lamports("stop_loss") == 80_000
+
+
+def test_rolling_window_keeps_latest_slots():
+    batches = [[(1, 10), (2, 20)], [(2, 20), (3, 1_000), (4, 2_000)]]
+    o = FeeOracle(lambda: batches.pop(0), window=2)
+    assert o.refresh() and o.refresh()
+    assert o._sorted == [1_000, 2_000]
+
+
+def test_rpc_failure_keeps_last_window_and_falls_back_to_floor():
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        raise RuntimeError("rpc down")
+
+    o = FeeOracle(fetch, min_lamports=5_000, ttl_sec=60)
+    assert o.fee_lamports("stop_loss") == 5_000
+    assert o.fee_lamports("stop_loss") == 5_000
+    assert len(calls) == 1  # failure backs off until the TTL
+
+
+def test_stale_cache_served_while_refreshing_in_background(monkeypatch):
+    gate = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) > 1:
+            gate.wait(1.0)
+            return [(1000, 999_000)]
+        return _fees()
+
+    clock = [100.0]
+    monkeypatch.setattr(fee_oracle.time, "monotonic", lambda: clock[0])
+    o = FeeOracle(fetch, ttl_sec=1.0, compute_units=1_000_000)
+    assert o.percentile(100) == 100_000
+    clock[0] += 5
+    assert o.percentile(100) == 100_000  # stale value, refresh started
+    assert o.percentile(100) == 100_000  # no second refresh while one runs
+    gate.set()
+    for t in threading.enumerate():
+        if t.name == "fee-oracle":
+            t.join(1.0)
+    assert len(calls) == 2
+    assert o.percentile(100) == 999_000
+
+
+def test_concurrent_first_lookups_share_one_fetch():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(2.0)
+        return _fees()
+
+    o = FeeOracle(fetch, compute_units=1_000_000)
+    results = []
+    first = threading.Thread(target=lambda: results.append(o.percentile(100)))
+    first.start()
+    assert started.wait(1.0)
+    others = [threading.Thread(target=lambda: results.append(o.percentile(100))) for _ in range(8)]
+    for t in others:
+        t.start()
+    release.set()
+    for t in [first] + others:
+        t.join(2.0)
+    assert len(calls) == 1
+    assert results == [100_000] * 9
+
+
+def test_rpc_fetch_parses_recent_fees(monkeypatch):
+    class Resp:
+        status_code = 200
+
+        def json(self):
+            return {"result": [{"slot": 7, "prioritizationFee": 1500}]}
+
+    seen = {}
+
+    def post(url, json=None, **k):
+        seen["url"], seen["method"] = url, json["method"]
+        return Resp()
+
+    monkeypatch.setattr(fee_oracle.http_client, "post", post)
+    assert rpc_fetch("http://stub")() == [(7, 1500)]
+    assert seen == {"url": "http://stub", "method": "getRecentPrioritizationFees"}
+
+
+@pytest.mark.parametrize(
+    "reason,tier",
+    [("stop_loss", "stop_loss"), ("take_profit", "exit"), ("trailing_exit", "exit")],
+)
+def test_urgency_for_exit(reason, tier):
+    assert urgency_for_exit(reason) == tier
@@ -0,0 +1,60 @@
+import httpx
+import pytest
+from memebot.solana import http_client
+
+
+def test_session_is_shared_and_pooled(monkeypatch):
+    monkeypatch.setenv("JUPITER_MAX_CONN_PER_HOST", "7")
+    http_client.close()
+    s1 = http_client.get_session()
+    s2 = http_client.get_session()
+    assert s1 is s2
+
+    adapter = s1.get_adapter("https://quote-api.jup.ag/v6/quote")
+    assert adapter._pool_maxsize == 7
+    retry = adapter.max_retries
+    assert 429 in retry.status_forcelist and 503 in retry.status_forcelist
+    assert retry.backoff_jitter > 0
+    http_client.close()
+
+
+def test_sync_get_uses_session(requests_mock):
+    requests_mock.get("https://example.test/q", json={"x": 1})
+    r = http_client.get("https://example.test/q", timeout=1)
+    assert r.json() == {"x": 1}
+
+
+@pytest.mark.asyncio
+async def test_async_retries_on_429(monkeypatch):
+    monkeypatch.setenv("JUPITER_HTTP_RETRIES", "2")
+    monkeypatch.setenv("JUPITER_HTTP_BACKOFF_SEC", "0")
+    calls = {"n": 0}
+
+    def handler(request):
+        calls["n"] += 1
+        if calls["n"] < 3:
+            return httpx.Response(429)
+        return httpx.Response(200, json={"ok": True})
+
+    monkeypatch.setattr(
+        http_client,
+        "_async_client",
+        httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    r = await http_client.aget("https://example.test/q")
+    assert r.status_code == 200 and calls["n"] == 3
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_async_gives_up_after_retries(monkeypatch):
+    monkeypatch.setenv("JUPITER_HTTP_RETRIES", "1")
+    monkeypatch.setenv("JUPITER_HTTP_BACKOFF_SEC", "0")
+    monkeypatch.setattr(
+        http_client,
+        "_async_client",
+        httpx.AsyncClient(transport=httpx.MockTransport(lambda req: httpx.Response(502))),
+    )
+    r = await http_client.apost("https://example.test/swap", json={})
+    assert r.status_code == 502
+    await http_client.aclose()
@@ -65,4 +65,22 @@ def test_estimate_price_impact_solana_error(monkeypatch):
     monkeypatch.setattr(jupiter, "get_quote", lambda *a, **k: {"ok": False, "error": "boom"})
     q = jupiter.estimate_price_impact_solana("in", "out", 10)
     assert not q["ok"]
-    assert q["error"] == "boom"
\ No newline at end of file
+    assert q["error"] == "boom"
+
+@pytest.mark.asyncio
+async def test_get_quote_async(monkeypatch):
+    """Async entry point shares parsing with the sync path."""
+    monkeypatch.setattr(jupiter.settings, "mock_jupiter", False)
+
+    class Resp:
+        status_code = 200
+        text = ""
+        def json(self):
+            return {"data": [{"outAmount": "42", "priceImpactPct": 0.001}]}
+
+    async def fake_aget(url, **kw):
+        return Resp()
+
+    monkeypatch.setattr(jupiter.http_client, "aget", fake_aget)
+    q = await jupiter.estimate_price_impact_solana_async("in", "out", 10)
+    assert q["ok"] and q["out_amount"] == 42 and q["impact_bps"] == 10
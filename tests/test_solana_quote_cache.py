@@ -0,0 +1,126 @@
+import time
+import asyncio
+import threading
+import pytest
+from memebot.solana import jupiter
+from memebot.solana.quote_cache import QuoteCache, amount_bucket
+
+
+def test_amount_bucket():
+    assert amount_bucket(123456789, 4) == 123400000
+    assert amount_bucket(999, 4) == 999
+    assert amount_bucket(123456789, 0) == 123456789
+
+
+def test_hit_miss_ttl_and_scaling():
+    cache = QuoteCache(ttl_sec=0.05, max_entries=8, sig_digits=4)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"ok": True, "out_amount": 1000}
+
+    k = cache.key("A", "B", 1_000_000, 300)
+    assert cache.get_or_fetch(k, 1_000_000, fetch)["out_amount"] == 1000
+    # Same bucket, slightly larger amount -> scaled hit
+    k2 = cache.key("A", "B", 1_000_050, 300)
+    assert k2 == k
+    assert cache.get_or_fetch(k2, 1_000_050, fetch)["out_amount"] == 1000
+    assert cache.get_or_fetch(k, 2_000_000, fetch)["out_amount"] == 2000
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+    time.sleep(0.06)
+    cache.get_or_fetch(k, 1_000_000, fetch)
+    assert len(calls) == 2
+
+
+def test_failures_not_cached_and_lru_eviction():
+    cache = QuoteCache(ttl_sec=10, max_entries=2)
+    fail = lambda: {"ok": False, "error": "no_route"}
+    k = cache.key("A", "B", 1, 300)
+    cache.get_or_fetch(k, 1, fail)
+    assert cache.stats()["entries"] == 0
+
+    for mint in ("X", "Y", "Z"):
+        cache.get_or_fetch(cache.key("A", mint, 1, 300), 1, lambda: {"ok": True, "out_amount": 1})
+    assert cache.stats()["entries"] == 2 and cache.evictions == 1
+
+
+def test_single_flight_coalesces_threads():
+    cache = QuoteCache(ttl_sec=10)
+    calls = []
+    gate = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        gate.wait(1)
+        return {"ok": True, "out_amount": 5}
+
+    k = cache.key("A", "B", 100, 300)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_fetch(k, 100, fetch)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert [r["out_amount"] for r in results] == [5] * 5
+    assert cache.coalesced == 4
+
+
+@pytest.mark.asyncio
+async def test_async_single_flight():
+    cache = QuoteCache(ttl_sec=10)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"ok": True, "out_amount": 7}
+
+    k = cache.key("A", "B", 100, 300)
+    res = await asyncio.gather(*[cache.aget_or_fetch(k, 100, fetch) for _ in range(4)])
+    assert len(calls) == 1 and all(r["out_amount"] == 7 for r in res)
+
+
+def test_get_quote_uses_cache(monkeypatch, requests_mock):
+    monkeypatch.setattr(jupiter.settings, "mock_jupiter", False)
+    monkeypatch.setattr(jupiter, "quote_cache", QuoteCache(ttl_sec=10))
+    url = f"{jupiter.settings.jupiter_base}/quote"
+    m = requests_mock.get(url, json={"data": [{"outAmount": "9", "priceImpactPct": 0}]})
+
+    jupiter.get_quote("CacheIn", "CacheOut", 500)
+    jupiter.get_quote("CacheIn", "CacheOut", 500)
+    assert m.call_count == 1
+    # Estimates are bucketed, so they never share entries with executable quotes
+    jupiter.estimate_price_impact_solana("CacheIn", "CacheOut", 500)
+    jupiter.estimate_price_impact_solana("CacheIn", "CacheOut", 500)
+    assert m.call_count == 2
+    assert jupiter.quote_cache.stats()["hits"] == 2
+
+
+def test_exact_keys_never_serve_another_amount_and_copies_are_deep():
+    cache = QuoteCache(ttl_sec=60, max_entries=8, sig_digits=4)
+    calls = []
+
+    def fetch(amount):
+        def _f():
+            calls.append(amount)
+            return {"ok": True, "out_amount": amount, "route": {"inAmount": str(amount)}}
+
+        return _f
+
+    a = cache.get_or_fetch(cache.key("A", "B", 1_000_000, 300, bucket=False), 1_000_000, fetch(1_000_000))
+    a["route"]["inAmount"] = "mutated"
+    b = cache.get_or_fetch(cache.key("A", "B", 1_000_050, 300, bucket=False), 1_000_050, fetch(1_000_050))
+    assert calls == [1_000_000, 1_000_050]
+    assert b["route"]["inAmount"] == "1000050"
+
+    again = cache.get_or_fetch(cache.key("A", "B", 1_000_000, 300, bucket=False), 1_000_000, fetch(0))
+    assert again["route"]["inAmount"] == "1000000" and len(calls) == 2
@@ -0,0 +1,168 @@
+import base64
+import threading
+import time
+
+from memebot.solana import sender as sender_mod
+from memebot.solana.sender import TxSender, endpoints_from_env, sign_tx
+
+
+def _confirmed(url):
+    return {"confirmationStatus": "confirmed", "err": None, "slot": 1}
+
+
+class FakeClient:
+    def __init__(self, url, behaviour, status=_confirmed):
+        self.url = url
+        self.behaviour = behaviour
+        self.status = status
+        self.sent = []
+        self.polls = 0
+
+    def send_raw_transaction(self, raw):
+        self.sent.append(raw)
+        return self.behaviour(self.url)
+
+    def get_signature_statuses(self, sigs):
+        self.polls += 1
+        return {"result": {"value": [self.status(self.url)]}}
+
+
+def _sender(behaviour, urls=("a", "b", "c"), timeout=2.0, status=_confirmed, **kw):
+    clients = {}
+
+    def factory(url):
+        clients[url] = FakeClient(url, behaviour, status)
+        return clients[url]
+
+    kw.setdefault("poll_sec", 0.01)
+    return TxSender("kp", list(urls), factory, timeout_sec=timeout, **kw), clients
+
+
+def test_endpoints_from_env(monkeypatch):
+    monkeypatch.setenv("SOLANA_SEND_RPCS", " https://a , https://b,")
+    assert endpoints_from_env("https://default") == ["https://a", "https://b"]
+    monkeypatch.delenv("SOLANA_SEND_RPCS")
+    assert endpoints_from_env("https://default") == ["https://default"]
+    assert endpoints_from_env(None) == []
+
+
+def test_first_acceptance_wins_and_same_bytes_everywhere():
+    slow = threading.Event()
+
+    def behaviour(url):
+        if url != "b":
+            slow.wait(1.0)
+        return {"result": "sig-1"}
+
+    s, clients = _sender(behaviour)
+    t0 = time.perf_counter()
+    res = s.send(base64.b64encode(b"tx").decode())
+    assert time.perf_counter() - t0 < 0.5
+    assert res["ok"] and res["signature"] == "sig-1" and res["endpoint"] == "b"
+    slow.set()
+    s.close()
+    assert all(c.sent == [b"tx"] for c in clients.values())
+
+
+def test_failures_fall_through_to_a_working_endpoint():
+    def behaviour(url):
+        if url == "c":
+            return "sig-c"
+        raise RuntimeError(f"{url} down")
+
+    s, _ = _sender(behaviour)
+    res = s.send_raw(b"tx")
+    assert res == {**res, "ok": True, "signature": "sig-c", "endpoint": "c"}
+
+
+def test_all_endpoints_failing_reports_each_error():
+    def behaviour(url):
+        raise RuntimeError("down")
+
+    s, _ = _sender(behaviour, urls=("a", "b"))
+    res = s.send_raw(b"tx")
+    assert not res["ok"]
+    assert "a: down" in res["error"] and "b: down" in res["error"]
+
+
+def test_timeout_when_no_endpoint_answers():
+    gate = threading.Event()
+
+    def behaviour(url):
+        gate.wait(1.0)
+        return "late"
+
+    s, _ = _sender(behaviour, urls=("a",), timeout=0.05)
+    res = s.send_raw(b"tx")
+    gate.set()
+    assert not res["ok"] and "timed out" in res["error"]
+
+
+def test_clients_are_built_once_per_endpoint():
+    s, clients = _sender(lambda url: "sig", urls=("a", "b"))
+    for _ in range(3):
+        assert s.send_raw(b"tx")["ok"]
+    assert sorted(clients) == ["a", "b"]
+    assert sum(len(c.sent) for c in clients.values()) == 6
+
+
+def test_first_confirmation_wins_on_any_endpoint():
+    def status(url):
+        if url == "c":
+            return {"confirmationStatus": "confirmed", "err": None, "slot": 42}
+        return None  # a and b never saw it
+
+    s, _ = _sender(lambda url: "sig", status=status)
+    res = s.send_raw(b"tx")
+    assert res["ok"] and res["submitted"] and res["confirmed"]
+    assert res["confirmed_by"] == "c" and res["slot"] == 42
+
+
+def test_processed_is_not_enough_and_polling_continues():
+    seen = []
+
+    def status(url):
+        seen.append(url)
+        level = "confirmed" if len(seen) > 4 else "processed"
+        return {"confirmationStatus": level, "err": None, "slot": 1}
+
+    s, clients = _sender(lambda url: "sig", urls=("a",), status=status)
+    res = s.send_raw(b"tx")
+    assert res["ok"] and res["confirmation_status"] == "confirmed"
+    assert clients["a"].polls == 5
+
+
+def test_onchain_error_is_a_failed_send():
+    def status(url):
+        return {"confirmationStatus": "processed", "err": {"InstructionError": [0, "x"]}}
+
+    s, _ = _sender(lambda url: "sig", urls=("a",), status=status)
+    res = s.send_raw(b"tx")
+    assert not res["ok"] and res["submitted"] and not res["confirmed"]
+    assert res["error"].startswith("tx_failed")
+
+
+def test_confirm_timeout_keeps_signature():
+    s, _ = _sender(lambda url: "sig", urls=("a", "b"), status=lambda url: None,
+                   confirm_timeout_sec=0.05)
+    res = s.send_raw(b"tx")
+    assert not res["ok"] and res["error"] == "not_confirmed"
+    assert res["submitted"] and res["signature"] == "sig"
+
+
+def test_confirmation_can_be_disabled():
+    s, clients = _sender(lambda url: "sig", urls=("a",), confirm_timeout_sec=0)
+    res = s.send_raw(b"tx")
+    assert res["ok"] and res["submitted"] and not res["confirmed"]
+    assert clients["a"].polls == 0
+
+
+def test_no_endpoints():
+    s = TxSender("kp", [], lambda url: None)
+    assert s.send_raw(b"tx") == {"ok": False, "error": "no_rpc_endpoints"}
+
+
+def test_sign_tx_passthrough_without_solders(monkeypatch):
+    monkeypatch.setattr(sender_mod, "HAVE_SOLDERS_TX", False)
+    assert sign_tx(b"raw", "kp") == b"raw"
+    assert sign_tx(b"raw", None) == b"raw"
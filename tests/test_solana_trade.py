@@ -7,6 +7,15 @@ import pytest
 import requests_mock
 
 import memebot.solana.trade as trade
+from memebot.solana.fee_oracle import FeeOracle
+
+
+@pytest.fixture(autouse=True)
+def _fresh_sender(monkeypatch):
+    monkeypatch.setattr(trade, "get_fee_oracle", lambda: FeeOracle(lambda: []))
+    trade.reset_sender()
+    yield
+    trade.reset_sender()
 
 
 def test_request_swap_tx_unit():
@@ -98,7 +107,7 @@ def test_trade_live_happy(monkeypatch):
     monkeypatch.setattr(trade.settings, "force_mainnet_live", False)
     monkeypatch.setattr(trade, "_load_private_from_env_or_file", lambda: ("kp", "secret", "owner"))
     monkeypatch.setattr(trade.settings, "solana_owner", "owner123")
-    monkeypatch.setattr(trade, "request_swap_tx", lambda q, owner=None: {"ok": True, "tx_b64": "AQID"})
+    monkeypatch.setattr(trade, "request_swap_tx", lambda q, owner=None, **k: {"ok": True, "tx_b64": "AQID"})
     monkeypatch.setattr(trade, "sign_and_send", lambda tx: {"ok": True, "signature": "sig321"})
     res = trade.trade_live({"ok": True, "route": {}})
     assert res["ok"] and res["signature"] == "sig321"
@@ -287,8 +296,8 @@ def test_request_swap_tx_http_error(monkeypatch):
         text = "Internal Server Error"
         def json(self): return {}
 
-    # Force requests.post to return our dummy error response
-    monkeypatch.setattr(requests, "post", lambda *a, **k: DummyResp())
+    # Force the shared Jupiter client to return our dummy error response
+    monkeypatch.setattr(trade.http_client, "post", lambda *a, **k: DummyResp())
 
     res = trade.request_swap_tx({"route": {"foo": "bar"}}, owner="owner123")
     assert not res["ok"]
@@ -304,7 +313,7 @@ def test_request_swap_tx_malformed_response(monkeypatch):
         def json(self): 
             return {"unexpected": "field"}
 
-    monkeypatch.setattr(requests, "post", lambda *a, **k: DummyResp())
+    monkeypatch.setattr(trade.http_client, "post", lambda *a, **k: DummyResp())
 
     res = trade.request_swap_tx({"route": {"foo": "bar"}}, owner="owner123")
     assert not res["ok"]
@@ -324,6 +333,8 @@ def test_sign_and_send_success(monkeypatch):
         def __init__(self, url): pass
         def send_raw_transaction(self, raw): 
             return {"result": "sig123"}
+        def get_signature_statuses(self, sigs):
+            return {"result": {"value": [{"confirmationStatus": "confirmed", "err": None}]}}
 
     monkeypatch.setattr(trade, "Client", DummyClient)
     monkeypatch.setattr(trade, "HAVE_SOLANA", True)
@@ -338,8 +349,11 @@ def test_sign_and_send_success(monkeypatch):
         def __init__(self, url): pass
         def send_raw_transaction(self, raw):
             return "rawsig456"
+        def get_signature_statuses(self, sigs):
+            return {"result": {"value": [{"confirmationStatus": "confirmed", "err": None}]}}
 
     monkeypatch.setattr(trade, "Client", DummyClient2)
+    trade.reset_sender()
     res2 = trade.sign_and_send(tx_b64)
     assert res2["ok"]
     assert res2["signature"] == "rawsig456"
@@ -355,7 +369,7 @@ def test_trade_live_returns_failed_swap(monkeypatch):
     monkeypatch.setattr(trade.settings, "solana_owner", "owner123")
 
     # Force request_swap_tx to return a failure dict
-    monkeypatch.setattr(trade, "request_swap_tx", lambda quote, owner=None: {"ok": False, "error": "swap_failed"})
+    monkeypatch.setattr(trade, "request_swap_tx", lambda quote, owner=None, **k: {"ok": False, "error": "swap_failed"})
 
     res = trade.trade_live({"ok": True, "route": {}})
     assert res == {"ok": False, "error": "swap_failed"}
@@ -367,4 +381,71 @@ def test_request_swap_tx_missing_owner(monkeypatch):
 
     res = trade.request_swap_tx({"route": {"foo": "bar"}}, owner=None)
     assert not res["ok"]
-    assert res["error"] == "missing_owner"
\ No newline at end of file
+    assert res["error"] == "missing_owner"
+
+def test_sign_and_send_loads_keys_once(monkeypatch):
+    loads = []
+
+    def _load():
+        loads.append(1)
+        return ("kp", None, "pubkey123")
+
+    class DummyClient:
+        built = 0
+
+        def __init__(self, url):
+            DummyClient.built += 1
+
+        def send_raw_transaction(self, raw):
+            return {"result": "sig"}
+
+        def get_signature_statuses(self, sigs):
+            return {"result": {"value": [{"confirmationStatus": "confirmed", "err": None}]}}
+
+    monkeypatch.setattr(trade, "_load_private_from_env_or_file", _load)
+    monkeypatch.setattr(trade, "Client", DummyClient)
+    monkeypatch.setattr(trade, "HAVE_SOLANA", True)
+    monkeypatch.delenv("SOLANA_SEND_RPCS", raising=False)
+
+    tx_b64 = base64.b64encode(b"hi").decode()
+    for _ in range(3):
+        assert trade.sign_and_send(tx_b64)["signature"] == "sig"
+    assert len(loads) == 1
+    assert DummyClient.built == 1
+
+
+def test_request_swap_tx_sends_priority_fee(monkeypatch):
+    sent = {}
+
+    class DummyResp:
+        status_code = 200
+
+        def json(self):
+            return {"swapTransaction": "AQID"}
+
+    def _post(url, json=None, **k):
+        sent.update(json)
+        return DummyResp()
+
+    monkeypatch.setattr(trade.http_client, "post", _post)
+    assert trade.request_swap_tx({"route": {}}, owner="o", priority_fee_lamports=12345)["ok"]
+    assert sent["prioritizationFeeLamports"] == 12345
+
+
+def test_trade_live_prices_fee_by_urgency(monkeypatch):
+    oracle = FeeOracle(lambda: [(i, i * 1000) for i in range(1, 101)], compute_units=1_000_000)
+    fees = []
+    monkeypatch.setattr(trade, "get_fee_oracle", lambda: oracle)
+    monkeypatch.setattr(trade, "_allow_live_env", lambda: True)
+    monkeypatch.setattr(trade.settings, "solana_cluster", "devnet")
+    monkeypatch.setattr(trade.settings, "solana_owner", "owner123")
+    monkeypatch.setattr(
+        trade,
+        "request_swap_tx",
+        lambda q, owner=None, priority_fee_lamports=0: fees.append(priority_fee_lamports)
+        or {"ok": False, "error": "stop"},
+    )
+    trade.trade_live({"route": {}}, confidence=0.5)
+    trade.trade_live({"route": {}}, confidence=1.0)
+    trade.trade_live({"route": {}}, urgency="stop_loss")
+    assert fees[0] < fees[1] < fees[2]
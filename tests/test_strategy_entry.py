@@ -2,9 +2,16 @@ import os, importlib, time
 from memebot.strategy.entry import plan_entry
 from memebot.types import SocialSignal
 from memebot.exec import pnl
+from memebot.strategy import sizing
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def fresh_policy():
+    yield
+    sizing.reset_policy()
+
+
 def test_sizing_by_conf_and_caller(tmp_path, monkeypatch):
     monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
     monkeypatch.setenv("NETWORK", "solana")
@@ -13,6 +20,7 @@ def test_sizing_by_conf_and_caller(tmp_path, monkeypatch):
     monkeypatch.setenv("CALLER_ALLOWLIST", "alpha:2.0,beta:1.0")
     import memebot.strategy.entry as entry
     importlib.reload(entry)
+    sizing.reload_policy()
     monkeypatch.setattr(entry, "can_enter_solana", lambda mint, sz: (True, "ok", 1000, 300))
 
     sig = SocialSignal(
@@ -34,6 +42,7 @@ def test_daily_cap_blocks(tmp_path, monkeypatch):
     monkeypatch.setenv("DAILY_LOSS_CAP_SOL", "0.5")
     import memebot.strategy.entry as entry
     importlib.reload(entry)
+    sizing.reload_policy()
 
     importlib.reload(pnl)
     path = pnl._data_dir() / "positions_closed.csv"
@@ -86,6 +95,7 @@ def test_caller_not_allowed(monkeypatch):
     monkeypatch.setenv("CALLER_ALLOWLIST", "bob:1.0")
     monkeypatch.setenv("BASE_SIZE_SOL", "0.1")
     importlib.reload(entry)
+    sizing.reload_policy()
 
     # Patch can_enter_solana to never be called
     monkeypatch.setattr(entry, "can_enter_solana", lambda *a, **k: (True, "ok", 0, 0))
@@ -106,6 +116,7 @@ def test_no_contract(monkeypatch):
     monkeypatch.setenv("CALLER_ALLOWLIST", "")
     monkeypatch.setenv("BASE_SIZE_SOL", "0.1")
     importlib.reload(entry)
+    sizing.reload_policy()
 
     # Patch can_enter_solana so it would fail if called
     monkeypatch.setattr(entry, "can_enter_solana", lambda *a, **k: (_ for _ in ()).throw(Exception("should not be called")))
@@ -119,4 +130,58 @@ def test_no_contract(monkeypatch):
         caller="any",
     )
     ok, reason, *_ = entry.plan_entry(sig)
-    assert not ok and reason == "no_contract"
\ No newline at end of file
+    assert not ok and reason == "no_contract"
+
+def test_adaptive_caller_sizing_unless_allowlisted(monkeypatch):
+    import memebot.strategy.entry as entry
+
+    class FixedSizer:
+        def multiplier(self, caller):
+            return {"alpha": 1.5}.get(caller, 1.0)
+
+    monkeypatch.setenv("BASE_SIZE_SOL", "0.1")
+    monkeypatch.setenv("SIZE_BY_CONF", "")
+    monkeypatch.setenv("CALLER_ALLOWLIST", "")
+    monkeypatch.setattr(entry, "get_caller_sizer", lambda policy: FixedSizer())
+    sizing.reload_policy()
+    can_enter = lambda mint, sz: (True, "ok", 1000, 30)
+    sig = SocialSignal(
+        platform="t", source="t", contract="Mint", confidence=0.5, caller="Alpha"
+    )
+    assert entry.plan_entry(sig, can_enter=can_enter)[2] == pytest.approx(0.15)
+
+    # A static allowlist multiplier wins over the adaptive one
+    monkeypatch.setenv("CALLER_ALLOWLIST", "alpha:3")
+    sizing.reload_policy()
+    assert entry.plan_entry(sig, can_enter=can_enter)[2] == pytest.approx(0.3)
+
+
+def test_allowlist_entries_do_not_disable_adaptive_sizing(monkeypatch, tmp_path):
+    import memebot.strategy.entry as entry
+
+    class FixedSizer:
+        def multiplier(self, caller):
+            return {"carol": 0.5}.get(caller, 1.0)
+
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("BASE_SIZE_SOL", "0.1")
+    monkeypatch.setenv("SIZE_BY_CONF", "")
+    monkeypatch.setenv("CALLER_ALLOWLIST", "alpha:3")
+    monkeypatch.setenv("ADAPTIVE_SIZING", "shrink")
+    monkeypatch.delenv("CALLER_ALLOWLIST_ONLY", raising=False)
+    monkeypatch.setattr(entry, "get_caller_sizer", lambda policy: FixedSizer())
+    sizing.reload_policy()
+    can_enter = lambda mint, sz: (True, "ok", 1000, 30)
+
+    def size(caller):
+        sig = SocialSignal(platform="t", source="t", contract="Mint", confidence=0.5, caller=caller)
+        return entry.plan_entry(sig, can_enter=can_enter)[:3]
+
+    assert size("alpha")[2] == pytest.approx(0.3)
+    assert size("carol")[2] == pytest.approx(0.05)
+
+    # The explicit switch restores allowlist-only entry
+    monkeypatch.setenv("CALLER_ALLOWLIST_ONLY", "1")
+    sizing.reload_policy()
+    assert size("alpha")[2] == pytest.approx(0.3)
+    assert size("carol")[:2] == (False, "caller_not_allowed")
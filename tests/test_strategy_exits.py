@@ -1,8 +1,20 @@
 import time
-from memebot.exec.paper import PaperTrade, append_trade, reset_trades
+import pytest
+from memebot.exec.paper import PaperTrade, append_trade, close_journal, reset_trades
+from memebot.exec import store
 from memebot.strategy.exits import ExitManager
 from memebot.strategy import exits
 
+
+@pytest.fixture(autouse=True)
+def isolated_data_dir(monkeypatch, tmp_path):
+    """Journal and positions go to a throwaway data dir, not the repo root."""
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    store.reset_stores()
+    yield
+    close_journal()
+    store.reset_stores()
+
 def make_trade(side="buy", base="SOL", quote="TokenX", size=0.05, out=100.0):
     return PaperTrade(
         ts=time.time(),
@@ -1,4 +1,5 @@
 import time
+import pytest
 from memebot.strategy.fusion import Signal, SignalMemory
 
 
@@ -95,4 +96,62 @@ def test_recent_returns_pruned_signals(tmp_path):
     recents = mem.recent()
     # Only the fresh one should be there
     assert new in recents
-    assert all(s.ts >= time.time() - 1 for s in recents)
\ No newline at end of file
+    assert all(s.ts >= time.time() - 1 for s in recents)
+
+def _reference_scores(events, decay, clock):
+    """The original linear-scan SignalMemory, for equivalence checks."""
+    stored, scores = [], []
+    for now, sig in events:
+        clock["now"] = now
+        stored.append(sig)
+        stored = [s for s in stored if s.ts >= now - decay]
+        score = sig.confidence if sig.confidence and sig.confidence > 0 else 0.5
+        for s in stored:
+            if s is sig:
+                continue
+            if s.contract and s.contract == sig.contract and now - s.ts < decay:
+                score += 0.5
+        age = now - sig.ts
+        if decay > 0 and age > 0:
+            score *= max(0.0, 1.0 - age / decay)
+        scores.append(score)
+    return scores
+
+
+def test_indexed_memory_matches_linear_scan(monkeypatch):
+    import random
+    from memebot.strategy import fusion
+
+    rng = random.Random(7)
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(fusion.time, "time", lambda: clock["now"])
+
+    events, now = [], 1000.0
+    for _ in range(400):
+        now += rng.uniform(0, 3)
+        ts = now - rng.choice([0, 0, 0, rng.uniform(0, 40)])  # some late arrivals
+        contract = rng.choice(["a", "b", "c", None])
+        events.append((now, Signal(contract=contract, ts=ts, confidence=rng.random())))
+
+    expected = _reference_scores(
+        [(n, Signal(contract=s.contract, ts=s.ts, confidence=s.confidence)) for n, s in events],
+        30,
+        clock,
+    )
+    mem = SignalMemory(decay_seconds=30)
+    got = []
+    for n, s in events:
+        clock["now"] = n
+        got.append(mem.fuse(s).score)
+    # The boost is added as 0.5 * k rather than k steps, so allow rounding noise
+    assert got == pytest.approx(expected, rel=1e-12, abs=1e-12)
+
+
+def test_memory_cap_evicts_oldest():
+    mem = SignalMemory(decay_seconds=3600, max_signals=3)
+    now = time.time()
+    sigs = [Signal(contract="x", ts=now + i * 0.001) for i in range(5)]
+    for s in sigs:
+        mem.add(s)
+    assert mem.recent() == sigs[2:]
+    assert mem._by_contract == {"x": 3}
@@ -0,0 +1,175 @@
+import os
+import time
+import signal
+import pytest
+from memebot.strategy import sizing
+from memebot.strategy.sizing import SizingPolicy
+
+
+@pytest.fixture(autouse=True)
+def fresh_policy(monkeypatch):
+    for k in sizing.POLICY_KEYS + ("SIZING_POLICY_FILE",):
+        monkeypatch.delenv(k, raising=False)
+    sizing.reset_policy()
+    yield
+    sizing.reset_policy()
+
+
+def test_conf_multiplier_uses_highest_threshold_below():
+    p = SizingPolicy.from_values({"SIZE_BY_CONF": "0.9:2.0,0.7:1.0,0.8:1.5"})
+    assert p.conf_thresholds == (0.7, 0.8, 0.9)
+    assert p.conf_multiplier(0.5) == 1.0
+    assert p.conf_multiplier(0.7) == 1.0
+    assert p.conf_multiplier(0.85) == 1.5
+    assert p.conf_multiplier(0.99) == 2.0
+
+
+def test_callers_are_lowercased_and_read_only():
+    p = SizingPolicy.from_values({"CALLER_ALLOWLIST": "Alpha:2,beta:1"})
+    assert dict(p.callers) == {"alpha": 2.0, "beta": 1.0}
+    with pytest.raises(TypeError):
+        p.callers["gamma"] = 1.0  # type: ignore[index]
+
+
+def test_policy_is_cached_until_reload(monkeypatch):
+    monkeypatch.setenv("BASE_SIZE_SOL", "0.2")
+    assert sizing.get_policy().base_size == 0.2
+    monkeypatch.setenv("BASE_SIZE_SOL", "0.3")
+    assert sizing.get_policy().base_size == 0.2
+    sizing.reload_policy()
+    assert sizing.get_policy().base_size == 0.3
+
+
+def test_policy_file_overrides_env_and_reloads_on_change(tmp_path, monkeypatch):
+    f = tmp_path / "sizing.env"
+    f.write_text("CALLER_ALLOWLIST=alpha:2\nSIZE_BY_CONF=0.8:1.5\n")
+    monkeypatch.setenv("CALLER_ALLOWLIST", "beta:1")
+    monkeypatch.setenv("SIZING_POLICY_FILE", str(f))
+    monkeypatch.setenv("SIZING_POLICY_CHECK_SEC", "0")
+    assert dict(sizing.get_policy().callers) == {"alpha": 2.0}
+
+    f.write_text("CALLER_ALLOWLIST=gamma:3\n")
+    os.utime(f, (f.stat().st_mtime + 5, f.stat().st_mtime + 5))
+    p = sizing.get_policy()
+    assert dict(p.callers) == {"gamma": 3.0}
+    assert p.conf_thresholds == ()
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="no SIGHUP on this platform")
+def test_sighup_reloads_policy(monkeypatch):
+    previous = signal.getsignal(signal.SIGHUP)
+    try:
+        assert sizing.install_sighup_reload()
+        monkeypatch.setenv("DAILY_LOSS_CAP_SOL", "1.5")
+        sizing.reload_policy()
+        monkeypatch.setenv("DAILY_LOSS_CAP_SOL", "2.5")
+        os.kill(os.getpid(), signal.SIGHUP)
+        assert sizing.get_policy().daily_loss_cap == 2.5
+    finally:
+        signal.signal(signal.SIGHUP, previous)
+
+
+def _perf(n, wins, ret_sum, last_ts=0.0):
+    from memebot.exec.attribution import PerfStats
+
+    return PerfStats(n=n, weight=float(n), wins=wins, ret_sum=ret_sum, last_ts=last_ts)
+
+
+def test_caller_multipliers_shrink_toward_population():
+    table = {"good": _perf(20, 16, 4.0), "bad": _perf(20, 4, -4.0), "new": _perf(1, 1, 1.0)}
+    kelly = sizing.caller_multipliers(table, now=0.0, half_life_sec=86_400, payoff=1.0)
+    assert set(kelly) == {"good", "bad"}  # "new" is below min_n
+    assert kelly["good"] > 1.0 > kelly["bad"]
+    # 20 trades against a 10-trade prior: p = (16 + 10 * 21/41) / 30
+    p = (16 + 10 * 21 / 41) / 30
+    assert kelly["good"] == pytest.approx(1 + p - (1 - p))
+
+    shrink = sizing.caller_multipliers(table, now=0.0, half_life_sec=86_400, method="shrink")
+    mu0 = 1.0 / 41
+    assert shrink["good"] == pytest.approx(1 + (4.0 + 10 * mu0) / 30)
+    assert sizing.caller_multipliers({}, 0.0, 86_400) == {}
+
+
+def test_caller_multipliers_clamped_and_decayed():
+    table = {"hot": _perf(50, 50, 100.0), "cold": _perf(50, 0, -50.0)}
+    m = sizing.caller_multipliers(table, 0.0, 86_400, method="shrink", max_mult=1.5)
+    assert m == {"hot": 1.5, "cold": 0.25}
+    # Long after its last close "a" falls back onto the all-caller prior
+    stale = sizing.caller_multipliers(
+        {"a": _perf(10, 10, 5.0), "b": _perf(10, 0, -5.0, last_ts=1e9)},
+        now=1e9, half_life_sec=86_400, method="shrink",
+    )
+    assert stale["a"] == pytest.approx(stale["b"], abs=1e-3)
+
+
+def test_caller_sizer_serves_cached_table_and_refreshes_in_background():
+    calls = []
+
+    def table():
+        calls.append(1)
+        now = time.time()
+        return {"alpha": _perf(10, 10, 5.0, now), "beta": _perf(10, 0, -5.0, now)}
+
+    sizer = sizing.CallerSizer(table, 86_400, refresh_sec=3600, method="shrink")
+    assert sizer.multiplier("alpha") > 1.0
+    assert sizer.multiplier("unknown") == 1.0
+    assert len(calls) == 1  # built once, not per lookup
+
+    sizer.refresh_sec = 0.0
+    sizer.multiplier("alpha")
+    for _ in range(100):
+        if len(calls) == 2:
+            break
+        time.sleep(0.01)
+    assert len(calls) == 2
+
+
+def test_get_caller_sizer_follows_policy(monkeypatch, tmp_path):
+    from memebot.exec.attribution import reset_attribution
+
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    sizing.reset_caller_sizer()
+    assert sizing.get_caller_sizer() is None
+    monkeypatch.setenv("ADAPTIVE_SIZING", "kelly")
+    # Signals see the policy's config, not the live environment
+    assert sizing.get_caller_sizer() is None
+    sizing.reload_policy()
+    s = sizing.get_caller_sizer()
+    assert s is sizing.get_caller_sizer() and s.params["method"] == "kelly"
+
+    monkeypatch.setenv("ADAPTIVE_GAIN", "2")
+    sizing.reload_policy()
+    s2 = sizing.get_caller_sizer()
+    assert s2 is not s and s2.params["gain"] == 2.0
+    sizing.reset_caller_sizer()
+    reset_attribution()
+
+
+def test_bad_adaptive_config_fails_at_load(monkeypatch, tmp_path):
+    monkeypatch.setenv("ADAPTIVE_SIZING", "martingale")
+    with pytest.raises(ValueError):
+        sizing.reload_policy()
+    monkeypatch.setenv("ADAPTIVE_SIZING", "kelly")
+    monkeypatch.setenv("ADAPTIVE_MIN_MULT", "3")
+    with pytest.raises(ValueError):
+        sizing.reload_policy()
+
+    # A bad policy file keeps the previous policy instead of failing signals
+    monkeypatch.delenv("ADAPTIVE_MIN_MULT")
+    f = tmp_path / "sizing.env"
+    f.write_text("BASE_SIZE_SOL=0.2\n")
+    monkeypatch.setenv("SIZING_POLICY_FILE", str(f))
+    monkeypatch.setenv("SIZING_POLICY_CHECK_SEC", "0")
+    assert sizing.reload_policy().base_size == 0.2
+    f.write_text("BASE_SIZE_SOL=0.3\nADAPTIVE_SIZING=martingale\n")
+    os.utime(f, (time.time() + 5, time.time() + 5))
+    assert sizing.get_policy().base_size == 0.2
+
+
+def test_allowlist_only_defaults_follow_adaptive_switch():
+    assert SizingPolicy.from_values({}).allowlist_only
+    p = SizingPolicy.from_values({"ADAPTIVE_SIZING": "shrink"})
+    assert not p.allowlist_only and p.adaptive.method == "shrink"
+    assert SizingPolicy.from_values(
+        {"ADAPTIVE_SIZING": "shrink", "CALLER_ALLOWLIST_ONLY": "true"}
+    ).allowlist_only
@@ -0,0 +1,27 @@
+from typer.testing import CliRunner
+
+import memebot.tools.history_export as history_export
+from memebot.exec import history
+
+runner = CliRunner()
+
+
+def test_export_syncs_both_journals_incrementally(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "positions_closed.csv").write_text("ts_close,pnl_base,quote\n100,1.5,AAA\n")
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(data_dir))
+    # trades.csv resolves like the paper journal's
+    (data_dir / "trades.csv").write_text(
+        "ts,chain,side,base,quote,size_base,out_amount,price_impact_bps,slippage_bps,reason\n"
+        "100,solana,buy,SOL,AAA,0.1,5,10,100,ok\n"
+    )
+
+    res = runner.invoke(history_export.app, [])
+    assert res.exit_code == 0
+    assert "closed=1 trades=1" in res.output
+
+    res = runner.invoke(history_export.app, [])
+    assert "closed=0 trades=0" in res.output
+    h = history.HistoryStore(data_dir / "history")
+    assert h.days("closed") == ["1970-01-01"] and h.days("trades") == ["1970-01-01"]
@@ -1,82 +1,64 @@
 # tests/test_tools_pnl.py
 
-import os
+import csv
 import datetime
-from pathlib import Path
-import importlib
+import time
+import pytest
 import memebot.tools.pnl as pnl
+from memebot.exec import loss_ledger, store
 
 
-def test_no_file_returns_false(tmp_path, monkeypatch):
-    """If positions_closed.csv does not exist, should return False."""
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
     monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
-    importlib.reload(pnl)
+    loss_ledger.reset_loss_ledger()
+    yield tmp_path
+    loss_ledger.reset_loss_ledger()
+    store.reset_stores()
+
+
+def _write_closed(path, rows):
+    with open(path / "positions_closed.csv", "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=store.CLOSED_FIELDS)
+        w.writeheader()
+        for ts_close, pnl_base in rows:
+            w.writerow(
+                {
+                    "ts_open": ts_close - 60,
+                    "ts_close": ts_close,
+                    "chain": "solana",
+                    "base": "SOL",
+                    "quote": "Mint",
+                    "entry_base": 1.0,
+                    "entry_out_raw": 1000.0,
+                    "exit_base": 1.0 + pnl_base,
+                    "pnl_base": pnl_base,
+                    "reason": "stop_loss",
+                }
+            )
+
+
+def test_no_file_returns_false():
+    """If there are no closed positions, should return False."""
     assert pnl.daily_loss_exceeded(1.0) is False
 
 
-def test_file_exists_no_losses_today(tmp_path, monkeypatch):
-    """If file exists but no losses today, should return False."""
-    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
-    importlib.reload(pnl)
-
-    file = tmp_path / "positions_closed.csv"
-    yesterday = datetime.date.today() - datetime.timedelta(days=1)
-    ts = datetime.datetime.combine(yesterday, datetime.time.min).timestamp()
-
-    file.write_text(
-        "header\n"
-        f"row,{ts},,,,,,,10.0\n"  # now parts[8] = 10.0
-    )
+def test_file_exists_no_losses_today(data_dir):
+    """Losses from yesterday don't count toward today's cap."""
+    yesterday = time.time() - 2 * 86_400
+    _write_closed(data_dir, [(yesterday, -10.0)])
     assert pnl.daily_loss_exceeded(1.0) is False
 
 
-def test_loss_today_below_cap(tmp_path, monkeypatch):
+def test_loss_today_below_cap(data_dir):
     """Loss today but below cap should return False."""
-    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
-    importlib.reload(pnl)
-
-    file = tmp_path / "positions_closed.csv"
-    today = datetime.date.today()
-    ts = datetime.datetime(today.year, today.month, today.day).timestamp()
-
-    file.write_text(
-        "header\n"
-        f"row,{ts},,,,,,,-0.5\n"  # one small loss
-    )
+    _write_closed(data_dir, [(time.time(), -0.5)])
     assert pnl.daily_loss_exceeded(1.0) is False
 
 
-def test_loss_today_reaches_cap(tmp_path, monkeypatch):
-    """Loss today reaching cap should return True."""
-    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
-    importlib.reload(pnl)
-
-    file = tmp_path / "positions_closed.csv"
-    today = datetime.date.today()
-    ts = datetime.datetime(today.year, today.month, today.day).timestamp()
-
-    file.write_text(
-        "header\n"
-        f"row,{ts},,,,,,,-5.0\n"
-        f"row,{ts},,,,,,,-5.0\n"
-    )
+def test_loss_today_reaches_cap(data_dir):
+    """Loss today reaching cap should return True; gains don't offset it."""
+    now = time.time()
+    _write_closed(data_dir, [(now, -5.0), (now, 3.0), (now, -5.0)])
     # Total = 10.0, cap=10.0 → should trigger
     assert pnl.daily_loss_exceeded(10.0) is True
-
-
-def test_skips_short_lines(tmp_path, monkeypatch):
-    """Ensure short lines (<9 parts) are skipped without crashing."""
-    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
-    importlib.reload(pnl)
-
-    file = tmp_path / "positions_closed.csv"
-    today = datetime.date.today()
-    ts = datetime.datetime(today.year, today.month, today.day).timestamp()
-
-    # First line too short, second valid loss
-    file.write_text(
-        "header\n"
-        f"short,{ts}\n"
-        f"row,{ts},,,,,,,-3.0\n"
-    )
-    assert pnl.daily_loss_exceeded(1.0) is True
\ No newline at end of file
@@ -5,6 +5,7 @@ import subprocess
 from pathlib import Path
 import pytest
 import time
+import typer
 import memebot.tools.pnl_cli as pnl_cli
 
 
@@ -100,27 +101,67 @@ def test_load_trades_reads_file(tmp_path, monkeypatch):
 
 def test_daily_loss_exceeded_detects_loss(tmp_path, monkeypatch):
     """Ensure daily_loss_exceeded returns True if today's losses exceed limit."""
+    from memebot.exec import loss_ledger, store
+
     csv_file = tmp_path / "positions_closed.csv"
     today_ts = time.time()
-    csv_file.write_text(
-        f"ts_close,pnl_base,quote\n{int(today_ts)},-10.0,SOL\n"
-    )
-
-    # Patch CLOSED_FILE to point to our temp file
-    monkeypatch.setattr(pnl_cli, "CLOSED_FILE", csv_file)
+    csv_file.write_text(f"ts_close,pnl_base,quote\n{int(today_ts)},-10.0,SOL\n")
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("POSITION_STORE", "csv")
+    loss_ledger.reset_loss_ledger()
 
     # Should detect that today's total losses exceed the limit of 5
     assert pnl_cli.daily_loss_exceeded(5.0) is True
     # Should be False if we set a higher limit
     assert pnl_cli.daily_loss_exceeded(20.0) is False
+    loss_ledger.reset_loss_ledger()
+    store.reset_stores()
+
 
 def test_daily_loss_exceeded_skips_invalid_ts(tmp_path, monkeypatch):
     """Ensure rows with ts_close=0 are skipped and do not affect losses."""
+    from memebot.exec import loss_ledger, store
+
     csv_file = tmp_path / "positions_closed.csv"
-    # ts_close=0 should trigger the 'continue' path
     csv_file.write_text("ts_close,pnl_base,quote\n0,-50.0,SOL\n")
+    monkeypatch.setenv("MEMEBOT_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("POSITION_STORE", "csv")
+    loss_ledger.reset_loss_ledger()
+
+    # Losses should not count, so this should be False
+    assert pnl_cli.daily_loss_exceeded(1.0) is False
+    loss_ledger.reset_loss_ledger()
+    store.reset_stores()
+
+
+def test_main_since_filters(capsys, monkeypatch, tmp_path):
+    from memebot.exec import pnl
 
+    csv_file = tmp_path / "positions_closed.csv"
+    csv_file.write_text(
+        "ts_close,pnl_base,quote\n"
+        f"{time.time()},2.0,NEW\n"
+        "1234567890,10.5,OLD\n"
+    )
     monkeypatch.setattr(pnl_cli, "CLOSED_FILE", csv_file)
+    pnl.reset_pnl_aggregates()
 
-    # Losses should not count, so this should be False
-    assert pnl_cli.daily_loss_exceeded(1.0) is False
\ No newline at end of file
+    pnl_cli.main(since="today")
+    out = capsys.readouterr().out
+    assert "trades=1" in out and "gross=2.0000" in out and "OLD" not in out
+
+    pnl_cli.main(since="all")
+    assert "trades=2" in capsys.readouterr().out
+
+    with pytest.raises(typer.BadParameter):
+        pnl_cli.main(since="whenever")
+    pnl.reset_pnl_aggregates()
+
+
+def test_main_does_not_export_history(monkeypatch, tmp_path):
+    csv_file = tmp_path / "positions_closed.csv"
+    csv_file.write_text("ts_close,pnl_base,quote\n1234567890,1.0,USDC\n")
+    monkeypatch.setattr(pnl_cli, "CLOSED_FILE", csv_file)
+
+    pnl_cli.main(since="all")
+    assert not (tmp_path / "history").exists()